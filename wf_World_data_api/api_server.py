@@ -0,0 +1,651 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import signal
+import time
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from event_stream import DRAIN_TIMEOUT, EVENT_STREAM_CONTENT_TYPE, KEEPALIVE_FRAME, EventHub, encode_frame
+from locales import Localizer, parse_locale_spec
+from lookups import mapping_index, set_data_dir
+from metrics import Metrics, metrics, open_log
+from models import parse_world_state
+from node_index import node_index
+from render import FORMATS, ReportRenderer
+from refresh_scheduler import RefreshScheduler, backoff_delay
+from section_cache import SectionCache
+from shared_snapshot import SharedSnapshotReader, SharedSnapshotWriter, default_directory
+from snapshot_cache import DEFAULT_CACHE_FILE, SnapshotCache, format_age
+from snapshot_archive import SnapshotArchive
+from snapshot_diff import diff_snapshots
+from sections import SECTIONS, parse_section_names, required_keys
+from warframe_monitor import (REQUEST_TIMEOUT, SLOW_FETCH_SECONDS, WORLDSTATE_URL, WorldStateFetcher,
+                              select_sections)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_MAX_AGE = 60  # 快照最长缓存时间（秒），到达实体时间边界时会提前刷新
+REPUBLISH_SECONDS = 30  # 多进程模式下数据没有变化时也按此间隔重新发布，倒计时和过期状态随之更新
+
+STREAM_PATH = "stream"  # SSE 推送的路径，与板块名称分开
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# ?format= 渲染输出的 Content-Type
+RENDERED_CONTENT_TYPES = {
+    'text': "text/plain; charset=utf-8",
+    'markdown': "text/markdown; charset=utf-8",
+    'json': JSON_CONTENT_TYPE,
+}
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            503: 'Service Unavailable'}
+
+
+def encode_json(payload):
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def shared_entry(kind, name='', variant=None):
+    """共享缓冲区中响应体的名称，例如 section/fissures、section/fissures?lang=en、render/fissures?format=text"""
+    entry = f"{kind}/{name}" if name else kind
+    return entry if variant is None else f"{entry}?{variant}"
+
+
+class SnapshotStore:
+    """进程内共享的世界状态快照
+
+    同一时间最多只有一个上游刷新在进行（single-flight），其余并发请求等待同一个
+    刷新结果；每个板块的 JSON 按快照版本只序列化一次。已有旧快照时请求最多等待
+    slow_fetch 秒，超时先返回旧快照（stale-while-revalidate），刷新在后台继续；
+    刷新失败后按指数退避重试，期间继续提供旧快照。hub 为 EventHub 时每个新快照与
+    上一个快照的变化会推送给订阅的连接。localizer 为 locales.Localizer 时支持
+    ?lang= 请求其他语言，一个板块的所有语言在第一次请求时一起翻译。
+    """
+
+    def __init__(self, fetcher, max_age=DEFAULT_MAX_AGE, sections=None, slow_fetch=SLOW_FETCH_SECONDS, hub=None,
+                 localizer=None):
+        self.fetcher = fetcher
+        self.hub = hub
+        self.localizer = localizer or Localizer()
+        self.max_age = max_age
+        self.slow_fetch = slow_fetch
+        self.sections = list(SECTIONS) if sections is None else list(sections)
+        self.snapshot = None
+        self.version = 0
+        self.fetched_at = 0.0
+        self.stale_at = 0.0
+        self.scheduler = RefreshScheduler(fallback_interval=max_age)
+        self.upstream_fetches = 0
+        self._refresh_task = None
+        self._encoded = {}
+        self.renderer = ReportRenderer()
+        self.section_cache = SectionCache()
+
+    @property
+    def locales(self):
+        return self.localizer.locales
+
+    def is_fresh(self):
+        return self.snapshot is not None and time.time() < self.stale_at
+
+    def age(self, now=None):
+        """当前快照距最近一次确认有效的秒数"""
+        now = time.time() if now is None else now
+        return max(now - self.fetched_at, 0)
+
+    def invalidate(self):
+        self.stale_at = 0.0
+
+    def load_cached(self):
+        """启动时载入磁盘缓存中的快照，返回是否载入；缓存立即视为过期，第一个请求会触发刷新"""
+        cached = self.fetcher.load_cached()
+        if cached is None:
+            return False
+        cached, data = cached
+        mapping_index.refresh()
+        self.localizer.refresh()
+        self.snapshot = parse_world_state(data, self.sections, self.section_cache)
+        self.version += 1
+        self._encoded = {}
+        self.fetched_at = cached.verified_at
+        self.scheduler.update(self.snapshot)
+        return True
+
+    async def get_snapshot(self):
+        """返回当前快照，必要时触发（或加入正在进行的）上游刷新"""
+        if not self.is_fresh():
+            try:
+                if self.snapshot is None:
+                    await self.refresh()
+                else:
+                    await asyncio.wait_for(self.refresh(), self.slow_fetch)
+            except asyncio.TimeoutError:
+                pass
+            except Exception as e:
+                if self.snapshot is None:
+                    raise
+                print(f"⚠️刷新失败，继续使用旧数据: {e}")
+        return self.snapshot
+
+    def refresh(self):
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.ensure_future(self._refresh())
+            self._refresh_task.add_done_callback(self._clear_refresh_task)
+        return asyncio.shield(self._refresh_task)
+
+    def _clear_refresh_task(self, task):
+        self._refresh_task = None
+        if not task.cancelled():
+            # 读取异常，避免没有等待者时出现 "exception was never retrieved"
+            task.exception()
+
+    async def _refresh(self):
+        loop = asyncio.get_running_loop()
+        self.upstream_fetches += 1
+        try:
+            changed, data = await loop.run_in_executor(None, self.fetcher.fetch)
+        except Exception:
+            # 退避期间视为新鲜，不会每个请求都去访问不可用的上游
+            self.stale_at = time.time() + backoff_delay(self.fetcher.failures)
+            raise
+        if changed:
+            previous = self.snapshot
+            mapping_index.refresh()
+            self.localizer.refresh()
+            with metrics.stage('parse'):
+                self.snapshot = parse_world_state(data, self.sections, self.section_cache)
+            self.version += 1
+            self._encoded = {}
+            self.scheduler.update(self.snapshot)
+            if self.hub is not None:
+                # 没有连接时也发布，之后带 Last-Event-ID 重连的客户端才能补齐
+                with metrics.stage('diff'):
+                    changes = diff_snapshots(previous, self.snapshot, self.sections)
+                self.hub.publish_changes(changes, self.version)
+        self.fetched_at = time.time()
+        # 快照在最近的实体时间边界之后（最长 max_age 秒）失效
+        self.stale_at = self.scheduler.due_at(self.fetched_at)
+
+    async def keep_fresh(self):
+        """有推送连接时在快照过期后主动刷新，让变化不依赖普通请求触发"""
+        while True:
+            await asyncio.sleep(min(max(self.stale_at - time.time(), 1), self.max_age))
+            if self.hub is None or not self.hub.has_subscribers() or self.is_fresh():
+                continue
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"⚠️后台刷新失败，继续使用旧数据: {e}")
+
+    async def section_body(self, section, lang=None):
+        """返回板块的 JSON 字节串，同一快照版本只序列化一次
+
+        lang 不为 None 时返回该语言的翻译结果，所有已配置语言一次遍历翻译完成并一起缓存。
+        """
+        return self._section_body(await self.get_snapshot(), section, lang)
+
+    def _section_body(self, snapshot, section, lang=None):
+        body = self._encoded.get((section, lang))
+        if body is None:
+            with metrics.timer('section_render_seconds', section=section):
+                payload = SECTIONS[section].payload(snapshot)
+                if lang is None:
+                    translated = {None: payload}
+                else:
+                    translated = self.localizer.resolve(payload)
+                for locale, data in translated.items():
+                    document = {'section': section, 'version': self.version, 'updated': int(self.fetched_at)}
+                    if locale is not None:
+                        document['lang'] = locale
+                    document['data'] = data
+                    self._encoded[(section, locale)] = encode_json(document)
+            body = self._encoded[(section, lang)]
+        return body
+
+    def metrics_body(self):
+        """/metrics 的 Prometheus 文本"""
+        return metrics.render().encode('utf-8')
+
+    async def planets_body(self):
+        """node.json 中的星球列表"""
+        return self._planets_body()
+
+    def _planets_body(self):
+        planets = [{'planet': p, 'region': node_index.region(p), 'nodes': len(node_index.nodes_on(p))}
+                   for p in node_index.planets()]
+        return encode_json({'planets': planets})
+
+    async def planet_body(self, planet):
+        """返回某个星球上尚未过期的任务（按板块分组）的 JSON 字节串，未知星球返回 None"""
+        if node_index.region(planet) is None:
+            return None
+        return self._planet_body(await self.get_snapshot(), planet, time.time())
+
+    def _planet_body(self, snapshot, planet, now):
+        found = node_index.records_on(snapshot, planet, self.sections, now)
+        return encode_json({
+            'planet': planet,
+            'region': node_index.region(planet),
+            'version': self.version,
+            'updated': int(self.fetched_at),
+            'data': {section: [r.as_dict() for r in records] for section, records in found.items()},
+        })
+
+    async def rendered_section(self, section, fmt):
+        """返回板块显示模型按 fmt 渲染的结果，倒计时按当前时间计算
+
+        显示模型与上次相同（数据和倒计时都没变）时复用上次的渲染结果。
+        """
+        return self._rendered_section(await self.get_snapshot(), section, fmt, time.time())
+
+    def _rendered_section(self, snapshot, section, fmt, now):
+        view = self.section_cache.view(section, snapshot, now)
+        return self.renderer.section(view, fmt).encode('utf-8')
+
+    def shared_entries(self):
+        """多进程模式下发布给工作进程的全部响应体，返回 ({名称: 字节串}, 附加信息)
+
+        所有条目在一次同步调用中由当前快照生成，中间不会切换到刷新任务，同一代内容
+        不会混入不同快照的板块；附加信息中的版本号和抓取时间取自同一份快照。
+        """
+        snapshot, now = self.snapshot, time.time()
+        meta = {'version': self.version, 'fetched_at': self.fetched_at}
+        entries = {}
+        for section in self.sections:
+            entries[shared_entry('section', section)] = self._section_body(snapshot, section)
+            for locale in self.locales:
+                entries[shared_entry('section', section, f"lang={locale}")] = \
+                    self._section_body(snapshot, section, locale)
+            for fmt in FORMATS:
+                entries[shared_entry('render', section, f"format={fmt}")] = \
+                    self._rendered_section(snapshot, section, fmt, now)
+        entries[shared_entry('planets')] = self._planets_body()
+        for planet in node_index.planets():
+            entries[shared_entry('planets', planet)] = self._planet_body(snapshot, planet, now)
+        # 抓取、解码、解析等阶段只在发布进程中发生，工作进程的 /metrics 与它们自己的指标合并后导出
+        entries[shared_entry('metrics')] = encode_json(metrics.export())
+        return entries, meta
+
+    async def publish_forever(self, writer, interval=REPUBLISH_SECONDS):
+        """发布进程：快照过期时刷新，新快照和每 interval 秒重新渲染的结果写入共享缓冲区"""
+        while True:
+            try:
+                await self.get_snapshot()
+            except Exception as e:
+                print(f"⚠️刷新失败: {e}")
+            if self.snapshot is not None:
+                with metrics.stage('publish'):
+                    writer.publish(*self.shared_entries())
+            await asyncio.sleep(min(max(self.stale_at - time.time(), 1), interval))
+
+
+class SharedStore:
+    """工作进程的只读快照：所有响应体直接取自发布进程写入共享内存的缓冲区
+
+    不抓取、不解析也不序列化，返回的是指向共享映射的 memoryview；板块和语言列表
+    与发布进程使用相同的启动参数。推送（/stream）只由单进程模式提供。
+    """
+
+    hub = None
+
+    def __init__(self, reader, sections, locales):
+        self.reader = reader
+        self.sections = list(sections)
+        self.locales = tuple(locales)
+
+    def _current(self):
+        snapshot = self.reader.current()
+        if snapshot is None:
+            raise RuntimeError("发布进程尚未发布数据")
+        return snapshot
+
+    def _get(self, name):
+        body = self._current().get(name)
+        if body is None:
+            raise RuntimeError(f"共享缓冲区中没有 {name}")
+        return body
+
+    def age(self, now=None):
+        now = time.time() if now is None else now
+        return max(now - self._current().meta.get('fetched_at', now), 0)
+
+    def invalidate(self):
+        # 刷新由发布进程按时间边界安排，工作进程忽略 ?refresh
+        pass
+
+    async def section_body(self, section, lang=None):
+        return self._get(shared_entry('section', section, None if lang is None else f"lang={lang}"))
+
+    async def rendered_section(self, section, fmt):
+        return self._get(shared_entry('render', section, f"format={fmt}"))
+
+    async def planets_body(self):
+        return self._get(shared_entry('planets'))
+
+    async def planet_body(self, planet):
+        return self._current().get(shared_entry('planets', planet))
+
+    def metrics_body(self):
+        """本工作进程的指标加上发布进程最近一次发布时的指标"""
+        combined = Metrics()
+        combined.merge(metrics.export())
+        snapshot = self.reader.current()
+        published = None if snapshot is None else snapshot.get(shared_entry('metrics'))
+        if published is not None:
+            combined.merge(json.loads(bytes(published)))
+        return combined.render().encode('utf-8')
+
+
+class ApiServer:
+    """基于 asyncio 的本地 HTTP/JSON 接口服务"""
+
+    def __init__(self, store, host=DEFAULT_HOST, port=DEFAULT_PORT, reuse_port=False):
+        self.store = store
+        self.host = host
+        self.port = port
+        self.reuse_port = reuse_port  # 多个工作进程监听同一端口，由内核分配连接
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port,
+                                                 reuse_port=self.reuse_port or None)
+        # port=0 时使用系统分配的端口
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                parts = request_line.decode('latin-1').split()
+                if len(parts) != 3:
+                    await self._respond(writer, 400, encode_json({'error': 'bad request'}), False)
+                    break
+                method, target, version = parts
+                if method == 'GET' and urlsplit(target).path.strip('/') == STREAM_PATH:
+                    # 推送连接一直占用到客户端断开或被判定为慢消费者
+                    await self.stream_events(writer, target, headers)
+                    break
+                keep_alive = (version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close')
+                with metrics.stage('api'):
+                    status, body, headers = await self.dispatch(method, target)
+                await self._respond(writer, status, body, keep_alive, headers)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # 服务停止时连接任务被取消：直接断开，不让取消作为未处理的异常打印出来
+            writer.transport.abort()
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target):
+        """处理一个请求，返回 (状态码, 响应体字节串, 额外的响应头)"""
+        url = urlsplit(target)
+        path = url.path.strip('/')
+        status, body, headers = await self._route(method, path, parse_qs(url.query, keep_blank_values=True))
+        # 未知路径统一计为 other，避免任意路径产生无限多的标签
+        label = path if path in self.store.sections or path in ('', 'metrics', 'planets') else 'other'
+        if path.startswith('planets/'):
+            label = 'planets/'
+        metrics.inc('api_requests_total', path=label or '/', status=status)
+        return status, body, headers
+
+    async def _route(self, method, path, query):
+        json_headers = {'Content-Type': JSON_CONTENT_TYPE}
+        if method != 'GET':
+            return 405, encode_json({'error': 'method not allowed'}), json_headers
+        if path == '':
+            return 200, encode_json({'sections': self.store.sections}), json_headers
+        if path == 'metrics':
+            return 200, self.store.metrics_body(), {'Content-Type': METRICS_CONTENT_TYPE}
+        if path == 'planets':
+            try:
+                return 200, await self.store.planets_body(), json_headers
+            except Exception as e:
+                return 503, encode_json({'error': f'upstream unavailable: {e}'}), json_headers
+        if path.startswith('planets/'):
+            planet = unquote(path[len('planets/'):])
+            try:
+                body = await self.store.planet_body(planet)
+            except Exception as e:
+                return 503, encode_json({'error': f'upstream unavailable: {e}'}), json_headers
+            if body is None:
+                return 404, encode_json({'error': f'unknown planet: {planet}'}), json_headers
+            return 200, body, dict(json_headers, Age=str(int(self.store.age())))
+        if path not in self.store.sections:
+            return 404, encode_json({'error': f'unknown section: {path}'}), json_headers
+        fmt = query.get('format', [None])[0]
+        if fmt is not None and fmt not in FORMATS:
+            return 400, encode_json({'error': f"unknown format: {fmt} (available: {', '.join(FORMATS)})"}), json_headers
+        lang = query.get('lang', [None])[0] or None
+        if lang is not None:
+            if lang not in self.store.locales:
+                return 400, encode_json({'error': f"unknown lang: {lang} "
+                                                  f"(available: {', '.join(self.store.locales)})"}), json_headers
+            if fmt is not None:
+                return 400, encode_json({'error': 'lang is only supported for JSON data'}), json_headers
+        if 'refresh' in query:
+            self.store.invalidate()
+        try:
+            if fmt is None:
+                body = await self.store.section_body(path, lang)
+            else:
+                body = await self.store.rendered_section(path, fmt)
+        except Exception as e:
+            return 503, encode_json({'error': f'upstream unavailable: {e}'}), json_headers
+        headers = {'Content-Type': JSON_CONTENT_TYPE if fmt is None else RENDERED_CONTENT_TYPES[fmt]}
+        # Age 为快照距最近一次确认有效的秒数，旧快照（缓存或上游故障时）据此判断
+        headers['Age'] = str(int(self.store.age()))
+        return 200, body, headers
+
+    async def stream_events(self, writer, target, request_headers):
+        """SSE 推送：/stream?sections=fissures,alerts
+
+        带 Last-Event-ID（请求头或 last_event_id 参数）重连时补发之后的事件，历史中
+        已经缺失时和首次连接一样先发送各板块的完整快照（event: snapshot）。
+        """
+        hub = self.store.hub
+        query = parse_qs(urlsplit(target).query)
+        requested = query.get('sections', [''])[0]
+        sections = [s for s in requested.split(',') if s] or self.store.sections
+        unknown = [s for s in sections if s not in self.store.sections]
+        if hub is None or unknown:
+            status, error = (404, 'push disabled') if hub is None else (400, f"unknown section: {', '.join(unknown)}")
+            metrics.inc('api_requests_total', path=STREAM_PATH, status=status)
+            await self._respond(writer, status, encode_json({'error': error}), False)
+            return
+        last_id = request_headers.get('last-event-id') or query.get('last_event_id', [None])[0]
+        try:
+            last_id = int(last_id) if last_id is not None else None
+        except ValueError:
+            last_id = None
+        metrics.inc('api_requests_total', path=STREAM_PATH, status=200)
+
+        subscriber = hub.subscribe(sections)
+        # 被判定为慢消费者时立即中断连接，阻塞在 drain() 上的写出随之结束
+        subscriber.on_drop = writer.transport.abort
+        try:
+            writer.write(b"HTTP/1.1 200 OK\r\n"
+                         b"Content-Type: " + EVENT_STREAM_CONTENT_TYPE.encode('latin-1') + b"\r\n"
+                         b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n")
+            replay = hub.replay(last_id, subscriber.sections)
+            if replay is None:
+                bodies = []
+                try:
+                    for section in sections:
+                        bodies.append((section, await self.store.section_body(section)))
+                except Exception as e:
+                    bodies.append(('error', encode_json({'error': f'upstream unavailable: {e}'})))
+                # 快照已包含读取期间发布的变化，以读取完成时的编号作为快照的事件编号
+                sent = hub.last_id
+                writer.write(b"".join(encode_frame(sent, 'error' if section == 'error' else 'snapshot', body)
+                                      for section, body in bodies))
+            else:
+                sent = hub.last_id
+                writer.write(b"".join(frame for _, frame in replay))
+            await self._drain(writer, subscriber)
+            while not subscriber.dropped:
+                pending = await subscriber.wait()
+                if subscriber.dropped:
+                    break
+                # 订阅之后、补发之前产生的事件已经包含在补发或快照中
+                frames = [frame for event_id, frame in pending if event_id > sent]
+                if pending:
+                    sent = max(sent, pending[-1][0])
+                writer.write(b"".join(frames) if frames else KEEPALIVE_FRAME)
+                await self._drain(writer, subscriber)
+        finally:
+            hub.unsubscribe(subscriber)
+
+    async def _drain(self, writer, subscriber):
+        """等待推送数据写出；客户端 DRAIN_TIMEOUT 秒内没有读走则断开"""
+        try:
+            await asyncio.wait_for(writer.drain(), DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            subscriber.drop()
+
+    async def _respond(self, writer, status, body, keep_alive, headers=None):
+        headers = headers or {'Content-Type': JSON_CONTENT_TYPE}
+        extra = ''.join(f"{name}: {value}\r\n" for name, value in headers.items())
+        head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                f"{extra}"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        # body 可能是共享映射的 memoryview，分开写出避免拼接时复制
+        writer.writelines((head.encode('latin-1'), body))
+        await writer.drain()
+
+
+def run_server(host=DEFAULT_HOST, port=DEFAULT_PORT, upstream=WORLDSTATE_URL, max_age=DEFAULT_MAX_AGE,
+               archive=None, sections=None, cache=None, push=True, localizer=None):
+    """启动接口服务直到 Ctrl+C；push 为 True 时提供 /stream 推送，localizer 提供 ?lang= 的其他语言"""
+    names = select_sections(sections)
+    fetcher = WorldStateFetcher(upstream, timeout=REQUEST_TIMEOUT, archive=archive, keys=required_keys(names),
+                                cache=cache)
+    store = SnapshotStore(fetcher, max_age=max_age, sections=names, hub=EventHub() if push else None,
+                          localizer=localizer)
+    if store.load_cached():
+        print(f"🗄️已载入缓存快照（{format_age(store.age())}前确认有效）")
+    server = ApiServer(store, host, port)
+
+    async def main():
+        await server.start()
+        print(f"🌐接口服务已启动: http://{server.host}:{server.port}/")
+        if store.hub is not None:
+            asyncio.ensure_future(store.keep_fresh())
+        await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\n👋接口服务已停止")
+    finally:
+        store.fetcher.close()
+
+
+def run_worker(directory, host, port, sections, locales):
+    """工作进程：从共享缓冲区读取响应体并提供接口"""
+    store = SharedStore(SharedSnapshotReader(directory), sections, locales)
+    server = ApiServer(store, host, port, reuse_port=True)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+def run_cluster(workers, host=DEFAULT_HOST, port=DEFAULT_PORT, upstream=WORLDSTATE_URL, max_age=DEFAULT_MAX_AGE,
+                archive=None, sections=None, cache=None, localizer=None, shared_dir=None):
+    """多进程模式：本进程抓取、解析并发布到共享缓冲区，workers 个工作进程监听同一端口提供接口"""
+    names = select_sections(sections)
+    fetcher = WorldStateFetcher(upstream, timeout=REQUEST_TIMEOUT, archive=archive, keys=required_keys(names),
+                                cache=cache)
+    store = SnapshotStore(fetcher, max_age=max_age, sections=names, localizer=localizer)
+    writer = SharedSnapshotWriter(shared_dir)
+    if store.load_cached():
+        print(f"🗄️已载入缓存快照（{format_age(store.age())}前确认有效）")
+    processes = [multiprocessing.Process(target=run_worker, daemon=True,
+                                         args=(writer.directory, host, port, names, store.locales))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    # SIGTERM 与 Ctrl+C 一样退出，确保下面的清理（停止工作进程、删除共享缓冲区）会执行
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    print(f"🌐接口服务已启动: http://{host}:{port}/（{workers} 个工作进程，共享缓冲区 {writer.directory}）")
+    try:
+        asyncio.run(store.publish_forever(writer))
+    except KeyboardInterrupt:
+        print("\n👋接口服务已停止")
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+        writer.close()
+        writer.unlink()
+        store.fetcher.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warframe 世界状态本地 HTTP/JSON 接口")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--upstream', default=WORLDSTATE_URL,
+                        help="worldState 地址，可指向本地模拟服务用于测试")
+    parser.add_argument('--max-age', type=float, default=DEFAULT_MAX_AGE,
+                        help="快照缓存时间（秒）")
+    parser.add_argument('--archive', metavar='DIR', help="把每个不同的快照写入归档目录")
+    parser.add_argument('--sections', metavar='NAMES',
+                        help=f"只提供指定板块，逗号分隔（可选: {','.join(SECTIONS)}）")
+    parser.add_argument('--cache', metavar='FILE',
+                        help=f"最近一份有效数据的缓存文件（默认为字典目录下的 {DEFAULT_CACHE_FILE}）")
+    parser.add_argument('--no-cache', action='store_true', help="不读取也不写入快照缓存")
+    parser.add_argument('--no-push', action='store_true', help="不提供 /stream 推送")
+    parser.add_argument('--data-dir', metavar='DIR',
+                        help="字典文件所在目录（默认为程序所在目录，也可用环境变量 WF_DATA_DIR 指定）")
+    parser.add_argument('--locale', metavar='LANG=DIR', action='append', default=[],
+                        help="额外语言的字典目录（dictionary_compiler.py 的输出），例如 en=dictionaries/en，可重复指定")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="多进程模式的工作进程数：本进程只负责抓取和发布，工作进程从共享内存提供接口（不支持推送）")
+    parser.add_argument('--shared-dir', metavar='DIR',
+                        help=f"多进程模式的共享缓冲区目录（默认 {default_directory()}）")
+    parser.add_argument('--metrics-log', metavar='FILE',
+                        help="把各阶段耗时和计数以 JSON 行写入文件，\"-\" 表示标准错误")
+    args = parser.parse_args()
+    if args.data_dir:
+        set_data_dir(args.data_dir)
+    try:
+        sections = parse_section_names(args.sections)
+        localizer = Localizer()
+        for value in args.locale:
+            localizer.add_locale(*parse_locale_spec(value))
+    except ValueError as e:
+        parser.error(str(e))
+    archive = SnapshotArchive(args.archive) if args.archive else None
+    if args.metrics_log:
+        metrics.enable_log(open_log(args.metrics_log))
+    cache = None if args.no_cache else SnapshotCache(args.cache)
+    if args.workers > 0:
+        run_cluster(args.workers, args.host, args.port, args.upstream, args.max_age, archive, sections, cache,
+                    localizer, args.shared_dir)
+    else:
+        run_server(args.host, args.port, args.upstream, args.max_age, archive, sections, cache, not args.no_push,
+                   localizer)
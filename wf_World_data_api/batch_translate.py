@@ -0,0 +1,207 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from lookups import mapping_index, mappings, set_data_dir
+from models import parse_world_state
+from render import FORMATS, ReportRenderer, write_output
+from section_cache import SectionCache
+from sections import SECTIONS, parse_section_names, required_dictionaries, required_keys
+from warframe_monitor import build_section_views, select_sections
+from worldstate_decode import WorldStateDecodeError, decode_world_state
+
+MANIFEST_FILE = ".batch_manifest.json"
+# 输出文件后缀；json 报告不用 .json，避免与输入的 worldState 文件同名
+OUTPUT_SUFFIXES = {'text': '.txt', 'markdown': '.md', 'json': '.report.json'}
+MAX_CHUNK_SIZE = 64
+
+# 工作进程内的状态，由 _init_worker 设置
+_worker = {}
+
+
+def _is_output(path, out_dir):
+    """本工具自己写出的文件：输出目录中的文件、报告和运行记录"""
+    name = os.path.basename(path)
+    if name == MANIFEST_FILE or any(name.endswith(suffix) for suffix in OUTPUT_SUFFIXES.values()):
+        return True
+    if out_dir is None:
+        return False
+    out_dir = os.path.realpath(out_dir)
+    return os.path.commonpath([os.path.realpath(path), out_dir]) == out_dir
+
+
+def find_inputs(pattern, out_dir=None):
+    """目录（递归查找 *.json）或 glob 模式 -> 按路径排序的文件列表
+
+    out_dir 为报告输出目录：输出目录位于输入目录之中时，其中的文件不作为输入。
+    """
+    if os.path.isdir(pattern):
+        paths = glob.glob(os.path.join(pattern, '**', '*.json'), recursive=True)
+    else:
+        paths = glob.glob(pattern, recursive=True)
+    return sorted(path for path in paths if os.path.isfile(path) and not _is_output(path, out_dir))
+
+
+def dictionary_version(names):
+    """选中板块用到的字典文件内容的哈希；字典修改后已有的翻译结果全部失效"""
+    digest = hashlib.sha1()
+    for name in required_dictionaries(names):
+        digest.update(name.encode('utf-8'))
+        try:
+            with open(mappings.path(name), 'rb') as f:
+                digest.update(hashlib.sha1(f.read()).digest())
+        except OSError:
+            digest.update(b'missing')
+    return digest.hexdigest()
+
+
+def _init_worker(data_dir, names, fmt):
+    if data_dir:
+        set_data_dir(data_dir)
+    select_sections(names)
+    # 主进程已经更新了缓存文件，这里只是读取
+    mapping_index.refresh()
+    _worker.update(names=names, fmt=fmt, keys=required_keys(names),
+                   renderer=ReportRenderer(fmt), cache=SectionCache())
+
+
+def render_snapshot(body, fallback_time=None):
+    """解码 -> 翻译 -> 渲染一份 worldState，渲染时间取快照自己的 Time 字段"""
+    names = _worker['names']
+    data = decode_world_state(body, _worker['keys'])
+    if 'Time' not in data:
+        # 其他 JSON 文件（例如报告或字典）不渲染成空报告
+        raise WorldStateDecodeError("不是 worldState 文档（缺少 Time 字段）")
+    # 同一进程内相邻快照内容相同的板块复用解析结果和显示模型
+    snapshot = parse_world_state(data, names, _worker['cache'])
+    now = data.get('Time') or fallback_time
+    views = build_section_views(snapshot, now, names, _worker['cache'])
+    updated = datetime.fromtimestamp(now) if now else datetime.now()
+    return _worker['renderer'].report(views, updated.strftime('%Y-%m-%d %H:%M:%S'), _worker['fmt'])
+
+
+def _process(task):
+    """工作进程处理一个文件，返回 (状态, 内容哈希, 报告文本或错误信息)
+
+    task 为 (输入路径, 输出路径, 上次运行记录的内容哈希)；输出路径为 None 时返回报告文本。
+    内容哈希与上次相同且输出文件仍然存在时跳过渲染。
+    """
+    path, output, previous_hash = task
+    try:
+        with open(path, 'rb') as f:
+            body = f.read()
+        content_hash = hashlib.blake2b(body, digest_size=16).hexdigest()
+        if output is not None and content_hash == previous_hash and os.path.exists(output):
+            return 'skipped', content_hash, None
+        text = render_snapshot(body, os.path.getmtime(path))
+        if output is None:
+            return 'rendered', content_hash, text
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        write_output(text, output)
+        return 'rendered', content_hash, None
+    except Exception as e:
+        return 'error', None, f"{type(e).__name__}: {e}"
+
+
+def _load_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(path, manifest):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def batch_translate(paths, out_dir=None, sections=None, fmt='text', workers=None, chunk_size=None,
+                    data_dir=None, force=False):
+    """并行重新翻译已保存的 worldState 文件，按输入顺序产出结果
+
+    文件分块交给进程池（每块 chunk_size 个文件，默认按文件数和进程数计算），结果按
+    输入顺序返回。out_dir 不为空时每个文件的报告写到 out_dir 中与输入相同的相对路径，
+    并记录内容哈希和字典版本：两者都与上次运行相同的文件直接跳过；out_dir 为空时报告
+    按输入顺序写到标准输出。返回 {'rendered': n, 'skipped': n, 'errors': n}。
+    """
+    names = select_sections(sections)
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, min(MAX_CHUNK_SIZE, len(paths) // (workers * 4)))
+    base = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths]) if paths else ''
+
+    manifest_path = os.path.join(out_dir, MANIFEST_FILE) if out_dir else None
+    manifest = _load_manifest(manifest_path) if manifest_path else {}
+    # 字典、板块或输出格式任何一项变化，之前的记录都不能复用
+    run_key = [dictionary_version(names), fmt, names]
+    if force or manifest.get('key') != run_key:
+        manifest = {'key': run_key, 'files': {}}
+    files = manifest['files']
+
+    relatives = [os.path.relpath(os.path.abspath(path), base) for path in paths]
+    tasks = []
+    for path, relative in zip(paths, relatives):
+        output = None
+        if out_dir:
+            output = os.path.join(out_dir, os.path.splitext(relative)[0] + OUTPUT_SUFFIXES[fmt])
+        tasks.append((path, output, files.get(relative)))
+
+    stats = {'rendered': 0, 'skipped': 0, 'errors': 0}
+    started = time.perf_counter()
+    # 字典有变化时先在这里重新编译一次查找表缓存，工作进程启动后只需读取缓存
+    mapping_index.refresh()
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(data_dir, names, fmt)) as pool:
+        for path, relative, (status, content_hash, result) in zip(
+                paths, relatives, pool.map(_process, tasks, chunksize=chunk_size)):
+            if status == 'error':
+                stats['errors'] += 1
+                # 下次运行重新尝试
+                files.pop(relative, None)
+                print(f"❌{path}: {result}")
+                continue
+            stats[status] += 1
+            if out_dir:
+                files[relative] = content_hash
+            else:
+                write_output(result)
+    if manifest_path:
+        _save_manifest(manifest_path, manifest)
+    stats['seconds'] = time.perf_counter() - started
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="用当前字典并行重新翻译已保存的 worldState 文件")
+    parser.add_argument('inputs', metavar='DIR_OR_GLOB', help="保存 worldState JSON 的目录（递归）或 glob 模式")
+    parser.add_argument('--out', metavar='DIR',
+                        help="报告输出目录，保持输入的相对路径；不指定时按输入顺序打印到标准输出")
+    parser.add_argument('--format', choices=list(FORMATS), default='text', help="报告格式（默认 text）")
+    parser.add_argument('--sections', metavar='NAMES',
+                        help=f"只处理指定板块，逗号分隔（可选: {','.join(SECTIONS)}）")
+    parser.add_argument('--workers', type=int, help="进程数（默认 CPU 核数）")
+    parser.add_argument('--chunk-size', type=int, help="每个工作单元包含的文件数（默认按文件数和进程数计算）")
+    parser.add_argument('--data-dir', metavar='DIR', help="字典文件所在目录（默认为程序所在目录）")
+    parser.add_argument('--force', action='store_true', help="忽略上次运行的记录，全部重新渲染")
+    args = parser.parse_args()
+    if args.data_dir:
+        set_data_dir(args.data_dir)
+    try:
+        sections = parse_section_names(args.sections)
+    except ValueError as e:
+        parser.error(str(e))
+    paths = find_inputs(args.inputs, args.out)
+    if not paths:
+        parser.error(f"{args.inputs} 中没有找到 worldState 文件")
+    stats = batch_translate(paths, args.out, sections, args.format, args.workers, args.chunk_size,
+                            args.data_dir, args.force)
+    if args.out:
+        print(f"✅渲染 {stats['rendered']} 个，跳过 {stats['skipped']} 个未变化的文件，"
+              f"失败 {stats['errors']} 个，用时 {stats['seconds']:.1f} 秒")
@@ -0,0 +1,151 @@
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixtures import FIXTURE_DIR, FixtureServer, load_fixtures, record_fixture  # noqa: E402
+from lookups import mapping_index  # noqa: E402
+from models import parse_world_state  # noqa: E402
+from render import ReportRenderer  # noqa: E402
+from sections import SECTIONS, required_keys  # noqa: E402
+from warframe_monitor import WORLDSTATE_URL, WorldStateFetcher, build_section_views  # noqa: E402
+from worldstate_decode import JSON_BACKEND, decode_world_state, loads  # noqa: E402
+
+DEFAULT_REPEAT = 20
+REGRESSION_THRESHOLD = 1.2  # 比基线慢 20% 以上视为回归
+
+
+def measure(func, repeat):
+    """返回 (中位数耗时秒, 峰值内存字节, 分配的内存块数)"""
+    func()  # 预热
+    timings = []
+    for _ in range(repeat):
+        gc.disable()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+        gc.enable()
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(max(stat.count_diff, 0) for stat in after.compare_to(before, 'lineno'))
+    return statistics.median(timings), peak, blocks
+
+
+def bench_fixture(body, repeat):
+    """对一份 worldState 文档分别测量解码、解析翻译、渲染，以及每个板块的开销"""
+    results = {}
+    keys = required_keys(list(SECTIONS))
+    data = decode_world_state(body, keys)
+    snapshot = parse_world_state(data)
+    now = data.get('Time')
+
+    def render(sections=None):
+        # 每次都重新构建显示模型并用新的渲染器序列化，测量的是渲染本身而不是缓存命中
+        views = build_section_views(snapshot, now, sections)
+        ReportRenderer().report(views, '')
+
+    results['decode.full'] = measure(lambda: loads(body), repeat)
+    results['decode.selective'] = measure(lambda: decode_world_state(body, keys), repeat)
+    results['parse.all'] = measure(lambda: parse_world_state(data), repeat)
+    results['render.all'] = measure(render, repeat)
+    for name in SECTIONS:
+        results[f'parse.{name}'] = measure(lambda: parse_world_state(data, [name]), repeat)
+        results[f'render.{name}'] = measure(lambda: render([name]), repeat)
+    return results
+
+
+def bench_fetch(body, repeat):
+    """通过本地模拟服务测量完整抓取路径：首次 200 + 解码，以及 304 命中"""
+    results = {}
+    with FixtureServer(body) as server:
+        fetcher = WorldStateFetcher(server.url)
+
+        def cold():
+            fetcher.etag = None
+            fetcher.content_hash = None
+            fetcher.fetch()
+
+        results['fetch.200'] = measure(cold, repeat)
+        fetcher.fetch()
+        results['fetch.304'] = measure(fetcher.fetch, repeat)
+        fetcher.close()
+    return results
+
+
+def format_row(name, timing, peak, blocks, baseline=None):
+    row = f"   {name:<24} {timing * 1000:>9.3f} ms {peak / 1024:>10.1f} KiB {blocks:>8} 块"
+    if baseline:
+        ratio = timing / baseline[0] if baseline[0] else 0
+        flag = " ⚠️回归" if ratio > REGRESSION_THRESHOLD else ""
+        row += f"   x{ratio:.2f}{flag}"
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="worldState 解码/翻译/渲染基准测试（离线）")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--fetch', action='store_true', help="同时通过本地模拟服务测量完整抓取路径")
+    parser.add_argument('--fixtures', help="只运行指定夹具，逗号分隔")
+    parser.add_argument('--no-synthetic', action='store_true', help="只使用 fixtures/ 中录制的文档")
+    parser.add_argument('--save-baseline', metavar='FILE', help="把结果保存为基线")
+    parser.add_argument('--compare', metavar='FILE', help="与保存的基线比较")
+    parser.add_argument('--record', nargs='?', const=WORLDSTATE_URL, metavar='URL',
+                        help="先抓取一份真实的 worldState 保存到 fixtures/（默认官方地址）再运行")
+    args = parser.parse_args()
+
+    if args.record:
+        print(f"📼已录制 {record_fixture(args.record)}")
+    corpus = load_fixtures(include_synthetic=not args.no_synthetic)
+    if len(load_fixtures(include_synthetic=False)) == 0:
+        print(f"⚠️{FIXTURE_DIR} 中没有录制的 worldState 文档，只有合成文档；用 --record 录制一份")
+    if args.fixtures:
+        wanted = set(args.fixtures.split(','))
+        corpus = {name: body for name, body in corpus.items() if name in wanted}
+    baseline = {}
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    # 预先编译好查找表，避免把首次加载字典计入第一项
+    mapping_index.refresh()
+    print(f"JSON 后端: {JSON_BACKEND}，重复次数: {args.repeat}")
+
+    report = {}
+    regressions = 0
+    for name, body in corpus.items():
+        print(f"\n📦{name} ({len(body) / 1024:.1f} KiB)")
+        results = bench_fixture(body, args.repeat)
+        if args.fetch:
+            results.update(bench_fetch(body, args.repeat))
+        report[name] = results
+        for stage, values in results.items():
+            base = baseline.get(name, {}).get(stage)
+            print(format_row(stage, *values, baseline=base))
+            if base and base[0] and values[0] / base[0] > REGRESSION_THRESHOLD:
+                regressions += 1
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾基线已保存到 {args.save_baseline}")
+    if args.compare:
+        print(f"\n{'⚠️' if regressions else '✅'}与基线相比 {regressions} 项回归")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+# worldState 基准测试夹具：录制文档加载、合成大文档生成、本地模拟 worldState 服务
+import glob
+import hashlib
+import http.server
+import json
+import os
+import random
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.dirname(BENCH_DIR)
+FIXTURE_DIR = os.path.join(BENCH_DIR, "fixtures")
+
+HOUR_MS = 3600 * 1000
+
+
+def _load_keys(filename):
+    with open(os.path.join(DATA_DIR, filename), 'r', encoding='utf-8') as f:
+        return list(json.load(f))
+
+
+def _date(ms):
+    return {'$date': {'$numberLong': str(ms)}}
+
+
+def make_world_state(fissures=40, storms=12, jobs=10, challenges=12, invasions=12, alerts=4,
+                     flash_sales=200, seed=0, now_ms=None):
+    """生成结构与 worldState.php 一致的合成文档，节点/赏金/挑战键取自字典文件以命中翻译"""
+    rng = random.Random(seed)
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    nodes = _load_keys("node.json")
+    job_types = _load_keys("ExportBounties.json")
+    challenge_paths = [k for k in _load_keys("dict_zh.json") if '/Challenges/' in k]
+    missions = ['MT_SURVIVAL', 'MT_DEFENSE', 'MT_EXTERMINATION', 'MT_CAPTURE', 'MT_SABOTAGE', 'MT_RESCUE']
+    counter = iter(range(1, 1 << 30))
+
+    def oid():
+        return {'$oid': '%024x' % next(counter)}
+
+    def window(hours_left):
+        return {'Activation': _date(now_ms - HOUR_MS), 'Expiry': _date(now_ms + int(hours_left * HOUR_MS))}
+
+    def job_list():
+        # 混入一个字典中不存在的 jobType，覆盖回退路径
+        chosen = [rng.choice(job_types) for _ in range(jobs)] + ['/Lotus/Types/Gameplay/Bench/Jobs/Unknown']
+        return [{'jobType': j, 'masteryReq': rng.randint(0, 10), 'minEnemyLevel': 5, 'maxEnemyLevel': 25,
+                 'rewards': '/Lotus/Types/Game/MissionDecks/Bench'} for j in chosen]
+
+    return {
+        'WorldSeed': 'bench', 'Version': 19, 'Time': now_ms // 1000,
+        'Events': [{'_id': oid(), 'Date': _date(now_ms - HOUR_MS),
+                    'Messages': [{'LanguageCode': lang, 'Message': f'Bench news {i} ({lang})'}
+                                 for lang in ('en', 'zh', 'ru', 'de')]} for i in range(6)],
+        'Alerts': [dict(window(rng.uniform(0.5, 6)), _id=oid(), MissionInfo={
+            'missionType': rng.choice(missions), 'faction': 'FC_GRINEER', 'location': rng.choice(nodes),
+            'missionReward': {'credits': 10000}}) for _ in range(alerts)],
+        'Sorties': [dict(window(20), _id=oid(), Boss='SORTIE_BOSS_HEK', Variants=[
+            {'missionType': rng.choice(missions), 'modifierType': 'SORTIE_MODIFIER_LOW_ENERGY',
+             'node': rng.choice(nodes)} for _ in range(3)])],
+        'LiteSorties': [dict(window(100), _id=oid(), Boss='SORTIE_BOSS_BOREAL', Missions=[
+            {'missionType': rng.choice(missions), 'node': rng.choice(nodes)} for _ in range(3)])],
+        'SyndicateMissions': (
+            [dict(window(5), _id=oid(), Tag=tag, Nodes=rng.sample(nodes, 7))
+             for tag in ('ArbitersSyndicate', 'CephalonSudaSyndicate', 'NewLokaSyndicate', 'PerrinSyndicate',
+                         'RedVeilSyndicate', 'SteelMeridianSyndicate')]
+            + [dict(window(2), _id=oid(), Tag=tag, Nodes=[], Jobs=job_list())
+               for tag in ('CetusSyndicate', 'SolarisSyndicate', 'EntratiSyndicate')]),
+        'ActiveMissions': [dict(window(rng.uniform(0.1, 2)), _id=oid(), Region=rng.randint(1, 20), Seed=i,
+                                Node=rng.choice(nodes), MissionType=rng.choice(missions),
+                                Modifier=f'VoidT{rng.randint(1, 6)}', **({'Hard': True} if i % 3 == 0 else {}))
+                           for i in range(fissures)],
+        'Invasions': [{'_id': oid(), 'Faction': 'FC_GRINEER', 'Node': rng.choice(nodes),
+                       'Count': rng.randint(-30000, 30000), 'Goal': 30000, 'Completed': i % 5 == 0,
+                       'Activation': _date(now_ms - HOUR_MS)} for i in range(invasions)],
+        'VoidTraders': [dict(window(40), _id=oid(), Character="Baro'Ki Teel", Node='PlutoHUB',
+                             Manifest=[{'ItemType': f'/Lotus/StoreItems/Bench/Item{i}', 'PrimePrice': 300,
+                                        'RegularPrice': 100000} for i in range(30)])],
+        'VoidStorms': [dict(window(rng.uniform(0.2, 1)), _id=oid(), Node=f'CrewBattleNode{500 + i}',
+                            ActiveMissionTier=f'VoidT{rng.randint(1, 4)}') for i in range(storms)],
+        'SeasonInfo': dict(window(1000), Season=14, Phase=0, AffiliationTag='RadioLegionIntermission12Syndicate',
+                           ActiveChallenges=[dict(window(24 if i < 3 else 168), _id=oid(), Daily=i < 3,
+                                                  Challenge=rng.choice(challenge_paths))
+                                             for i in range(challenges)]),
+        # 监控程序不读取的大数组，用于衡量按板块解码的收益
+        'FlashSales': [{'TypeName': f'/Lotus/StoreItems/Bench/Sale{i}', 'Discount': i % 4 * 10,
+                        'StartDate': _date(now_ms), 'EndDate': _date(now_ms + 24 * HOUR_MS)}
+                       for i in range(flash_sales)],
+        'DailyDeals': [],
+        'PrimeVaultTraders': [{'Manifest': [{'ItemType': f'/Lotus/StoreItems/Bench/Vault{i}'}
+                                            for i in range(flash_sales)]}],
+    }
+
+
+# 合成夹具：名称 -> 生成参数
+SYNTHETIC_FIXTURES = {
+    'synthetic-typical': {},
+    'synthetic-large': {'fissures': 600, 'storms': 200, 'jobs': 300, 'challenges': 400, 'invasions': 200,
+                        'alerts': 100, 'flash_sales': 5000},
+}
+
+
+def load_fixtures(include_synthetic=True, now_ms=None):
+    """返回 {名称: 原始 JSON 字节串}：fixtures/ 下录制的 worldState 文档加上合成文档"""
+    corpus = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, '*.json'))):
+        with open(path, 'rb') as f:
+            corpus[os.path.splitext(os.path.basename(path))[0]] = f.read()
+    if include_synthetic:
+        for name, params in SYNTHETIC_FIXTURES.items():
+            corpus[name] = json.dumps(make_world_state(now_ms=now_ms, **params), ensure_ascii=False).encode('utf-8')
+    return corpus
+
+
+def record_fixture(url, name=None, timeout=30):
+    """抓取一份真实的 worldState 写入 fixtures/，返回文件路径
+
+    响应体原样保存，不重新格式化；不是 worldState 文档（缺少 Time）时抛出 ValueError。
+    """
+    import requests
+    response = requests.get(url, timeout=timeout)
+    response.raise_for_status()
+    data = json.loads(response.content)
+    if not isinstance(data, dict) or 'Time' not in data:
+        raise ValueError(f"{url} 返回的不是 worldState 文档")
+    if name is None:
+        name = time.strftime('worldstate-%Y%m%d-%H%M%S', time.gmtime(data['Time']))
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    path = os.path.join(FIXTURE_DIR, name + '.json')
+    with open(path, 'wb') as f:
+        f.write(response.content)
+    return path
+
+
+class FixtureServer:
+    """在本地线程中模拟 worldState.php，支持 ETag/If-None-Match"""
+
+    def __init__(self, body, host='127.0.0.1', port=0):
+        self.body = body
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                body = server.body
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer((host, port), Handler)
+        self.url = f"http://{host}:{self.httpd.server_address[1]}/dynamic/worldState.php"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
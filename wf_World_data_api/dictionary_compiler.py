@@ -0,0 +1,428 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+
+from mapping_registry import file_signature
+from models import syndicate_key
+
+CHUNK_SIZE = 256 * 1024
+FRAGMENT_DIR = ".fragments"
+# 片段缓存格式版本，修改提取规则时递增
+FRAGMENT_FORMAT_VERSION = 2
+
+# 输出文件名与 lookups 中注册的字典一致，dict 文件按语言命名
+NAMES_FILE = "wfdata.json"
+NODES_FILE = "node.json"
+BOUNTIES_FILE = "ExportBounties.json"
+DICT_FILE = "dict_{locale}.json"
+
+# 语言字典中除赏金标题外还需要的键：赏金任务标题都在 *Jobs/ 目录下
+DICT_KEY_PATTERN = re.compile(r'^/Lotus/Language/[^/]*Jobs/')
+# WFCD 节点名称 "Galatea (Neptune)"
+_WFCD_NODE = re.compile(r'^(.*) \((.*)\)$')
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# 对象成员的键和冒号；导出文件中绝大多数值也是普通字符串，用正则直接取出，避免逐个调用解码器
+_MEMBER_KEY = re.compile(r'[ \t\n\r]*"([^"\\]*(?:\\.[^"\\]*)*)"[ \t\n\r]*:[ \t\n\r]*', re.S)
+_STRING_VALUE = re.compile(r'"([^"\\]*(?:\\.[^"\\]*)*)"[ \t\n\r]*([,}\]])', re.S)
+_DECODER = json.JSONDecoder()
+# 数字中可能出现的字符：解码结果后面紧跟这些字符时，数字可能被块边界截断
+_NUMBER_CHARS = frozenset('0123456789+-.eE')
+
+
+def _unescape(raw):
+    return json.loads('"' + raw + '"') if '\\' in raw else raw
+
+
+class JsonStream:
+    """按块读取的 JSON 流：逐个遍历对象成员和数组元素，不把整个文件读入内存
+
+    只有当前正在解码的单个值需要完整放在缓冲区中，导出文件里动辄几十 MB 的
+    顶层数组可以逐个元素处理。
+    """
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """跳过空白，返回下一个字符"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("JSON 意外结束")
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"JSON 格式错误: 位置 {self.pos} 处期望 {char!r}")
+        self.pos += 1
+
+    def value(self):
+        """完整解码下一个值（也用于跳过不需要的值）"""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+                # 数字可能被块边界截断（"1.5e" 后面还有 "-3"），后面是数字以外的字符才能确认读完
+                if self.eof or (end < len(self.buf) and self.buf[end] not in _NUMBER_CHARS):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def _separator(self, close):
+        char = self.peek()
+        self.pos += 1
+        if char == close:
+            return False
+        if char != ',':
+            raise ValueError(f"JSON 格式错误: 位置 {self.pos - 1} 处期望 ',' 或 {close!r}")
+        return True
+
+    def _match(self, pattern):
+        """在缓冲区当前位置匹配 pattern，必要时读入更多内容；匹配必须在缓冲区末尾之前结束"""
+        while True:
+            match = pattern.match(self.buf, self.pos)
+            if match is not None and (match.end() < len(self.buf) or self.eof):
+                return match
+            if match is None and self.eof:
+                return None
+            if not self._fill() and match is None:
+                return None
+
+    def members(self):
+        """遍历当前对象，逐个产出键；调用方必须读取（value/members/elements）对应的值"""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            match = self._match(_MEMBER_KEY)
+            if match is None:
+                raise ValueError(f"JSON 格式错误: 位置 {self.pos} 处期望对象的键")
+            self.pos = match.end()
+            yield _unescape(match.group(1))
+            if not self._separator('}'):
+                return
+
+    def string_or_value(self):
+        """读取下一个值，普通字符串走正则快速路径"""
+        if self.peek() == '"':
+            match = self._match(_STRING_VALUE)
+            if match is not None:
+                # 只消费字符串本身，分隔符留给 members/elements 处理
+                self.pos = match.start(2)
+                return _unescape(match.group(1))
+        return self.value()
+
+    def elements(self):
+        """遍历当前数组，每个元素产出一次；调用方必须读取该元素"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield
+            if not self._separator(']'):
+                return
+
+    def items(self):
+        for key in self.members():
+            yield key, self.string_or_value()
+
+    def find(self, *path):
+        """沿对象键路径前进到目标值之前，跳过路径之外的所有成员；找不到时返回 False"""
+        for name in path:
+            for key in self.members():
+                if key == name:
+                    break
+                self.value()
+            else:
+                return False
+        return True
+
+
+def _open_stream(path):
+    # utf-8-sig：部分导出文件带 BOM
+    return open(path, 'r', encoding='utf-8-sig')
+
+
+def _fragment():
+    return {'names': {}, 'nodes': {}, 'dict': {}, 'bounties': {}}
+
+
+def extract_regions(path, wanted=None):
+    """Public Export 的 ExportRegions_<语言>.json：节点 -> "星系-节点名" """
+    fragment = _fragment()
+    with _open_stream(path) as f:
+        stream = JsonStream(f)
+        if stream.find('ExportRegions'):
+            for _ in stream.elements():
+                region = stream.value()
+                if region.get('uniqueName') and region.get('name'):
+                    system = region.get('systemName')
+                    name = f"{system}-{region['name']}" if system else region['name']
+                    fragment['nodes'][region['uniqueName']] = name
+    return fragment
+
+
+def extract_solnodes(path, wanted=None):
+    """WFCD 的 solNodes.json：{"SolNode1": {"value": "Galatea (Neptune)"}} -> "Neptune-Galatea" """
+    fragment = _fragment()
+    with _open_stream(path) as f:
+        for key, entry in JsonStream(f).items():
+            value = entry.get('value') if isinstance(entry, dict) else entry
+            if not value:
+                continue
+            match = _WFCD_NODE.match(value)
+            fragment['nodes'][key] = f"{match.group(2)}-{match.group(1)}" if match else value
+    return fragment
+
+
+def _wfcd_category(category, to_key=None):
+    """to_key 把文件中的键转换为监控程序查找时使用的键"""
+    def extract(path, wanted=None):
+        """WFCD 的 {"KEY": {"value": "名称"}} 形式文件"""
+        fragment = _fragment()
+        names = fragment['names'][category] = {}
+        with _open_stream(path) as f:
+            for key, entry in JsonStream(f).items():
+                value = entry.get('value', entry.get('name')) if isinstance(entry, dict) else entry
+                if isinstance(value, str):
+                    names[key if to_key is None else to_key(key)] = value
+        return fragment
+    return extract
+
+
+def extract_sortie_bosses(path, wanted=None):
+    """WFCD 的 sortieData.json 中的 bosses"""
+    fragment = _fragment()
+    bosses = fragment['names']['bosses'] = {}
+    with _open_stream(path) as f:
+        stream = JsonStream(f)
+        if stream.find('bosses'):
+            for key, entry in stream.items():
+                name = entry.get('name') if isinstance(entry, dict) else entry
+                if isinstance(name, str):
+                    bosses[key] = name
+    return fragment
+
+
+def extract_nightwave(path, wanted=None):
+    """Public Export 的 ExportNightwave_<语言>.json：挑战 uniqueName -> 名称"""
+    fragment = _fragment()
+    with _open_stream(path) as f:
+        stream = JsonStream(f)
+        if stream.find('ExportNightwave', 'challenges'):
+            for _ in stream.elements():
+                challenge = stream.value()
+                if challenge.get('uniqueName') and challenge.get('name'):
+                    fragment['dict'][challenge['uniqueName']] = challenge['name']
+    return fragment
+
+
+def extract_bounties(path, wanted=None):
+    """赏金 jobType -> 语言键 的映射文件（与 ExportBounties.json 相同格式）"""
+    fragment = _fragment()
+    with _open_stream(path) as f:
+        for key, value in JsonStream(f).items():
+            if isinstance(value, str):
+                fragment['bounties'][key] = value
+    return fragment
+
+
+def extract_dict(path, wanted=None):
+    """public-export-plus 的 dict.<语言>.json：只保留赏金用到的语言键和 *Jobs/ 下的标题"""
+    fragment = _fragment()
+    wanted = wanted or set()
+    with _open_stream(path) as f:
+        for key, value in JsonStream(f).items():
+            if isinstance(value, str) and (key in wanted or DICT_KEY_PATTERN.match(key)):
+                fragment['dict'][key] = value
+    return fragment
+
+
+# 输入种类 -> 提取函数
+EXTRACTORS = {
+    'regions': extract_regions,
+    'solnodes': extract_solnodes,
+    'missions': _wfcd_category('missions'),
+    'factions': _wfcd_category('factions'),
+    # syndicatesData.json 的键是完整的 Tag（ArbitersSyndicate），监控程序按 syndicate_key(Tag) 查找
+    'syndicates': _wfcd_category('syndicates', syndicate_key),
+    'modifiers': _wfcd_category('Modifier'),
+    'bosses': extract_sortie_bosses,
+    'nightwave': extract_nightwave,
+    'bounties': extract_bounties,
+    'dict': extract_dict,
+}
+
+# WFCD warframe-worldstate-data 的 data/<语言>/ 目录中各文件对应的输入种类
+WFCD_FILES = {
+    'solNodes.json': 'solnodes',
+    'missionTypes.json': 'missions',
+    'factionsData.json': 'factions',
+    'syndicatesData.json': 'syndicates',
+    'fissureModifiers.json': 'modifiers',
+    'sortieData.json': 'bosses',
+}
+
+
+def _merge(target, fragment):
+    for name in ('nodes', 'dict', 'bounties'):
+        target[name].update(fragment[name])
+    for category, names in fragment['names'].items():
+        target['names'].setdefault(category, {}).update(names)
+
+
+def _write_json(path, data):
+    """紧凑格式写入，内容没有变化时不改动文件（监控程序按 mtime 判断字典是否需要重新加载）"""
+    text = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == text:
+                return False
+    except OSError:
+        pass
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+    return True
+
+
+def _load_base(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class DictionaryCompiler:
+    """从 Public Export / WFCD 导出文件编译某个语言的紧凑字典
+
+    每个输入文件流式读取，只提取监控程序会查到的键，结果作为片段缓存在
+    out_dir/.fragments 中并记录源文件的 mtime/size；再次编译时只重新处理
+    发生变化的输入，然后合并所有片段。base_dir 中人工整理的字典优先于导出数据。
+    """
+
+    def __init__(self, out_dir, locale='zh', base_dir=None):
+        self.out_dir = out_dir
+        self.locale = locale
+        self.base_dir = base_dir
+        self.inputs = []  # [(种类, 路径)]
+
+    def add_input(self, kind, path):
+        if kind not in EXTRACTORS:
+            raise ValueError(f"未知输入种类: {kind}（可选: {', '.join(EXTRACTORS)}）")
+        self.inputs.append((kind, path))
+
+    def add_wfcd_dir(self, directory):
+        """加入 WFCD data/<语言>/ 目录中所有认识的文件"""
+        found = 0
+        for filename, kind in WFCD_FILES.items():
+            path = os.path.join(directory, filename)
+            if os.path.exists(path):
+                self.add_input(kind, path)
+                found += 1
+        return found
+
+    def _fragment_path(self, kind, path):
+        digest = hashlib.sha1(f"{kind}:{os.path.abspath(path)}".encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.out_dir, FRAGMENT_DIR, f"{kind}-{digest}.json")
+
+    def _fragment(self, kind, path, wanted=None):
+        """返回 (片段, 是否重新提取)"""
+        signature = file_signature(path)
+        if signature is None:
+            raise FileNotFoundError(path)
+        # dict 的提取结果还取决于需要哪些语言键
+        wanted_hash = hashlib.sha1('\n'.join(sorted(wanted)).encode('utf-8')).hexdigest() if wanted else None
+        key = [FRAGMENT_FORMAT_VERSION, list(signature), wanted_hash]
+        fragment_path = self._fragment_path(kind, path)
+        cached = _load_base(fragment_path)
+        if cached.get('key') == key:
+            return cached['fragment'], False
+        fragment = EXTRACTORS[kind](path, wanted)
+        os.makedirs(os.path.dirname(fragment_path), exist_ok=True)
+        _write_json(fragment_path, {'key': key, 'fragment': fragment})
+        return fragment, True
+
+    def build(self):
+        """编译并写出字典，返回 {'rebuilt': [...], 'reused': [...], 'written': [...]}"""
+        os.makedirs(self.out_dir, exist_ok=True)
+        merged = _fragment()
+        stats = {'rebuilt': [], 'reused': [], 'written': []}
+        base = {name: _load_base(os.path.join(self.base_dir, filename)) if self.base_dir else {}
+                for name, filename in (('names', NAMES_FILE), ('nodes', NODES_FILE),
+                                       ('bounties', BOUNTIES_FILE), ('dict', DICT_FILE.format(locale=self.locale)))}
+
+        # 先处理赏金映射，语言字典需要据此知道保留哪些键
+        ordered = sorted(self.inputs, key=lambda item: item[0] == 'dict')
+        for kind, path in ordered:
+            wanted = None
+            if kind == 'dict':
+                wanted = set(merged['bounties'].values()) | set(base['bounties'].values())
+            fragment, rebuilt = self._fragment(kind, path, wanted)
+            _merge(merged, fragment)
+            stats['rebuilt' if rebuilt else 'reused'].append(path)
+
+        # 人工整理的条目覆盖导出数据
+        for category, names in base['names'].items():
+            if isinstance(names, dict):
+                merged['names'].setdefault(category, {}).update(names)
+        for name in ('nodes', 'bounties', 'dict'):
+            merged[name].update(base[name])
+
+        outputs = ((NAMES_FILE, merged['names']), (NODES_FILE, merged['nodes']),
+                   (BOUNTIES_FILE, merged['bounties']), (DICT_FILE.format(locale=self.locale), merged['dict']))
+        for filename, data in outputs:
+            if _write_json(os.path.join(self.out_dir, filename), data):
+                stats['written'].append(filename)
+        return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="从 Public Export / WFCD 导出文件编译紧凑字典")
+    parser.add_argument('--out', metavar='DIR', required=True, help="输出目录（每个语言一个目录）")
+    parser.add_argument('--locale', default='zh', help="语言代码，决定 dict_<语言>.json 的文件名")
+    parser.add_argument('--base', metavar='DIR', help="人工整理的字典目录，其中的条目优先")
+    parser.add_argument('--wfcd', metavar='DIR', help="warframe-worldstate-data 的 data/<语言>/ 目录")
+    for kind in EXTRACTORS:
+        parser.add_argument(f'--{kind}', metavar='FILE', action='append', default=[],
+                            help=(EXTRACTORS[kind].__doc__ or '').strip())
+    args = parser.parse_args()
+
+    compiler = DictionaryCompiler(args.out, args.locale, args.base)
+    if args.wfcd and not compiler.add_wfcd_dir(args.wfcd):
+        parser.error(f"{args.wfcd} 中没有可识别的 WFCD 数据文件")
+    for kind in EXTRACTORS:
+        for path in getattr(args, kind):
+            compiler.add_input(kind, path)
+    if not compiler.inputs:
+        parser.error("没有指定任何输入文件")
+    try:
+        stats = compiler.build()
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    print(f"✅重新提取 {len(stats['rebuilt'])} 个输入，复用 {len(stats['reused'])} 个缓存片段")
+    print(f"📝写入: {', '.join(stats['written']) or '无变化'}")
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import time
+from collections import deque
+
+from metrics import metrics
+
+DEFAULT_HISTORY = 1024  # 保留最近多少条事件供断线重连的客户端补发
+DEFAULT_CLIENT_BUFFER = 64  # 每个连接最多积压多少条未写出的事件，超过即断开
+KEEPALIVE_SECONDS = 15
+DRAIN_TIMEOUT = 10  # 写出一批事件最多等待多久，超时的连接视为慢消费者断开
+
+EVENT_STREAM_CONTENT_TYPE = "text/event-stream; charset=utf-8"
+KEEPALIVE_FRAME = b": keep-alive\n\n"
+
+
+def encode_frame(event_id, event, payload):
+    """编码一条 SSE 事件；payload 为已序列化的单行 JSON 字节串"""
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event_id, event.encode('utf-8'), payload)
+
+
+def change_payload(section, version, changes):
+    """一个板块在一次更新中的变化列表"""
+    return {
+        'section': section,
+        'version': version,
+        'changes': [{
+            'kind': change.kind,
+            'key': change.key,
+            'entity': change.entity.as_dict(),
+            'fields': sorted(change.fields) if change.fields else [],
+        } for change in changes],
+    }
+
+
+class Subscriber:
+    """一个推送连接：订阅的板块和尚未写出的事件
+
+    事件以 (编号, 帧) 的形式积压在有界队列中，连接写得太慢导致积压超过 limit 时
+    标记为 dropped 并调用 on_drop（连接处理方设置为中断连接），阻塞在写出上的连接
+    也会立即断开；客户端带 Last-Event-ID 重连后从历史中补发。
+    """
+
+    def __init__(self, sections, limit=DEFAULT_CLIENT_BUFFER):
+        self.sections = frozenset(sections)
+        self.limit = limit
+        self.frames = deque()
+        self.ready = asyncio.Event()
+        self.dropped = False
+        self.on_drop = None
+
+    def offer(self, event_id, frame):
+        if self.dropped:
+            return
+        if len(self.frames) >= self.limit:
+            self.drop()
+        else:
+            self.frames.append((event_id, frame))
+        self.ready.set()
+
+    def drop(self):
+        """断开这个慢消费者，丢弃积压的事件"""
+        if self.dropped:
+            return
+        self.dropped = True
+        self.frames.clear()
+        self.ready.set()
+        if self.on_drop is not None:
+            self.on_drop()
+
+    async def wait(self, timeout=KEEPALIVE_SECONDS):
+        """等待新事件，返回积压的 [(编号, 帧)]；超时返回空列表"""
+        if not self.frames and not self.dropped:
+            self.ready.clear()
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        frames = list(self.frames)
+        self.frames.clear()
+        return frames
+
+
+class EventHub:
+    """变化事件的扇出中心
+
+    每条事件只序列化一次，同一份字节串写给所有订阅了该板块的连接。事件编号从启动时的
+    毫秒时间戳开始递增，进程重启后旧编号一定小于新历史的起点，客户端会收到完整快照。
+    """
+
+    def __init__(self, history=DEFAULT_HISTORY, client_buffer=DEFAULT_CLIENT_BUFFER):
+        self.client_buffer = client_buffer
+        self.last_id = int(time.time() * 1000)
+        self._history = deque(maxlen=history)  # (编号, 板块, 帧)
+        self._by_section = {}  # 板块 -> 订阅者集合
+
+    def has_subscribers(self):
+        return bool(self._by_section)
+
+    def subscribe(self, sections):
+        subscriber = Subscriber(sections, self.client_buffer)
+        for section in subscriber.sections:
+            self._by_section.setdefault(section, set()).add(subscriber)
+        metrics.inc('push_connections_total', result='opened')
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        for section in subscriber.sections:
+            listeners = self._by_section.get(section)
+            if listeners is not None:
+                listeners.discard(subscriber)
+                if not listeners:
+                    del self._by_section[section]
+        metrics.inc('push_connections_total', result='dropped' if subscriber.dropped else 'closed')
+
+    def publish(self, section, payload, event='change'):
+        """序列化一次并发给该板块的所有订阅者，返回事件编号"""
+        self.last_id += 1
+        frame = encode_frame(self.last_id, event, json.dumps(payload, ensure_ascii=False,
+                                                             separators=(',', ':')).encode('utf-8'))
+        self._history.append((self.last_id, section, frame))
+        listeners = self._by_section.get(section, ())
+        for subscriber in listeners:
+            subscriber.offer(self.last_id, frame)
+        metrics.inc('push_events_total', log=False, section=section)
+        metrics.inc('push_frames_total', len(listeners), log=False)
+        return self.last_id
+
+    def publish_changes(self, changes, version):
+        """发布 diff_snapshots() 的结果，每个有变化的板块一条事件"""
+        for section, events in changes.items():
+            self.publish(section, change_payload(section, version, events))
+
+    def replay(self, last_id, sections):
+        """last_id 之后属于 sections 的事件帧；历史中已经没有 last_id 之后的全部事件时返回 None"""
+        if last_id is None or last_id > self.last_id:
+            return None
+        if last_id == self.last_id:
+            return []
+        if not self._history or self._history[0][0] > last_id + 1:
+            return None
+        return [(event_id, frame) for event_id, section, frame in self._history
+                if event_id > last_id and section in sections]
@@ -0,0 +1,202 @@
+from lookups import DEFAULT_LOCALE, register_dictionaries
+from mapping_index import compile_mapping_table
+from mapping_registry import MappingRegistry
+from metrics import metrics
+from models import syndicate_key
+from sections import SECTIONS
+
+# 新闻消息缺少某个语言时使用的语言
+FALLBACK_MESSAGE_LOCALE = "en"
+
+# 板块 JSON 中的显示名称字段 -> 对应的 worldState 原始键字段
+LOCALIZED_FIELDS = {
+    'node_name': 'node',
+    'node_names': 'nodes',
+    'mission_type_name': 'mission_type',
+    'faction_name': 'faction',
+    'tier_name': 'tier',
+    'boss_name': 'boss',
+}
+# name 字段的原始键取决于记录类型：赏金任务、午夜电波挑战、集团
+NAME_SOURCES = (
+    ('job_type', lambda value: value),
+    ('challenge', lambda value: value),
+    ('tag', syndicate_key),
+)
+
+
+class KeyTable:
+    """worldState 原始键 -> 整数编号，所有语言共用；编号只增不减"""
+
+    def __init__(self):
+        self._ids = {}
+
+    def __len__(self):
+        return len(self._ids)
+
+    def intern(self, key):
+        key_id = self._ids.get(key)
+        if key_id is None:
+            key_id = self._ids[key] = len(self._ids)
+        return key_id
+
+    def get(self, key):
+        return self._ids.get(key)
+
+
+class LocaleTable:
+    """一个语言的名称数组，下标为 KeyTable 中的编号，没有翻译的位置为 None"""
+
+    def __init__(self, locale, directory):
+        self.locale = locale
+        self.directory = directory
+        self.registry = MappingRegistry()
+        register_dictionaries(self.registry, directory, locale)
+        self.names = None
+        self._signatures = None
+
+    def load(self, keys):
+        """编译该语言的字典并按 keys 的编号展开，编译用的中间字典随后丢弃"""
+        with metrics.stage('dictionary'):
+            self._signatures = self.registry.signatures()
+            self.registry.refresh()
+            table = compile_mapping_table(self.registry)
+            names = [None] * len(keys)
+            for key, name in table.items():
+                key_id = keys.intern(key)
+                if key_id >= len(names):
+                    names.extend([None] * (key_id + 1 - len(names)))
+                names[key_id] = name
+            self.names = names
+
+    def is_stale(self):
+        return self.names is None or self.registry.signatures() != self._signatures
+
+    def get(self, key_id):
+        if key_id is None or key_id >= len(self.names):
+            return None
+        return self.names[key_id]
+
+
+class Localizer:
+    """把板块 JSON 一次遍历翻译成多个语言
+
+    原始键只在 KeyTable 中保存一份，每个语言只多出一个名称数组和名称字符串本身。
+    基础语言（zh）直接使用快照中已有的名称，不需要名称数组；其他语言缺少翻译时
+    也沿用基础语言的结果。
+    """
+
+    def __init__(self, base_locale=DEFAULT_LOCALE):
+        self.base_locale = base_locale
+        self.keys = KeyTable()
+        self._tables = {}  # 语言 -> LocaleTable
+
+    def add_locale(self, locale, directory):
+        """登记一个语言的字典目录（dictionary_compiler.py 的输出），第一次翻译时才加载"""
+        if locale == self.base_locale:
+            raise ValueError(f"{locale} 是基础语言，使用 --data-dir 指定其字典目录")
+        self._tables[locale] = LocaleTable(locale, directory)
+
+    @property
+    def locales(self):
+        return (self.base_locale,) + tuple(self._tables)
+
+    def refresh(self):
+        """重新加载字典文件有变化（或尚未加载）的语言，返回被加载的语言列表"""
+        loaded = []
+        for locale, table in self._tables.items():
+            if table.is_stale():
+                table.load(self.keys)
+                loaded.append(locale)
+        return loaded
+
+    def name(self, key, locale, default=None):
+        """单个原始键在某个语言中的名称"""
+        table = self._tables.get(locale)
+        if table is None:
+            return default
+        if table.names is None:
+            table.load(self.keys)
+        name = table.get(self.keys.get(key))
+        return default if name is None else name
+
+    def resolve(self, payload, locales=None):
+        """把一个板块的 JSON（SECTIONS[...].payload 的结果）翻译成多个语言
+
+        返回 {语言: JSON}；原始键只查一次编号，各语言的结果共享未翻译的标量值。
+        """
+        locales = self.locales if locales is None else tuple(locales)
+        unknown = [locale for locale in locales if locale != self.base_locale and locale not in self._tables]
+        if unknown:
+            raise ValueError(f"未配置的语言: {', '.join(unknown)}（可选: {', '.join(self.locales)}）")
+        tables = []
+        for locale in locales:
+            table = self._tables.get(locale)
+            if table is not None and table.names is None:
+                table.load(self.keys)
+            tables.append(table)
+        with metrics.stage('localize'):
+            results = self._resolve(payload, locales, tables)
+        return dict(zip(locales, results))
+
+    def resolve_sections(self, snapshot, sections, locales=None):
+        """一次遍历把快照的多个板块翻译成多个语言，返回 {语言: {板块: JSON}}"""
+        locales = self.locales if locales is None else tuple(locales)
+        resolved = {locale: {} for locale in locales}
+        for section in sections:
+            for locale, data in self.resolve(SECTIONS[section].payload(snapshot), locales).items():
+                resolved[locale][section] = data
+        return resolved
+
+    def _names(self, raw, fallback, tables):
+        if isinstance(raw, (list, tuple)):
+            # node_names 与 nodes 一一对应
+            columns = [self._names(key, name, tables) for key, name in zip(raw, fallback)]
+            return [[column[i] for column in columns] for i in range(len(tables))]
+        key_id = self.keys.get(raw) if isinstance(raw, str) else None
+        names = []
+        for table in tables:
+            name = None if table is None else table.get(key_id)
+            names.append(fallback if name is None else name)
+        return names
+
+    def _raw_key(self, record, field):
+        source = LOCALIZED_FIELDS.get(field)
+        if source is not None:
+            return record.get(source)
+        if field == 'name':
+            for source, to_key in NAME_SOURCES:
+                if source in record:
+                    return to_key(record[source])
+        return None
+
+    def _resolve(self, value, locales, tables):
+        """返回与 tables 等长的列表，每个元素为该语言的结果"""
+        if isinstance(value, dict):
+            results = [{} for _ in tables]
+            for field, item in value.items():
+                raw = self._raw_key(value, field)
+                if raw is not None:
+                    column = self._names(raw, item, tables)
+                else:
+                    column = self._resolve(item, locales, tables)
+                for result, translated in zip(results, column):
+                    result[field] = translated
+            messages = value.get('messages')
+            if isinstance(messages, dict):
+                # 新闻在解析时已按语言代码索引，这里每个语言只查一次
+                for result, locale in zip(results, locales):
+                    result['message'] = messages.get(locale, messages.get(FALLBACK_MESSAGE_LOCALE))
+            return results
+        if isinstance(value, (list, tuple)):
+            columns = [self._resolve(item, locales, tables) for item in value]
+            return [[column[i] for column in columns] for i in range(len(tables))]
+        return [value] * len(tables)
+
+
+def parse_locale_spec(value):
+    """解析 "en=dictionaries/en" 形式的语言字典目录"""
+    locale, sep, directory = value.partition('=')
+    if not sep or not locale or not directory:
+        raise ValueError(f"语言字典目录格式应为 语言=目录: {value}")
+    return locale.strip(), directory.strip()
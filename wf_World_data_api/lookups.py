@@ -0,0 +1,157 @@
+import json
+import os
+
+from mapping_index import MappingIndex
+from mapping_registry import MappingRegistry
+
+# 字典文件所在目录：默认为本模块所在目录（与工作目录无关），可用环境变量或 set_data_dir() 指定
+DATA_DIR_ENV = "WF_DATA_DIR"
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 名称映射文件名（相对于字典目录）
+MAPPING_FILE = "wfdata.json"
+NODE_MAPPING_FILE = "node.json"  # 新增节点映射文件路径
+CHALLENGE_MAPPING_FILE = "dict_zh.json"
+LOCALE_DICT_FILE = "dict_{locale}.json"  # 其他语言的字典目录中对应 dict_zh.json 的文件
+DEFAULT_LOCALE = "zh"
+BOUNTY_MAPPING_FILE = "ExportBounties.json"
+INDEX_CACHE_FILE = ".mapping_index.bin"  # 预编译查找表缓存
+
+def _empty_name_mappings():
+    # 如果文件不存在，返回空映射
+    return {
+        "missions": {},
+        "factions": {},
+        "bosses": {},
+        "syndicates": {},
+    }
+
+def register_dictionaries(registry, directory, locale=DEFAULT_LOCALE):
+    """在 registry 中登记 directory 下的字典文件；只登记路径，文件在第一次查找时才读取
+
+    语言字典始终登记为 'dict_zh'（compile_mapping_table 和板块注册表使用这个名称），
+    文件名随 locale 变化。
+    """
+    dict_file = CHALLENGE_MAPPING_FILE if locale == DEFAULT_LOCALE else LOCALE_DICT_FILE.format(locale=locale)
+    registry.register('names', os.path.join(directory, MAPPING_FILE), default=_empty_name_mappings)
+    registry.register('nodes', os.path.join(directory, NODE_MAPPING_FILE),
+                      missing_message=f"⚠️节点映射文件 {NODE_MAPPING_FILE} 不存在")
+    registry.register('dict_zh', os.path.join(directory, dict_file),
+                      missing_message=f"⚠️ 警告：{dict_file} 文件未找到，将使用原始路径显示")
+    registry.register('bounties', os.path.join(directory, BOUNTY_MAPPING_FILE),
+                      missing_message=f"⚠️加载映射文件时出错: {BOUNTY_MAPPING_FILE} 不存在")
+
+# 所有查找函数共用的字典注册表
+mappings = MappingRegistry()
+data_dir = os.path.abspath(os.environ.get(DATA_DIR_ENV) or PACKAGE_DIR)
+register_dictionaries(mappings, data_dir)
+
+# 由上述字典编译出的扁平查找表，所有 extract_* 函数都通过它查找
+mapping_index = MappingIndex(mappings, os.path.join(data_dir, INDEX_CACHE_FILE))
+
+def data_path(filename):
+    """字典目录下的文件路径（各种缓存文件默认放在这里，与工作目录无关）"""
+    return os.path.join(data_dir, filename)
+
+def set_data_dir(directory):
+    """改用 directory 中的字典文件，已加载的字典和查找表在下次查找时重新读取"""
+    global data_dir
+    data_dir = os.path.abspath(directory)
+    register_dictionaries(mappings, data_dir)
+    mapping_index.relocate(os.path.join(data_dir, INDEX_CACHE_FILE))
+    return data_dir
+
+def load_name_mappings():
+    """加载名称映射"""
+    return mappings.get('names')
+
+def load_node_mappings():
+    """加载节点映射"""
+    return mappings.get('nodes')
+
+def save_name_mappings(mappings_data):
+    """保存名称映射"""
+    with open(mappings.path('names'), 'w', encoding='utf-8') as f:
+        json.dump(mappings_data, f, ensure_ascii=False, indent=2)
+    mapping_index.refresh()
+
+def extract_modifier_name(modifier_key):
+    """从修饰符键中提取可读的裂隙等级名称"""
+    if not modifier_key:
+        return "未知等级"
+    
+    # 从映射文件中查找
+    if modifier_key in mapping_index:
+        return mapping_index.get(modifier_key)
+    
+    # 如果映射文件中没有，返回原始键（清理一下显示）
+    clean_key = modifier_key.replace('Void', '').replace('Storm', '风暴')
+    return clean_key
+
+def extract_node_name(node_key):
+    """从节点映射中提取节点名称"""
+    return mapping_index.get(node_key, node_key)
+
+def load_challenge_mapping():
+    """加载挑战名称映射"""
+    return mappings.get('dict_zh')
+
+def extract_challenge_name(challenge_path, challenge_mapping=None):
+    """从映射中提取挑战名称"""
+    if challenge_mapping is None:
+        challenge_mapping = mapping_index
+    if challenge_path in challenge_mapping:
+        return challenge_mapping[challenge_path]
+    else:
+        # 如果映射中没有找到，尝试从路径中提取最后一部分作为备用
+        parts = challenge_path.split('/')
+        return parts[-1] if parts else challenge_path
+
+def map_bounty_name(job_type, export_bounties=None, dict_zh=None):
+    """使用两级映射获取赏金任务的中文名称"""
+    if not job_type:
+        return "未知赏金"
+    if export_bounties is None and dict_zh is None:
+        # 预编译查找表中已经合并了两级映射
+        if job_type in mapping_index:
+            return mapping_index.get(job_type)
+        parts = job_type.split('/')
+        return parts[-1] if parts else job_type
+    export_bounties = export_bounties or {}
+    dict_zh = dict_zh or {}
+    
+    # 第一级映射：从jobType到语言键
+    language_key = export_bounties.get(job_type, "")
+    if not language_key:
+        # 如果第一级映射失败，尝试直接使用jobType的最后部分
+        parts = job_type.split('/')
+        return parts[-1] if parts else job_type
+    
+    # 第二级映射：从语言键到中文名称
+    chinese_name = dict_zh.get(language_key, "")
+    if chinese_name:
+        return chinese_name
+    
+    # 如果第二级映射失败，返回语言键的最后部分
+    parts = language_key.split('/')
+    return parts[-1] if parts else language_key
+
+def extract_name(key, category=None):
+    """从映射中提取名称，统一在预编译查找表中查找
+
+    category 仅为兼容旧的调用方式而保留，查找时不再使用。
+    """
+    return mapping_index.get(key, key)
+
+def extract_archon_name(archon_key):
+    """从执行官键中提取可读的执行官名称"""
+    if not archon_key:
+        return "未知执行官"
+    
+    # 从映射中查找（wfdata.json中的bosses映射）
+    if archon_key in mapping_index:
+        return mapping_index.get(archon_key)
+    
+    # 如果映射中没有，返回清理后的名称
+    clean_name = archon_key.replace('SORTIE_BOSS_', '').replace('ARCHON_', '')
+    return clean_name
@@ -0,0 +1,198 @@
+import marshal
+import os
+
+from metrics import metrics
+
+# 编译缓存格式版本，修改表结构时递增
+INDEX_FORMAT_VERSION = 1
+MAX_REPORTED_CONFLICTS = 5  # 每次编译最多逐条打印几个冲突
+
+
+def _add_entries(table, origins, conflicts, source, entries):
+    for key, name in entries.items():
+        previous = origins.get(key)
+        if previous is not None and previous != source and table[key] != name:
+            conflicts.append((key, previous, table[key], source, name))
+        table[key] = name
+        origins[key] = source
+
+
+def _report_conflicts(conflicts):
+    """打印被覆盖的映射，查找表仍按合并顺序由后合并的字典决定"""
+    metrics.inc('dictionary_conflicts_total', len(conflicts))
+    for key, previous, old_name, source, name in conflicts[:MAX_REPORTED_CONFLICTS]:
+        print(f"⚠️ 警告：原始键 {key} 在 {previous} 中为 {old_name!r}，在 {source} 中为 {name!r}，使用后者")
+    if len(conflicts) > MAX_REPORTED_CONFLICTS:
+        print(f"⚠️ 警告：另有 {len(conflicts) - MAX_REPORTED_CONFLICTS} 个原始键在多个字典中的名称不同")
+
+
+def compile_mapping_table(registry, sources=None):
+    """把字典合并成一张以 worldState 原始标识符为键的扁平查找表
+
+    赏金任务的两级映射（jobType -> 语言键 -> 中文）在这里一次性解析完成，
+    未命中第二级映射时预先存入语言键最后一段作为备用名称。
+    sources 为要合并的字典名称，None 表示全部；未列出的字典文件不会被读取。
+    查找时不区分类别，同一个键在不同字典或类别中名称不同时按合并顺序
+    dict_zh < bounties < wfdata.json（按类别顺序）< node.json 由后者决定，
+    并打印冲突所在的文件，不会因为一条冲突的条目而无法显示。
+    """
+    sources = registry.names() if sources is None else sources
+    table = {}
+    origins = {}  # 键 -> 来源文件（wfdata.json 带类别），只在编译期间使用
+    conflicts = []
+
+    def source_name(name, category=None):
+        filename = os.path.basename(registry.path(name))
+        return filename if category is None else f"{filename}[{category}]"
+
+    if 'dict_zh' in sources:
+        _add_entries(table, origins, conflicts, source_name('dict_zh'), registry.get('dict_zh'))
+
+    if 'bounties' in sources:
+        dict_zh = registry.get('dict_zh')
+        resolved = {}
+        for job_type, language_key in registry.get('bounties').items():
+            chinese_name = dict_zh.get(language_key, "")
+            if not chinese_name:
+                parts = language_key.split('/')
+                chinese_name = parts[-1] if parts else language_key
+            resolved[job_type] = chinese_name
+        _add_entries(table, origins, conflicts, source_name('bounties'), resolved)
+
+    if 'names' in sources:
+        for category, entries in registry.get('names').items():
+            if isinstance(entries, dict):
+                _add_entries(table, origins, conflicts, source_name('names', category), entries)
+
+    if 'nodes' in sources:
+        _add_entries(table, origins, conflicts, source_name('nodes'), registry.get('nodes'))
+    if conflicts:
+        _report_conflicts(conflicts)
+    return table
+
+
+def _covers(cached, current):
+    """缓存中的签名是否覆盖当前需要的所有字典且没有变化"""
+    return all(name in cached and cached[name] == signature for name, signature in current.items())
+
+
+class MappingIndex:
+    """预编译的扁平查找表，带磁盘缓存
+
+    缓存文件用 marshal 保存 (格式版本, 源文件签名, 查找表)；只要源字典文件的
+    mtime/size 没有变化，启动时只读取这一个文件，不解析任何 JSON 字典。
+    通过 select() 可以只编译选中板块需要的字典：部分字典的查找表写入以字典名称
+    区分的单独文件（见 cache_file），不会覆盖完整查找表的缓存；完整缓存可用时
+    部分选择直接读取完整缓存。
+    """
+
+    def __init__(self, registry, cache_path):
+        self.registry = registry
+        self.cache_path = cache_path
+        self.sources = None  # 需要的字典名称，None 表示全部
+        self.generation = 0  # 查找表每次重新载入或编译时递增，翻译结果的缓存据此失效
+        self._signatures = None
+        self._table = None
+
+    def relocate(self, cache_path):
+        """改用另一个缓存文件（字典目录改变时），查找表在下次查找时重新载入"""
+        self.cache_path = cache_path
+        self._signatures = None
+        self._table = None
+
+    def select(self, sources):
+        """只使用指定的字典，下次查找时按需加载"""
+        sources = None if sources is None else tuple(sources)
+        if sources != self.sources:
+            self.sources = sources
+            self._table = None
+
+    @property
+    def cache_file(self):
+        """当前选择的字典对应的缓存文件"""
+        if self.sources is None or set(self.sources) >= set(self.registry.names()):
+            return self.cache_path
+        root, ext = os.path.splitext(self.cache_path)
+        return f"{root}.{'+'.join(sorted(self.sources))}{ext}"
+
+    @property
+    def table(self):
+        if self._table is None:
+            self._load()
+        return self._table
+
+    def get(self, key, default=None):
+        try:
+            return self.table[key]
+        except KeyError:
+            metrics.inc('dictionary_misses_total', log=False)
+            return default
+
+    def __getitem__(self, key):
+        return self.table[key]
+
+    def __contains__(self, key):
+        # 调用方在未命中时使用备用名称，这里统一计数
+        if key in self.table:
+            return True
+        metrics.inc('dictionary_misses_total', log=False)
+        return False
+
+    def _load(self):
+        with metrics.stage('dictionary'):
+            self._load_table()
+
+    def _load_table(self):
+        signatures = self.registry.signatures(self.sources)
+        for path in dict.fromkeys((self.cache_file, self.cache_path)):
+            cached = self._read_cache(path)
+            if cached is not None and _covers(cached[0], signatures):
+                self._signatures, self._table = cached
+                self.generation += 1
+                return
+        self.rebuild(signatures)
+
+    def _read_cache(self, path):
+        try:
+            with open(path, 'rb') as f:
+                version, signatures, table = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if version != INDEX_FORMAT_VERSION:
+            return None
+        return signatures, table
+
+    def rebuild(self, signatures=None):
+        """从源字典重新编译查找表并写入缓存"""
+        if signatures is None:
+            signatures = self.registry.signatures(self.sources)
+        self.registry.refresh()
+        self._table = compile_mapping_table(self.registry, self.sources)
+        self._signatures = signatures
+        self.generation += 1
+        self._write_cache()
+        return self._table
+
+    def _write_cache(self):
+        # 源文件签名中的 mtime 是整数，marshal 可以直接序列化
+        payload = (INDEX_FORMAT_VERSION, self._signatures, self._table)
+        path = self.cache_file
+        tmp_path = path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                marshal.dump(payload, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ 警告：写入映射缓存 {path} 失败: {e}")
+
+    def refresh(self):
+        """源字典文件有变化时重新编译，返回是否发生了重新编译"""
+        if self._table is None:
+            self._load()
+            return False
+        signatures = self.registry.signatures(self.sources)
+        if _covers(self._signatures, signatures):
+            return False
+        with metrics.stage('dictionary'):
+            self.rebuild(signatures)
+        return True
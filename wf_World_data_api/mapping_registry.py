@@ -0,0 +1,76 @@
+import json
+import os
+
+
+def file_signature(path):
+    """返回文件的 (mtime, size) 签名，文件不存在时返回 None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def load_json_file(path, default=None, missing_message=None):
+    """读取 JSON 字典文件，文件缺失或损坏时返回默认值"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        if missing_message:
+            print(missing_message)
+    except Exception as e:
+        print(f"⚠️ 警告：加载 {path} 时出错: {e}")
+    return {} if default is None else default()
+
+
+class MappingRegistry:
+    """字典文件注册表
+
+    每个字典只解析一次并在所有模块之间共享；调用 refresh() 时检查文件的
+    mtime/size，只有发生变化的文件才会重新加载。查找本身不做任何文件系统操作。
+    """
+
+    def __init__(self):
+        self._sources = {}
+        self._entries = {}
+
+    def register(self, name, path, default=None, missing_message=None):
+        """注册一个字典文件；default 为文件缺失时返回空映射的工厂函数"""
+        self._sources[name] = (path, default, missing_message)
+        self._entries.pop(name, None)
+
+    def path(self, name):
+        return self._sources[name][0]
+
+    def get(self, name):
+        """获取已解析的字典，首次访问时加载"""
+        entry = self._entries.get(name)
+        if entry is None:
+            entry = self._load(name)
+        return entry[1]
+
+    def _load(self, name):
+        path, default, missing_message = self._sources[name]
+        signature = file_signature(path)
+        data = load_json_file(path, default, missing_message)
+        entry = (signature, data)
+        self._entries[name] = entry
+        return entry
+
+    def refresh(self):
+        """检查已加载的字典文件，重新加载发生变化的文件，返回被重新加载的名称列表"""
+        reloaded = []
+        for name, (signature, _) in list(self._entries.items()):
+            if file_signature(self._sources[name][0]) != signature:
+                self._load(name)
+                reloaded.append(name)
+        return reloaded
+
+    def names(self):
+        return tuple(self._sources)
+
+    def signatures(self, names=None):
+        """返回注册文件当前的签名，names 为 None 时返回全部"""
+        names = self._sources if names is None else names
+        return {name: file_signature(self._sources[name][0]) for name in names}
@@ -0,0 +1,182 @@
+import json
+import os
+import sys
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# 延迟直方图的桶上界（秒），覆盖从单个板块渲染到完整上游抓取的范围
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 导出时的指标说明：名称 -> (类型, 说明)
+METRIC_HELP = {
+    'stage_seconds': ('histogram', "各处理阶段耗时（fetch/decode/dictionary/parse/localize/diff/match/render/publish/api）"),
+    'section_render_seconds': ('histogram', "每个板块的渲染耗时"),
+    'upstream_requests_total': ('counter', "上游 worldState 请求次数，按结果分类"),
+    'upstream_bytes_total': ('counter', "从上游读取的响应体字节数"),
+    'errors_total': ('counter', "失败次数，按阶段和异常类型分类"),
+    'dictionary_misses_total': ('counter', "字典查找未命中、使用备用名称的次数"),
+    'dictionary_conflicts_total': ('counter', "编译查找表时在多个字典中名称不同、由后合并的字典决定的原始键数"),
+    'section_cache_total': ('counter', "板块缓存命中/未命中次数（原始输入未变时复用解析结果）"),
+    'api_requests_total': ('counter', "接口服务处理的请求数，按路径和状态码分类"),
+    'push_connections_total': ('counter', "推送连接的建立/关闭次数，dropped 为因积压过多被断开"),
+    'push_events_total': ('counter', "发布的推送事件数（每条只序列化一次）"),
+    'push_frames_total': ('counter', "写给各连接的推送事件份数"),
+}
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+class Histogram:
+    """固定桶的延迟直方图，导出为 Prometheus 的累计桶格式"""
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """进程内的计数器和延迟直方图
+
+    计数和观测只是字典查找加整数运算，可以常开；render() 生成 Prometheus 文本
+    格式，enable_log() 之后每次观测还会以一行 JSON 写入结构化日志。
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self.log_stream = None
+
+    def enable_log(self, stream):
+        """把每次观测写成一行 JSON；stream 为文件对象，None 表示关闭"""
+        self.log_stream = stream
+
+    def _log(self, name, labels, value):
+        record = {'ts': round(time.time(), 3), 'metric': name, 'value': value}
+        record.update(labels)
+        self.log_stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.log_stream.flush()
+
+    def inc(self, name, value=1, log=True, **labels):
+        """增加计数；log 为 False 时不写结构化日志（用于高频计数）"""
+        key = (name, _label_key(labels))
+        self.counters[key] = self.counters.get(key, 0) + value
+        if log and self.log_stream is not None:
+            self._log(name, labels, value)
+
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(value)
+        if self.log_stream is not None:
+            self._log(name, labels, round(value, 6))
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """记录代码块耗时；代码块抛出异常时不记录耗时"""
+        start = time.perf_counter()
+        yield
+        self.observe(name, time.perf_counter() - start, **labels)
+
+    def stage(self, stage):
+        return self.timer('stage_seconds', stage=stage)
+
+    def error(self, stage, exc):
+        """记录一次失败，按阶段和异常类型计数"""
+        self.inc('errors_total', stage=stage, type=type(exc).__name__)
+
+    def value(self, name, **labels):
+        return self.counters.get((name, _label_key(labels)), 0)
+
+    def reset(self):
+        self.counters.clear()
+        self.histograms.clear()
+
+    def export(self):
+        """当前的计数和直方图，可 JSON 序列化，供另一个进程用 merge() 合并"""
+        return {
+            'counters': [[name, labels, value] for (name, labels), value in self.counters.items()],
+            'histograms': [[name, labels, h.counts, h.sum, h.count] for (name, labels), h in self.histograms.items()],
+        }
+
+    def merge(self, exported):
+        """把 export() 的结果累加到本集合中（多进程模式汇总发布进程和工作进程的指标）"""
+        for name, labels, value in exported.get('counters', ()):
+            key = (name, tuple(map(tuple, labels)))
+            self.counters[key] = self.counters.get(key, 0) + value
+        for name, labels, counts, total, count in exported.get('histograms', ()):
+            key = (name, tuple(map(tuple, labels)))
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+            histogram.sum += total
+            histogram.count += count
+
+    def render(self, prefix='warframe_'):
+        """生成 Prometheus 文本格式（version 0.0.4）"""
+        by_name = {}
+        for (name, labels), value in self.counters.items():
+            by_name.setdefault(name, []).append((labels, value))
+        for (name, labels), histogram in self.histograms.items():
+            by_name.setdefault(name, []).append((labels, histogram))
+
+        lines = []
+        for name in sorted(by_name):
+            full_name = prefix + name
+            kind, help_text = METRIC_HELP.get(name, ('untyped', name))
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            for labels, value in sorted(by_name[name], key=lambda item: item[0]):
+                if not isinstance(value, Histogram):
+                    lines.append(f"{full_name}{_format_labels(labels)} {value}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, value.counts):
+                    cumulative += count
+                    lines.append(f"{full_name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{full_name}_bucket{_format_labels(labels, [('le', '+Inf')])} {value.count}")
+                lines.append(f"{full_name}_sum{_format_labels(labels)} {value.sum:.6f}")
+                lines.append(f"{full_name}_count{_format_labels(labels)} {value.count}")
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path):
+        """把当前指标写入文本文件（供 node_exporter textfile collector 读取）"""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        # 原子替换，采集端不会读到写了一半的文件
+        os.replace(tmp_path, path)
+
+
+def open_log(path):
+    """打开结构化日志输出，"-" 表示标准错误"""
+    if path == '-':
+        return sys.stderr
+    return open(path, 'a', encoding='utf-8')
+
+
+# 所有模块共用的指标集合
+metrics = Metrics()
@@ -0,0 +1,401 @@
+import time
+
+from lookups import (
+    extract_archon_name,
+    extract_challenge_name,
+    extract_modifier_name,
+    extract_name,
+    extract_node_name,
+    map_bounty_name,
+    mapping_index,
+)
+
+# 主要集团（显示集团任务）
+MAIN_SYNDICATES = ('SteelMeridian', 'Arbiters', 'CephalonSuda', 'Perrin', 'RedVeil', 'NewLoka')
+
+# 开放世界赏金地点
+BOUNTY_LOCATIONS = (
+    ('CetusSyndicate', '地球希图斯'),
+    ('SolarisSyndicate', '金星福尔图娜'),
+    ('EntratiSyndicate', '火卫二殁世幽都'),
+)
+
+# 执行官任务的 Boss 关键字
+ARCHON_KEYWORDS = ('ARCHON', 'NIRA', 'AMAR', 'BOREAL')
+
+
+def parse_date(value):
+    """把 {'$date': {'$numberLong': ...}} 转换为 epoch 秒，无法解析时返回 None"""
+    if not isinstance(value, dict):
+        return None
+    date = value.get('$date')
+    if isinstance(date, dict):
+        date = date.get('$numberLong')
+    if not date:
+        return None
+    try:
+        return int(date) // 1000
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_oid(item):
+    """提取 worldState 条目的 _id.$oid"""
+    oid = item.get('_id')
+    if isinstance(oid, dict):
+        return oid.get('$oid')
+    return oid
+
+
+def is_expired(expiry, now=None):
+    """expiry 为 None 时视为未过期"""
+    if expiry is None:
+        return False
+    return (time.time() if now is None else now) >= expiry
+
+
+def _plain(value):
+    if isinstance(value, Record):
+        return value.as_dict()
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    return value
+
+
+class Record:
+    """带 __slots__ 的紧凑记录基类，字段顺序即 __slots__ 顺序"""
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def as_dict(self):
+        """转换为可 JSON 序列化的字典"""
+        return {name: _plain(getattr(self, name)) for name in self.__slots__}
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, n) == getattr(other, n) for n in self.__slots__)
+
+    def __repr__(self):
+        fields = ', '.join(f"{n}={getattr(self, n)!r}" for n in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class Alert(Record):
+    __slots__ = ('id', 'activation', 'expiry', 'mission_type', 'faction', 'node', 'credits',
+                 'mission_type_name', 'faction_name', 'node_name')
+
+
+class Invasion(Record):
+    __slots__ = ('id', 'activation', 'node', 'faction', 'count', 'goal', 'completed',
+                 'node_name', 'faction_name')
+
+    @property
+    def progress(self):
+        return (abs(self.count) / self.goal * 100) if self.goal > 0 else 0
+
+
+class NewsEvent(Record):
+    # messages: {语言代码: 消息}
+    __slots__ = ('id', 'listed', 'messages')
+
+
+class SortieMission(Record):
+    __slots__ = ('mission_type', 'modifier', 'node', 'mission_type_name', 'node_name')
+
+
+class Sortie(Record):
+    __slots__ = ('id', 'activation', 'expiry', 'boss', 'boss_name', 'variants')
+
+
+class ArchonHunt(Record):
+    __slots__ = ('id', 'activation', 'expiry', 'boss', 'boss_name', 'missions')
+
+
+class Fissure(Record):
+    __slots__ = ('id', 'activation', 'expiry', 'node', 'mission_type', 'tier', 'hard',
+                 'node_name', 'mission_type_name', 'tier_name')
+
+
+class VoidStorm(Record):
+    __slots__ = ('id', 'activation', 'expiry', 'node', 'tier', 'node_name', 'tier_name')
+
+
+class VoidTrader(Record):
+    __slots__ = ('id', 'activation', 'expiry', 'character', 'node', 'node_name', 'manifest_size')
+
+
+class SyndicateBoard(Record):
+    __slots__ = ('id', 'tag', 'name', 'activation', 'expiry', 'nodes', 'node_names')
+
+
+class Bounty(Record):
+    __slots__ = ('job_type', 'name', 'mastery_req', 'min_level', 'max_level')
+
+
+class BountyBoard(Record):
+    __slots__ = ('id', 'tag', 'location', 'activation', 'expiry', 'jobs')
+
+
+class NightwaveChallenge(Record):
+    __slots__ = ('id', 'activation', 'expiry', 'challenge', 'name', 'daily', 'mapped')
+
+
+class Nightwave(Record):
+    __slots__ = ('season', 'phase', 'activation', 'expiry', 'challenges')
+
+
+class WorldSnapshot(Record):
+    """一次 worldState 的解析结果，所有 display_* 函数都从这里渲染"""
+    __slots__ = ('time', 'alerts', 'invasions', 'events', 'sorties', 'archon_hunt',
+                 'fissures', 'fissures_by_tier', 'void_storms', 'storms_by_tier',
+                 'void_traders', 'syndicate_boards', 'syndicate_count', 'bounty_boards',
+                 'nightwave')
+
+
+def group_by(records, attr):
+    """按属性分组，返回按键排序的 {键: [记录]}"""
+    groups = {}
+    for record in records:
+        groups.setdefault(getattr(record, attr), []).append(record)
+    return {key: groups[key] for key in sorted(groups)}
+
+
+def _parse_alert(alert):
+    mission_info = alert.get('MissionInfo', {})
+    mission_type = mission_info.get('missionType', '未知')
+    faction = mission_info.get('faction', '未知')
+    node = mission_info.get('location', '未知地点')
+    return Alert(parse_oid(alert), parse_date(alert.get('Activation')), parse_date(alert.get('Expiry')),
+                 mission_type, faction, node, mission_info.get('missionReward', {}).get('credits', 0),
+                 extract_name(mission_type), extract_name(faction),
+                 extract_node_name(node))
+
+
+def _parse_invasion(invasion):
+    node = invasion.get('Node', '未知节点')
+    faction = invasion.get('Faction', '未知')
+    return Invasion(parse_oid(invasion), parse_date(invasion.get('Activation')), node, faction,
+                    invasion.get('Count', 0), invasion.get('Goal', 0), invasion.get('Completed', False),
+                    extract_node_name(node), extract_name(faction))
+
+
+def _parse_event(event):
+    messages = {}
+    for msg in event.get('Messages', []):
+        # 同一语言只保留第一条
+        messages.setdefault(msg.get('LanguageCode'), msg.get('Message', '无描述'))
+    return NewsEvent(parse_oid(event), 'EventEndDate' in event or 'Date' in event, messages)
+
+
+def _parse_sortie_mission(mission, modifier_key=None):
+    mission_type = mission.get('missionType', '未知')
+    node = mission.get('node', '未知地点')
+    modifier = None
+    if modifier_key:
+        modifier = mission.get(modifier_key, '无').replace('SORTIE_MODIFIER_', '')
+    return SortieMission(mission_type, modifier, node,
+                         extract_name(mission_type), extract_node_name(node))
+
+
+def _parse_sortie(sortie):
+    boss = sortie.get('Boss', '未知')
+    variants = tuple(_parse_sortie_mission(v, 'modifierType') for v in sortie.get('Variants', []))
+    return Sortie(parse_oid(sortie), parse_date(sortie.get('Activation')), parse_date(sortie.get('Expiry')),
+                  boss, extract_name(boss), variants)
+
+
+def _parse_archon_hunt(lite_sortie):
+    boss = lite_sortie.get('Boss', '未知执行官')
+    missions = tuple(_parse_sortie_mission(m) for m in lite_sortie.get('Missions', []))
+    return ArchonHunt(parse_oid(lite_sortie), parse_date(lite_sortie.get('Activation')),
+                      parse_date(lite_sortie.get('Expiry')), boss, extract_archon_name(boss), missions)
+
+
+def _parse_fissure(mission):
+    node = mission.get('Node', '未知节点')
+    mission_type = mission.get('MissionType', '未知')
+    tier = mission.get('Modifier', 'VoidT?')
+    return Fissure(parse_oid(mission), parse_date(mission.get('Activation')), parse_date(mission.get('Expiry')),
+                   node, mission_type, tier, bool(mission.get('Hard')),
+                   extract_node_name(node), extract_name(mission_type), extract_modifier_name(tier))
+
+
+def _parse_void_storm(storm):
+    node = storm.get('Node', '未知节点')
+    tier = storm.get('ActiveMissionTier', '未知等级')
+    return VoidStorm(parse_oid(storm), parse_date(storm.get('Activation')), parse_date(storm.get('Expiry')),
+                     node, tier, extract_node_name(node), extract_modifier_name(tier))
+
+
+def _parse_void_trader(trader):
+    node = trader.get('Node', '未知地点')
+    return VoidTrader(parse_oid(trader), parse_date(trader.get('Activation')), parse_date(trader.get('Expiry')),
+                      trader.get('Character', ''), node, extract_node_name(node.replace('HUB', '中继站')),
+                      len(trader.get('Manifest', [])))
+
+
+def syndicate_key(tag):
+    """集团 Tag（如 "ArbitersSyndicate"）在 wfdata.json syndicates 中的键"""
+    return tag.replace('Syndicate', '').replace('_', ' ').strip()
+
+
+def _parse_syndicate_board(syndicate, tag):
+    name = extract_name(syndicate_key(tag))
+    node_ids = syndicate.get('Nodes', [])
+    if not isinstance(node_ids, list):
+        node_ids = []
+    return SyndicateBoard(parse_oid(syndicate), tag, name, parse_date(syndicate.get('Activation')),
+                          parse_date(syndicate.get('Expiry')), tuple(node_ids),
+                          tuple(extract_node_name(n) for n in node_ids))
+
+
+def _parse_bounty_board(syndicate, tag, location):
+    jobs = tuple(Bounty(job.get('jobType', ''), map_bounty_name(job.get('jobType', '')),
+                        job.get('masteryReq', 0), job.get('minEnemyLevel', 0), job.get('maxEnemyLevel', 0))
+                 for job in syndicate.get('Jobs', []))
+    return BountyBoard(parse_oid(syndicate), tag, location, parse_date(syndicate.get('Activation')),
+                       parse_date(syndicate.get('Expiry')), jobs)
+
+
+def _parse_nightwave(season_info):
+    challenges = []
+    for challenge in season_info.get('ActiveChallenges', []):
+        path = challenge.get('Challenge', '')
+        # 只查一次查找表：是否命中同时决定名称和 mapped 字段，未命中只计数一次
+        mapped = path in mapping_index
+        name = mapping_index[path] if mapped else extract_challenge_name(path, {})
+        challenges.append(NightwaveChallenge(
+            parse_oid(challenge), parse_date(challenge.get('Activation')), parse_date(challenge.get('Expiry')),
+            path, name, bool(challenge.get('Daily')), mapped))
+    return Nightwave(season_info.get('Season', 0), season_info.get('Phase', 0),
+                     parse_date(season_info.get('Activation')), parse_date(season_info.get('Expiry')),
+                     tuple(challenges))
+
+
+def _parse_syndicates(syndicates, with_boards, with_bounties):
+    """SyndicateMissions 只遍历一次，同时得到集团任务和开放世界赏金"""
+    bounty_locations = dict(BOUNTY_LOCATIONS)
+    syndicate_boards = []
+    bounty_boards = {}
+    for syndicate in syndicates:
+        if not isinstance(syndicate, dict):
+            continue
+        tag = syndicate.get('Tag', '')
+        if with_boards and any(main in tag for main in MAIN_SYNDICATES):
+            syndicate_boards.append(_parse_syndicate_board(syndicate, tag))
+        if with_bounties and tag in bounty_locations and tag not in bounty_boards:
+            bounty_boards[tag] = _parse_bounty_board(syndicate, tag, bounty_locations[tag])
+    return syndicate_boards, [bounty_boards[tag] for tag, _ in BOUNTY_LOCATIONS if tag in bounty_boards]
+
+
+class _SyndicateMissions:
+    """集团任务和赏金两个板块共用的 SyndicateMissions 解析结果
+
+    parse_world_state 每次解析创建一个实例，两个板块都选中时 SyndicateMissions 也只遍历一次。
+    """
+
+    def __init__(self, sections=None):
+        self.with_boards = sections is None or 'syndicates' in sections
+        self.with_bounties = sections is None or 'bounties' in sections
+        self._result = None
+
+    def _parse(self, data):
+        if self._result is None:
+            self._result = _parse_syndicates(data.get('SyndicateMissions', []), self.with_boards, self.with_bounties)
+        return self._result
+
+    def boards(self, data):
+        return {'syndicate_boards': self._parse(data)[0]}
+
+    def bounties(self, data):
+        return {'bounty_boards': self._parse(data)[1]}
+
+
+def _find_archon_hunt(lite_sorties):
+    for lite_sortie in lite_sorties:
+        if any(keyword in lite_sortie.get('Boss', '') for keyword in ARCHON_KEYWORDS):
+            return _parse_archon_hunt(lite_sortie)
+    return None
+
+
+def _parse_fissures(data):
+    fissures = [_parse_fissure(m) for m in data.get('ActiveMissions', [])
+                if m.get('Modifier', '').startswith('Void')]
+    return {'fissures': fissures, 'fissures_by_tier': group_by(fissures, 'tier')}
+
+
+def _parse_void_storms(data):
+    void_storms = [_parse_void_storm(s) for s in data.get('VoidStorms', [])]
+    return {'void_storms': void_storms, 'storms_by_tier': group_by(void_storms, 'tier')}
+
+
+def _parse_nightwave_section(data):
+    season_info = data.get('SeasonInfo', {})
+    return {'nightwave': _parse_nightwave(season_info) if season_info else None}
+
+
+# 板块名称（见 sections.py）-> 解码后的 worldState -> {快照字段: 值}
+SECTION_PARSERS = {
+    'alerts': lambda data: {'alerts': [_parse_alert(a) for a in data.get('Alerts', [])]},
+    'invasions': lambda data: {'invasions': [_parse_invasion(i) for i in data.get('Invasions', [])]},
+    'events': lambda data: {'events': [_parse_event(e) for e in data.get('Events', [])]},
+    'sorties': lambda data: {'sorties': [_parse_sortie(s) for s in data.get('Sorties', [])]},
+    'fissures': _parse_fissures,
+    'baro': lambda data: {'void_traders': [_parse_void_trader(t) for t in data.get('VoidTraders', [])]},
+    'syndicates': lambda data: _SyndicateMissions(['syndicates']).boards(data),
+    'bounties': lambda data: _SyndicateMissions(['bounties']).bounties(data),
+    'nightwave': _parse_nightwave_section,
+    'railjack': _parse_void_storms,
+    'archon': lambda data: {'archon_hunt': _find_archon_hunt(data.get('LiteSorties', []))},
+}
+
+
+def parse_world_state(data, sections=None, cache=None):
+    """把解码后的 worldState 转换为 WorldSnapshot
+
+    时间戳转换为 epoch 秒，节点、任务类型等原始键在这里一次性翻译完成。
+    sections 为板块名称集合（见 sections.py），未选中的板块不解析，对应字段为空；
+    cache 为 section_cache.SectionCache 时，原始输入没有变化的板块直接复用上次的解析结果。
+    """
+    fields = {
+        'alerts': [], 'invasions': [], 'events': [], 'sorties': [], 'archon_hunt': None,
+        'fissures': [], 'fissures_by_tier': {}, 'void_storms': [], 'storms_by_tier': {},
+        'void_traders': [], 'syndicate_boards': [], 'bounty_boards': [], 'nightwave': None,
+    }
+    syndicate_missions = _SyndicateMissions(sections)
+    parsers = dict(SECTION_PARSERS, syndicates=syndicate_missions.boards, bounties=syndicate_missions.bounties)
+    for name, parser in parsers.items():
+        if sections is not None and name not in sections:
+            continue
+        fields.update(parser(data) if cache is None else cache.parse(name, data, parser))
+
+    return WorldSnapshot(
+        data.get('Time'),
+        fields['alerts'],
+        fields['invasions'],
+        fields['events'],
+        fields['sorties'],
+        fields['archon_hunt'],
+        fields['fissures'],
+        fields['fissures_by_tier'],
+        fields['void_storms'],
+        fields['storms_by_tier'],
+        fields['void_traders'],
+        fields['syndicate_boards'],
+        len(data.get('SyndicateMissions', [])),
+        fields['bounty_boards'],
+        fields['nightwave'],
+    )
+
+
+def as_snapshot(data, sections=None):
+    """display_* 函数同时接受原始 worldState 字典和已解析的快照"""
+    if isinstance(data, WorldSnapshot):
+        return data
+    return parse_world_state(data, sections)
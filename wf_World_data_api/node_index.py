@@ -0,0 +1,95 @@
+from lookups import mappings
+from models import Record, is_expired
+
+# 带节点的板块（与 sections.SECTIONS 一致）-> 从快照取出带 node 字段的记录
+PLANET_SECTIONS = {
+    'alerts': lambda s: s.alerts,
+    'invasions': lambda s: s.invasions,
+    'sorties': lambda s: [variant for sortie in s.sorties for variant in sortie.variants],
+    'fissures': lambda s: s.fissures,
+    'baro': lambda s: s.void_traders,
+    'railjack': lambda s: s.void_storms,
+    'archon': lambda s: list(s.archon_hunt.missions) if s.archon_hunt else [],
+}
+
+
+class NodeInfo(Record):
+    """节点结构化信息：region 为星球的编号（按 node.json 中星球首次出现的顺序）"""
+    __slots__ = ('key', 'planet', 'name', 'region')
+
+
+class NodeIndex:
+    """由 node.json 构建的节点索引：节点键 -> NodeInfo，以及 星球 -> 节点键 的倒排索引
+
+    "水星-Apollodorus" 形式的显示名称只在构建时拆分一次；节点字典重新加载后
+    下次查询时自动重建。
+    """
+
+    def __init__(self, registry, name='nodes'):
+        self.registry = registry
+        self.name = name
+        self._source = None
+        self._nodes = {}
+        self._planets = {}  # 星球 -> frozenset(节点键)
+        self._regions = {}  # 星球 -> 编号
+
+    def _current(self):
+        source = self.registry.get(self.name)
+        if source is not self._source:
+            self._build(source)
+        return self
+
+    def _build(self, source):
+        nodes = {}
+        planets = {}
+        regions = {}
+        for key, display in source.items():
+            planet, sep, name = display.partition('-')
+            if not sep:
+                planet, name = None, display
+            else:
+                regions.setdefault(planet, len(regions))
+                planets.setdefault(planet, set()).add(key)
+            nodes[key] = NodeInfo(key, planet, name, regions.get(planet))
+        self._nodes = nodes
+        self._planets = {planet: frozenset(keys) for planet, keys in planets.items()}
+        self._regions = regions
+        self._source = source
+
+    def get(self, node_key):
+        """返回节点的 NodeInfo，未知节点返回 None"""
+        return self._current()._nodes.get(node_key)
+
+    def planet(self, node_key):
+        info = self.get(node_key)
+        return info.planet if info is not None else None
+
+    def nodes_on(self, planet):
+        """星球上所有节点键的集合，未知星球返回空集合"""
+        return self._current()._planets.get(planet, frozenset())
+
+    def region(self, planet):
+        return self._current()._regions.get(planet)
+
+    def planets(self):
+        """按编号排序的星球列表"""
+        regions = self._current()._regions
+        return sorted(regions, key=regions.get)
+
+    def records_on(self, snapshot, planet, sections=None, now=None):
+        """快照中位于 planet 上且尚未过期的记录，返回 {板块: [记录]}，只包含有记录的板块"""
+        nodes = self.nodes_on(planet)
+        found = {}
+        for section in sections or PLANET_SECTIONS:
+            select = PLANET_SECTIONS.get(section)
+            if select is None:
+                continue
+            records = [r for r in select(snapshot)
+                       if r.node in nodes and not is_expired(getattr(r, 'expiry', None), now)]
+            if records:
+                found[section] = records
+        return found
+
+
+# 所有模块共用的节点索引，第一次查询时由 node.json 构建
+node_index = NodeIndex(mappings)
@@ -0,0 +1,82 @@
+import heapq
+import random
+import time
+
+DEFAULT_GRACE = 5  # 边界时间之后再等待几秒，给上游留出更新时间
+DEFAULT_MIN_INTERVAL = 10
+DEFAULT_FALLBACK_INTERVAL = 300  # 入侵等没有时间边界的变化最多延迟这么久被发现
+DEFAULT_RETRY_DELAY = 2  # 抓取失败后第一次重试的等待秒数，之后逐次翻倍
+DEFAULT_MAX_RETRY_DELAY = 120
+
+
+def snapshot_boundaries(snapshot):
+    """列出快照中所有带时间的实体的 Activation/Expiry，返回 [(epoch 秒, 描述)]"""
+    timed = [('警报', a) for a in snapshot.alerts]
+    timed += [('虚空裂隙', f) for f in snapshot.fissures]
+    timed += [('虚空风暴', v) for v in snapshot.void_storms]
+    timed += [('突击', s) for s in snapshot.sorties]
+    timed += [('虚空商人', t) for t in snapshot.void_traders]
+    timed += [('集团任务', b) for b in snapshot.syndicate_boards]
+    timed += [('赏金', b) for b in snapshot.bounty_boards]
+    if snapshot.archon_hunt:
+        timed.append(('执行官', snapshot.archon_hunt))
+    if snapshot.nightwave:
+        timed += [('午夜电波', c) for c in snapshot.nightwave.challenges]
+
+    boundaries = []
+    for label, record in timed:
+        for when in (record.activation, record.expiry):
+            if when:
+                boundaries.append((when, label))
+    return boundaries
+
+
+def backoff_delay(failures, base=DEFAULT_RETRY_DELAY, cap=DEFAULT_MAX_RETRY_DELAY):
+    """连续失败 failures 次后的重试等待秒数：指数退避并加入随机抖动"""
+    if failures <= 0:
+        return 0
+    delay = min(cap, base * 2 ** (failures - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class RefreshScheduler:
+    """根据快照中的时间边界安排下一次抓取
+
+    用最小堆保存即将到来的 Activation/Expiry，下一次抓取安排在最近的边界之后
+    grace 秒；没有边界时按 fallback_interval 兜底，间隔始终在
+    [min_interval, fallback_interval] 之间。
+    """
+
+    def __init__(self, grace=DEFAULT_GRACE, min_interval=DEFAULT_MIN_INTERVAL,
+                 fallback_interval=DEFAULT_FALLBACK_INTERVAL):
+        self.grace = grace
+        self.min_interval = min_interval
+        self.fallback_interval = max(fallback_interval, min_interval)
+        self._heap = []
+
+    def update(self, snapshot, now=None):
+        """用新快照重建边界堆"""
+        now = time.time() if now is None else now
+        self._heap = [b for b in snapshot_boundaries(snapshot) if b[0] + self.grace > now]
+        heapq.heapify(self._heap)
+
+    def next_boundary(self, now=None):
+        """返回下一个尚未到达的边界 (epoch 秒, 描述)，没有时返回 None"""
+        now = time.time() if now is None else now
+        while self._heap and self._heap[0][0] + self.grace <= now:
+            heapq.heappop(self._heap)
+        return self._heap[0] if self._heap else None
+
+    def next_delay(self, now=None):
+        """距离下一次应当抓取的秒数"""
+        now = time.time() if now is None else now
+        boundary = self.next_boundary(now)
+        if boundary is None:
+            return self.fallback_interval
+        delay = boundary[0] + self.grace - now
+        return min(max(delay, self.min_interval), self.fallback_interval)
+
+    def due_at(self, now=None):
+        """下一次应当抓取的 epoch 时间"""
+        now = time.time() if now is None else now
+        return now + self.next_delay(now)
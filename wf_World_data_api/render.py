@@ -0,0 +1,251 @@
+import json
+import os
+import shutil
+import sys
+
+from models import Record
+
+INDENT = "   "
+RULE_WIDTH = 20
+REPORT_TITLE = "🎮WARFRAME 实时数据监控"
+
+
+class Field(Record):
+    """"• 标签: 值" 形式的一行，children 为缩进一级显示的子行"""
+    __slots__ = ('label', 'value', 'children', 'sep')
+
+    def __init__(self, label, value, children=(), sep=': '):
+        super().__init__(label, value, list(children), sep)
+
+
+class Item(Record):
+    """编号列表中的一项"""
+    __slots__ = ('index', 'text')
+
+
+class Notice(Record):
+    """提示信息（如 "📭当前无活跃警报"），文本格式中不缩进"""
+    __slots__ = ('text',)
+
+
+class Blank(Record):
+    """文本格式中的空行，用于分隔分组；其他格式忽略"""
+    __slots__ = ()
+
+
+class SectionView(Record):
+    """一个板块的显示模型：由快照构建一次，再序列化为各种输出格式
+
+    spaced 为 False 时文本格式的标题前不空行（报告中的第一个板块）。
+    """
+    __slots__ = ('name', 'heading', 'lines', 'spaced')
+
+    def __init__(self, name, heading, lines=(), spaced=True):
+        super().__init__(name, heading, list(lines), spaced)
+
+
+def _text_lines(lines, depth, out):
+    for line in lines:
+        kind = type(line)
+        if kind is Field:
+            out.append(f"{INDENT * depth}• {line.label}{line.sep}{line.value}")
+            _text_lines(line.children, depth + 1, out)
+        elif kind is Item:
+            out.append(f"{INDENT * depth}{line.index}. {line.text}")
+        elif kind is Notice:
+            out.append(line.text)
+        else:
+            out.append("")
+
+
+def text_section(view):
+    out = ["\n" + view.heading + ":" if view.spaced else view.heading + ":"]
+    _text_lines(view.lines, 1, out)
+    return "\n".join(out) + "\n"
+
+
+def text_report(parts, updated):
+    return ("\n" + "=" * RULE_WIDTH + "\n" + REPORT_TITLE + "\n" + "=" * RULE_WIDTH + "\n"
+            f"📅更新时间: {updated}\n" + "-" * RULE_WIDTH + "\n"
+            + "".join(parts) + "=" * RULE_WIDTH + "\n")
+
+
+def _markdown_lines(lines, depth, out):
+    indent = "  " * depth
+    for line in lines:
+        kind = type(line)
+        if kind is Field:
+            out.append(f"{indent}- **{line.label}**: {line.value}".rstrip())
+            _markdown_lines(line.children, depth + 1, out)
+        elif kind is Item:
+            out.append(f"{indent}{line.index}. {line.text}")
+        elif kind is Notice:
+            out.append(f"{indent}- {line.text}")
+
+
+def markdown_section(view):
+    out = [f"### {view.heading}", ""]
+    _markdown_lines(view.lines, 0, out)
+    return "\n".join(out) + "\n\n"
+
+
+def markdown_report(parts, updated):
+    return f"## {REPORT_TITLE}\n\n📅更新时间: {updated}\n\n" + "".join(parts)
+
+
+def _json_lines(lines):
+    result = []
+    for line in lines:
+        kind = type(line)
+        if kind is Field:
+            entry = {'type': 'field', 'label': line.label, 'value': line.value}
+            if line.children:
+                entry['children'] = _json_lines(line.children)
+            result.append(entry)
+        elif kind is Item:
+            result.append({'type': 'item', 'index': line.index, 'text': line.text})
+        elif kind is Notice:
+            result.append({'type': 'notice', 'text': line.text})
+    return result
+
+
+def json_section(view):
+    return json.dumps({'section': view.name, 'title': view.heading, 'lines': _json_lines(view.lines)},
+                      ensure_ascii=False)
+
+
+def json_report(parts, updated):
+    # 各板块已经序列化，这里只拼接，不再重新编码
+    return '{"updated": ' + json.dumps(updated) + ', "sections": [' + ', '.join(parts) + ']}\n'
+
+
+# 输出格式：名称 -> (板块序列化函数, 整份报告拼接函数)
+FORMATS = {
+    'text': (text_section, text_report),
+    'json': (json_section, json_report),
+    'markdown': (markdown_section, markdown_report),
+}
+
+
+class ReportRenderer:
+    """把板块显示模型序列化为报告，并按板块缓存序列化结果
+
+    同一板块的显示模型与上次相同（数据未变化，倒计时也没有跳变）时直接复用
+    上次的序列化文本，不同输出格式分别缓存。fmt 为标准输出使用的格式，
+    exports 为 [(格式, 文件路径)]，每轮刷新同一组显示模型写到所有输出。
+    """
+
+    def __init__(self, fmt='text', exports=()):
+        self.fmt = fmt
+        self.exports = list(exports)
+        self._cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def section(self, view, fmt='text'):
+        key = (view.name, fmt)
+        cached = self._cache.get(key)
+        if cached is not None and (cached[0] is view or cached[0] == view):
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        serialized = FORMATS[fmt][0](view)
+        self._cache[key] = (view, serialized)
+        return serialized
+
+    def report(self, views, updated, fmt='text'):
+        return FORMATS[fmt][1]([self.section(view, fmt) for view in views], updated)
+
+    def write(self, views, updated, stdout=True):
+        """把报告写到标准输出（stdout 为 True 时）和所有导出文件，每个输出一次写入"""
+        if stdout:
+            write_output(self.report(views, updated, self.fmt))
+        for fmt, path in self.exports:
+            write_output(self.report(views, updated, fmt), path)
+
+    def clear(self):
+        self._cache.clear()
+
+
+class LiveScreen:
+    """在终端上原地刷新的一屏文本，只重绘与上一帧不同的行
+
+    每帧的所有光标移动和文本一次写出；超过终端高度的行被截断。输出不是终端时
+    （重定向到文件）不使用控制序列，也不写状态行，报告只在所基于的数据变化时
+    整份写出一次，不会每秒写出一份只有倒计时不同的报告。
+    """
+
+    def __init__(self, stream=None):
+        self.stream = sys.stdout if stream is None else stream
+        self.interactive = self.stream.isatty()
+        self.lines = None  # 上一帧，None 表示下一帧需要清屏后完整绘制
+        self.version = None  # 非终端输出时上一次写出的报告所基于的数据
+
+    def draw(self, lines, status=None, version=None):
+        """绘制一帧，返回重绘的行数
+
+        status 为显示在最上面的刷新状态；version 标识报告所基于的数据（例如快照
+        对象），为 None 时按内容比较。
+        """
+        if not self.interactive:
+            return self._append(lines, version)
+        if status is not None:
+            # 状态行放在最上面，屏幕放不下时被截掉的是报告末尾
+            lines = [status] + lines
+        lines = lines[:max(shutil.get_terminal_size().lines - 1, 1)]
+        previous = self.lines
+        if previous == lines:
+            return 0
+        self.lines = list(lines)
+        if previous is None:
+            # 清屏后从左上角完整绘制
+            out = ["\x1b[2J\x1b[H", "\n".join(line + "\x1b[K" for line in lines)]
+            changed = len(lines)
+        else:
+            out = []
+            changed = 0
+            for row, line in enumerate(lines, 1):
+                if row > len(previous) or previous[row - 1] != line:
+                    out.append(f"\x1b[{row};1H{line}\x1b[K")
+                    changed += 1
+            if len(lines) < len(previous):
+                # 新的一帧更短，清除多出的旧行
+                out.append(f"\x1b[{len(lines) + 1};1H\x1b[J")
+        # 光标停在最后一行之后
+        out.append(f"\x1b[{len(lines) + 1};1H")
+        self.stream.write("".join(out))
+        self.stream.flush()
+        return changed
+
+    def _append(self, lines, version):
+        if not lines or (version is not None and version is self.version) or lines == self.lines:
+            return 0
+        self.version = version
+        self.lines = list(lines)
+        self.stream.write("\n".join(lines) + "\n")
+        self.stream.flush()
+        return len(lines)
+
+    def reset(self):
+        """其他输出打乱了屏幕内容，下一帧清屏后完整重绘"""
+        self.lines = None
+
+
+def write_output(text, path=None):
+    """一次写出整份报告：path 为空时写到标准输出，否则写临时文件后原子替换"""
+    if path is None:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+        return
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def parse_export(value):
+    """解析 "markdown=report.md" 形式的导出参数，返回 (格式, 路径)"""
+    fmt, sep, path = value.partition('=')
+    if not sep or not path or fmt not in FORMATS:
+        raise ValueError(f"无效的导出参数: {value}（格式为 FORMAT=FILE，可选格式: {', '.join(FORMATS)}）")
+    return fmt, path
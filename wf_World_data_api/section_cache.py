@@ -0,0 +1,61 @@
+from lookups import mapping_index
+from metrics import metrics
+from sections import SECTIONS
+
+
+class SectionCache:
+    """按板块原始输入的内容哈希缓存解析（翻译）结果和显示模型
+
+    板块的签名由它读取的 worldState 顶层键的原始字节哈希（DecodedWorldState.digests）
+    和查找表的 generation 组成；签名与上一轮相同时直接复用上一轮的快照字段。
+    不依赖当前时间的板块连显示模型也一并复用；计时板块（裂隙、警报、虚空商人、
+    执行官）复用翻译好的记录，只重新计算倒计时文字。
+    """
+
+    def __init__(self):
+        self._parsed = {}  # 板块 -> (签名, 快照字段)
+        self._views = {}  # 板块 -> (快照字段, 显示模型)
+
+    def signature(self, name, data):
+        """板块输入的签名，data 没有原始字节哈希（如归档中完整解码的快照）时返回 None"""
+        digests = getattr(data, 'digests', None)
+        if digests is None:
+            return None
+        # 查找表在第一次查找时才载入并递增 generation；调用方没有先 refresh() 时
+        # 先载入再取 generation，否则第一轮的签名与第二轮不同，第二轮必然未命中
+        mapping_index.table
+        return (mapping_index.generation,) + tuple(digests.get(key) for key in SECTIONS[name].keys)
+
+    def parse(self, name, data, parser):
+        """返回板块的快照字段，输入没有变化时复用上一轮的结果"""
+        signature = self.signature(name, data)
+        if signature is None:
+            return parser(data)
+        cached = self._parsed.get(name)
+        if cached is not None and cached[0] == signature:
+            metrics.inc('section_cache_total', log=False, section=name, result='hit')
+            return cached[1]
+        metrics.inc('section_cache_total', log=False, section=name, result='miss')
+        fields = parser(data)
+        self._parsed[name] = (signature, fields)
+        return fields
+
+    def view(self, name, snapshot, now=None):
+        """返回板块的显示模型，快照字段仍是缓存中的同一批对象时复用上一次的模型"""
+        section = SECTIONS[name]
+        parsed = self._parsed.get(name)
+        if section.timed or parsed is None:
+            return section.view(snapshot, now)
+        fields = parsed[1]
+        cached = self._views.get(name)
+        if (cached is not None and cached[0] is fields
+                and all(getattr(snapshot, field) is value for field, value in fields.items())):
+            return cached[1]
+        view = section.view(snapshot, now)
+        if all(getattr(snapshot, field) is value for field, value in fields.items()):
+            self._views[name] = (fields, view)
+        return view
+
+    def clear(self):
+        self._parsed.clear()
+        self._views.clear()
@@ -0,0 +1,86 @@
+from models import Record
+
+
+class Section(Record):
+    """板块注册项
+
+    keys: 需要解码的 worldState 顶层键
+    dictionaries: 需要加载的字典（lookups.mappings 中注册的名称）
+    payload: 快照 -> 可 JSON 序列化的翻译结果（接口服务使用）
+    timed: 显示内容是否依赖当前时间（倒计时、是否过期）
+    view: (快照, now) -> render.SectionView 的显示模型构建函数，由 warframe_monitor 通过
+          section_view 登记
+    """
+    __slots__ = ('name', 'title', 'keys', 'dictionaries', 'payload', 'timed', 'view')
+
+
+def _records(records):
+    return [r.as_dict() for r in records]
+
+
+# 板块注册表，顺序即完整报告中的显示顺序
+SECTIONS = {}
+
+
+def register_section(name, title, keys, dictionaries, payload, timed=False):
+    SECTIONS[name] = Section(name, title, tuple(keys), tuple(dictionaries), payload, timed, None)
+
+
+register_section('alerts', '警报', ['Alerts'], ['names', 'nodes'],
+                 lambda s: _records(s.alerts), timed=True)
+register_section('invasions', '入侵', ['Invasions'], ['names', 'nodes'],
+                 lambda s: _records(s.invasions))
+register_section('events', '新闻', ['Events'], [],
+                 lambda s: _records(s.events))
+register_section('sorties', '突击', ['Sorties'], ['names', 'nodes'],
+                 lambda s: _records(s.sorties))
+register_section('fissures', '虚空裂隙', ['ActiveMissions'], ['names', 'nodes'],
+                 lambda s: _records(s.fissures), timed=True)
+register_section('baro', '虚空商人', ['VoidTraders'], ['nodes'],
+                 lambda s: _records(s.void_traders), timed=True)
+register_section('syndicates', '集团任务', ['SyndicateMissions'], ['names', 'nodes'],
+                 lambda s: _records(s.syndicate_boards))
+register_section('bounties', '开放世界赏金', ['SyndicateMissions'], ['bounties', 'dict_zh'],
+                 lambda s: _records(s.bounty_boards))
+register_section('nightwave', '午夜电波', ['SeasonInfo'], ['dict_zh'],
+                 lambda s: s.nightwave.as_dict() if s.nightwave else None)
+register_section('railjack', '九重天', ['VoidStorms'], ['names', 'nodes'],
+                 lambda s: _records(s.void_storms))
+register_section('archon', '执行官', ['LiteSorties'], ['names', 'nodes'],
+                 lambda s: s.archon_hunt.as_dict() if s.archon_hunt else None, timed=True)
+
+
+def section_view(name):
+    """装饰器：把显示模型构建函数登记为板块的 view"""
+    def register(func):
+        SECTIONS[name].view = func
+        return func
+    return register
+
+
+def parse_section_names(value):
+    """解析 "fissures,sorties,archon" 形式的板块列表，None 或空字符串表示全部板块"""
+    if not value:
+        return list(SECTIONS)
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SECTIONS]
+    if unknown:
+        raise ValueError(f"未知板块: {', '.join(unknown)}（可选: {', '.join(SECTIONS)}）")
+    # 按注册表顺序去重
+    return [name for name in SECTIONS if name in names]
+
+
+def required_keys(names):
+    """选中板块需要解码的 worldState 顶层键"""
+    keys = ['Time']
+    for name in names:
+        keys.extend(k for k in SECTIONS[name].keys if k not in keys)
+    return tuple(keys)
+
+
+def required_dictionaries(names):
+    """选中板块需要加载的字典"""
+    dictionaries = []
+    for name in names:
+        dictionaries.extend(d for d in SECTIONS[name].dictionaries if d not in dictionaries)
+    return tuple(dictionaries)
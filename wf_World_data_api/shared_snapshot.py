@@ -0,0 +1,171 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+import time
+
+CONTROL_FILE = "current"
+DATA_FILE = "snapshot-{generation}.bin"
+KEEP_GENERATIONS = 3  # 保留最近几代数据文件，读取方读到版本号后还来得及打开文件
+READ_ATTEMPTS = 8
+
+# 控制文件：魔数 | 格式版本 | 当前代号（只有这 8 字节会被原地改写）
+CONTROL_HEADER = struct.Struct('<4sIQ')
+CONTROL_MAGIC = b'WFSC'
+GENERATION_OFFSET = 8
+# 数据文件：魔数 | 格式版本 | 代号 | 发布时间 | 索引偏移 | 索引长度
+DATA_HEADER = struct.Struct('<4sIQdQQ')
+DATA_MAGIC = b'WFSD'
+FORMAT_VERSION = 1
+
+
+def default_directory():
+    """优先使用内存文件系统 /dev/shm，数据文件不落盘"""
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "wf_world_data")
+
+
+def _data_path(directory, generation):
+    return os.path.join(directory, DATA_FILE.format(generation=generation))
+
+
+class SharedSnapshotWriter:
+    """把各板块已经序列化好的响应体发布到共享内存中的版本化缓冲区（只允许一个写入方）
+
+    每一代内容写成一个新的只读数据文件，写完后才把控制文件中的代号改为新的代号；
+    读取方只在代号变化时映射新文件，已经映射的旧文件不会再被修改，因此读取不需要加锁。
+    """
+
+    def __init__(self, directory=None, keep=KEEP_GENERATIONS):
+        self.directory = directory or default_directory()
+        self.keep = keep
+        os.makedirs(self.directory, exist_ok=True)
+        control_path = os.path.join(self.directory, CONTROL_FILE)
+        if not os.path.exists(control_path) or os.path.getsize(control_path) != CONTROL_HEADER.size:
+            tmp_path = control_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(CONTROL_HEADER.pack(CONTROL_MAGIC, FORMAT_VERSION, 0))
+            os.replace(tmp_path, control_path)
+        self._control_file = open(control_path, 'r+b')
+        self._control = mmap.mmap(self._control_file.fileno(), CONTROL_HEADER.size)
+        magic, version, self.generation = CONTROL_HEADER.unpack_from(self._control)
+        if magic != CONTROL_MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{control_path} 不是当前格式的共享快照控制文件")
+
+    def publish(self, entries, meta=None):
+        """发布一代内容：entries 为 {名称: 字节串}，meta 为可 JSON 序列化的附加信息，返回新代号"""
+        generation = self.generation + 1
+        index = {}
+        offset = DATA_HEADER.size
+        for name, body in entries.items():
+            index[name] = (offset, len(body))
+            offset += len(body)
+        index_bytes = json.dumps({'entries': index, 'meta': meta or {}}, ensure_ascii=False,
+                                 separators=(',', ':')).encode('utf-8')
+        path = _data_path(self.directory, generation)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(DATA_HEADER.pack(DATA_MAGIC, FORMAT_VERSION, generation, time.time(), offset, len(index_bytes)))
+            for body in entries.values():
+                f.write(body)
+            f.write(index_bytes)
+        os.replace(tmp_path, path)
+        # 数据文件完整落地后才切换代号
+        struct.pack_into('<Q', self._control, GENERATION_OFFSET, generation)
+        self.generation = generation
+        self._collect(generation)
+        return generation
+
+    def _collect(self, generation):
+        # 已经映射旧文件的读取方不受删除影响，映射在它们切换到新代号前一直有效
+        for old in range(max(generation - self.keep - 16, 1), generation - self.keep + 1):
+            try:
+                os.remove(_data_path(self.directory, old))
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        self._control.close()
+        self._control_file.close()
+
+    def unlink(self):
+        """删除控制文件和所有数据文件（所有读取方退出之后调用），目录为空时一并删除"""
+        names = [CONTROL_FILE] + [name for name in os.listdir(self.directory)
+                                  if name.startswith('snapshot-') and name.endswith(('.bin', '.bin.tmp'))]
+        for name in names:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+        try:
+            os.rmdir(self.directory)
+        except OSError:
+            pass
+
+
+class SharedSnapshot:
+    """映射到内存的一代内容；get() 返回指向映射区域的 memoryview，不复制数据"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.generation, self.published_at, index_offset, index_length = \
+            DATA_HEADER.unpack_from(self._map)
+        if magic != DATA_MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} 不是当前格式的共享快照数据文件")
+        self._view = memoryview(self._map)
+        index = json.loads(bytes(self._view[index_offset:index_offset + index_length]))
+        self._entries = index['entries']
+        self.meta = index['meta']
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def get(self, name):
+        location = self._entries.get(name)
+        if location is None:
+            return None
+        offset, length = location
+        return self._view[offset:offset + length]
+
+
+class SharedSnapshotReader:
+    """读取方：每次 current() 只读取控制文件中的 8 字节代号，代号变化时才映射新的数据文件"""
+
+    def __init__(self, directory=None):
+        self.directory = directory or default_directory()
+        self._control = None
+        self._snapshot = None
+
+    def _open_control(self):
+        path = os.path.join(self.directory, CONTROL_FILE)
+        try:
+            with open(path, 'rb') as f:
+                self._control = mmap.mmap(f.fileno(), CONTROL_HEADER.size, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return False
+        return True
+
+    def current(self):
+        """返回当前一代的 SharedSnapshot，还没有发布过任何内容时返回 None"""
+        if self._control is None and not self._open_control():
+            return None
+        for _ in range(READ_ATTEMPTS):
+            generation = struct.unpack_from('<Q', self._control, GENERATION_OFFSET)[0]
+            if self._snapshot is not None and self._snapshot.generation == generation:
+                return self._snapshot
+            if generation == 0:
+                return None
+            try:
+                snapshot = SharedSnapshot(_data_path(self.directory, generation))
+            except FileNotFoundError:
+                # 读到代号后写入方又发布了几代并回收了这个文件，重新读取代号
+                continue
+            if snapshot.generation != generation:
+                continue
+            # 不主动关闭旧映射：仍在写出的响应持有它的 memoryview，引用释放后自动解除映射
+            self._snapshot = snapshot
+            return snapshot
+        # 写入方发布得比这里打开文件还快（或文件损坏），先继续使用已经映射的一代
+        return self._snapshot
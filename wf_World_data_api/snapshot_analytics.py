@@ -0,0 +1,426 @@
+import argparse
+import json
+import os
+from datetime import datetime, timezone
+
+try:
+    import numpy as np
+except ImportError:  # 可选依赖，只有统计功能需要
+    np = None
+
+from lookups import extract_archon_name, extract_modifier_name, extract_name, extract_node_name
+from models import parse_date, parse_oid
+from snapshot_archive import SnapshotArchive
+from worldstate_decode import decode_world_state
+
+# 统计只需要解码这些板块
+ANALYTICS_KEYS = ('ActiveMissions', 'VoidStorms', 'Sorties', 'LiteSorties', 'VoidTraders')
+ANALYTICS_CACHE_FILE = "analytics.npz"
+# 缓存格式版本，修改列定义时递增
+ANALYTICS_FORMAT_VERSION = 3
+DAY = 86400
+
+# 实体种类
+FISSURE = 'fissure'
+VOID_STORM = 'storm'
+SORTIE = 'sortie'
+ARCHON = 'archon'
+BARO = 'baro'
+
+# 以整数编码的列，每列有自己的编码表；-1 表示没有该字段
+# boss 为突击和执行官的首领、虚空商人的 Character，裂隙和九重天风暴没有
+CODED_COLUMNS = ('kind', 'id', 'node', 'mission', 'tier', 'boss')
+# 数值列：start/end 为 epoch 秒，part 为同一实体内的任务序号，size 为虚空商人的商品数
+NUMERIC_COLUMNS = ('part', 'start', 'end', 'hard', 'size')
+COLUMN_TYPES = {
+    'part': 'int16', 'start': 'int64', 'end': 'int64', 'hard': 'bool', 'size': 'int32',
+}
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("统计功能需要 numpy：pip install numpy")
+
+
+class Codebook:
+    """字符串 <-> 连续整数编码"""
+
+    def __init__(self, values=()):
+        self.values = list(values)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+
+    def __len__(self):
+        return len(self.values)
+
+    def encode(self, value):
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value):
+        """已有值的编码，未出现过的值返回 None"""
+        return self.codes.get(value)
+
+
+def _fissure_rows(data):
+    for mission in data.get('ActiveMissions', []):
+        yield (FISSURE, parse_oid(mission), mission.get('Node'), mission.get('MissionType'),
+               mission.get('Modifier'), None, 0, mission.get('Activation'), mission.get('Expiry'),
+               bool(mission.get('Hard')), 0)
+
+
+def _storm_rows(data):
+    for storm in data.get('VoidStorms', []):
+        yield (VOID_STORM, parse_oid(storm), storm.get('Node'), None, storm.get('ActiveMissionTier'), None, 0,
+               storm.get('Activation'), storm.get('Expiry'), False, 0)
+
+
+def _sortie_rows(data):
+    # 突击的每个任务一行：tier 为任务修饰，boss 为突击的首领
+    for sortie in data.get('Sorties', []):
+        for part, variant in enumerate(sortie.get('Variants', [])):
+            yield (SORTIE, parse_oid(sortie), variant.get('node'), variant.get('missionType'),
+                   variant.get('modifierType'), sortie.get('Boss'), part,
+                   sortie.get('Activation'), sortie.get('Expiry'), False, 0)
+
+
+def _archon_rows(data):
+    for lite_sortie in data.get('LiteSorties', []):
+        for part, mission in enumerate(lite_sortie.get('Missions', [])):
+            yield (ARCHON, parse_oid(lite_sortie), mission.get('node'), mission.get('missionType'), None,
+                   lite_sortie.get('Boss'), part, lite_sortie.get('Activation'), lite_sortie.get('Expiry'),
+                   False, 0)
+
+
+def _baro_rows(data):
+    for trader in data.get('VoidTraders', []):
+        yield (BARO, parse_oid(trader), trader.get('Node'), None, None, trader.get('Character'), 0,
+               trader.get('Activation'), trader.get('Expiry'), False, len(trader.get('Manifest', [])))
+
+
+ROW_EXTRACTORS = (_fissure_rows, _storm_rows, _sortie_rows, _archon_rows, _baro_rows)
+
+
+class EntityTable:
+    """把多个快照中的裂隙、九重天风暴、突击、执行官和虚空商人展开成列式数组
+
+    同一实体（种类 + _id + 任务序号 + 开始时间）在连续快照中只记录一次；虚空商人
+    每次到访沿用同一个 _id，靠开始时间区分。虚空商人在到达前几周就出现在 worldState
+    中且商品列表为空，再次出现时商品数和结束时间取较大值。add_snapshot() 追加到
+    Python 列表，freeze() 之后所有查询都是 NumPy 向量运算：布尔掩码筛选、
+    bincount 分组计数、按天分桶和时长分布。
+    """
+
+    def __init__(self):
+        _require_numpy()
+        self.codebooks = {name: Codebook() for name in CODED_COLUMNS}
+        self.columns = {}
+        self.position = 0  # 已处理的归档索引记录数，增量更新从这里继续
+        self._pending = {name: [] for name in CODED_COLUMNS + NUMERIC_COLUMNS}
+        self._seen = {}  # (种类, _id, 任务序号, 开始时间) -> 行号
+
+    def __len__(self):
+        frozen = len(self.columns['start']) if self.columns else 0
+        return frozen + len(self._pending['start'])
+
+    def add_snapshot(self, data):
+        """追加一个快照中新出现的实体，返回新增行数"""
+        added = 0
+        pending = self._pending
+        for extract in ROW_EXTRACTORS:
+            for kind, oid, node, mission, tier, boss, part, start, end, hard, size in extract(data):
+                start = parse_date(start) or 0
+                key = (kind, oid, part, start)
+                if oid is None:
+                    continue
+                row = self._seen.get(key)
+                if row is not None:
+                    if kind == BARO:
+                        self._extend(row, parse_date(end) or 0, size)
+                    continue
+                self._seen[key] = len(self)
+                for name, value in zip(CODED_COLUMNS, (kind, oid, node, mission, tier, boss)):
+                    pending[name].append(self.codebooks[name].encode(value))
+                pending['part'].append(part)
+                pending['start'].append(start)
+                pending['end'].append(parse_date(end) or 0)
+                pending['hard'].append(hard)
+                pending['size'].append(size)
+                added += 1
+        return added
+
+    def _extend(self, row, end, size):
+        """把已记录的一行的结束时间和商品数更新为较大值"""
+        frozen = len(self.columns['start']) if self.columns else 0
+        columns, index = (self.columns, row) if row < frozen else (self._pending, row - frozen)
+        columns['end'][index] = max(columns['end'][index], end)
+        columns['size'][index] = max(columns['size'][index], size)
+
+    def freeze(self):
+        """把追加的行合并进 NumPy 列"""
+        if not self._pending['start'] and self.columns:
+            return self
+        for name, values in self._pending.items():
+            dtype = COLUMN_TYPES.get(name, 'int32')
+            array = np.asarray(values, dtype=dtype)
+            if name in self.columns:
+                array = np.concatenate([self.columns[name], array])
+            self.columns[name] = array
+            values.clear()
+        return self
+
+    # ---- 查询 ----
+
+    def mask(self, kind=None, node=None, mission=None, tier=None, boss=None, hard=None,
+             start=None, end=None):
+        """按原始键筛选的布尔掩码；start/end 筛选开始时间落在 [start, end) 内的实体"""
+        self.freeze()
+        result = np.ones(len(self.columns['start']), dtype=bool)
+        for name, value in (('kind', kind), ('node', node), ('mission', mission), ('tier', tier),
+                            ('boss', boss)):
+            if value is None:
+                continue
+            code = self.codebooks[name].lookup(value)
+            if code is None:
+                return np.zeros_like(result)
+            result &= self.columns[name] == code
+        if hard is not None:
+            result &= self.columns['hard'] == hard
+        if start is not None:
+            result &= self.columns['start'] >= start
+        if end is not None:
+            result &= self.columns['start'] < end
+        return result
+
+    def count_by(self, column, mask=None):
+        """按编码列分组计数，返回 {原始键: 次数}，按次数从多到少排序"""
+        self.freeze()
+        codes = self.columns[column] if mask is None else self.columns[column][mask]
+        codes = codes[codes >= 0]
+        counts = np.bincount(codes, minlength=len(self.codebooks[column]))
+        order = np.argsort(-counts, kind='stable')
+        values = self.codebooks[column].values
+        return {values[code]: int(counts[code]) for code in order if counts[code]}
+
+    def count_by_pair(self, first, second, mask=None):
+        """按两个编码列的组合分组计数，返回 {(键1, 键2): 次数}"""
+        self.freeze()
+        a = self.columns[first] if mask is None else self.columns[first][mask]
+        b = self.columns[second] if mask is None else self.columns[second][mask]
+        valid = (a >= 0) & (b >= 0)
+        width = len(self.codebooks[second])
+        counts = np.bincount(a[valid].astype('int64') * width + b[valid],
+                             minlength=len(self.codebooks[first]) * width)
+        order = np.argsort(-counts, kind='stable')
+        first_values, second_values = self.codebooks[first].values, self.codebooks[second].values
+        return {(first_values[code // width], second_values[code % width]): int(counts[code])
+                for code in order if counts[code]}
+
+    def daily_counts(self, mask=None):
+        """按开始时间（UTC 日）分桶计数，返回 (每天零点的 epoch 秒数组, 次数数组)"""
+        self.freeze()
+        starts = self.columns['start'] if mask is None else self.columns['start'][mask]
+        starts = starts[starts > 0]
+        if not len(starts):
+            return np.zeros(0, dtype='int64'), np.zeros(0, dtype='int64')
+        days = starts // DAY
+        first = days.min()
+        counts = np.bincount(days - first)
+        return (np.arange(len(counts), dtype='int64') + first) * DAY, counts
+
+    def per_day(self, mask=None, start=None, end=None):
+        """平均每天出现的次数；未给出时间范围时以数据覆盖的天数计算"""
+        days, counts = self.daily_counts(mask)
+        if start is not None and end is not None:
+            span = max((end - start) / DAY, 1)
+        else:
+            span = max(len(days), 1)
+        return counts.sum() / span
+
+    def durations(self, mask=None):
+        """持续时间（秒）数组，忽略缺少开始或结束时间的实体"""
+        self.freeze()
+        start, end = self.columns['start'], self.columns['end']
+        valid = (start > 0) & (end > start)
+        if mask is not None:
+            valid &= mask
+        return end[valid] - start[valid]
+
+    def duration_stats(self, mask=None, percentiles=(50, 90, 99)):
+        durations = self.durations(mask)
+        if not len(durations):
+            return None
+        stats = {'count': int(len(durations)), 'mean': float(durations.mean())}
+        for p, value in zip(percentiles, np.percentile(durations, percentiles)):
+            stats[f'p{p}'] = float(value)
+        return stats
+
+    def mean(self, column, mask=None):
+        self.freeze()
+        values = self.columns[column] if mask is None else self.columns[column][mask]
+        return float(values.mean()) if len(values) else None
+
+    def history(self, column, mask=None):
+        """按开始时间排序的 [(开始时间, 原始键)]，每个实体一条（用于执行官轮换等）"""
+        self.freeze()
+        rows = self.columns['part'] == 0
+        if mask is not None:
+            rows &= mask
+        starts = self.columns['start'][rows]
+        codes = self.columns[column][rows]
+        order = np.argsort(starts, kind='stable')
+        values = self.codebooks[column].values
+        return [(int(starts[i]), values[codes[i]] if codes[i] >= 0 else None) for i in order]
+
+    # ---- 持久化 ----
+
+    def save(self, path):
+        """保存为 .npz（不使用 pickle），写临时文件后原子替换"""
+        self.freeze()
+        header = {
+            'version': ANALYTICS_FORMAT_VERSION,
+            'position': self.position,
+            'codebooks': {name: book.values for name, book in self.codebooks.items()},
+        }
+        tmp_path = path + '.tmp.npz'
+        np.savez(tmp_path, header=np.frombuffer(json.dumps(header, ensure_ascii=False).encode('utf-8'),
+                                                dtype='uint8'),
+                 **self.columns)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """读取 save() 保存的表，文件不存在、损坏或格式版本不同时返回 None"""
+        _require_numpy()
+        try:
+            with np.load(path, allow_pickle=False) as stored:
+                header = json.loads(stored['header'].tobytes())
+                if header.get('version') != ANALYTICS_FORMAT_VERSION:
+                    return None
+                columns = {name: stored[name] for name in CODED_COLUMNS + NUMERIC_COLUMNS}
+        except (OSError, ValueError, KeyError):
+            return None
+        table = cls()
+        table.position = header['position']
+        table.codebooks = {name: Codebook(values) for name, values in header['codebooks'].items()}
+        table.columns = columns
+        kinds, ids = table.codebooks['kind'].values, table.codebooks['id'].values
+        table._seen = {(kinds[k], ids[i], int(p), int(start)): row
+                       for row, (k, i, p, start) in enumerate(zip(columns['kind'], columns['id'], columns['part'],
+                                                                  columns['start']))}
+        return table
+
+
+def build_entity_table(archive, cache_path=None):
+    """从快照归档构建实体表
+
+    cache_path 不为空时先读取上次保存的表，只处理之后新归档的快照，完成后写回。
+    归档中相同内容的快照只解码一次。
+    """
+    table = EntityTable.load(cache_path) if cache_path else None
+    if table is None or table.position > len(archive):
+        table = EntityTable()
+    decoded = set()
+    for position, (_, offset, length, digest) in enumerate(archive.iter_records()):
+        if position < table.position or digest in decoded:
+            continue
+        decoded.add(digest)
+        table.add_snapshot(decode_world_state(archive.read_body(offset, length), ANALYTICS_KEYS))
+    table.position = max(table.position, len(archive))
+    table.freeze()
+    if cache_path:
+        table.save(cache_path)
+    return table
+
+
+def _format_day(epoch):
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime('%Y-%m-%d')
+
+
+def _format_duration(seconds):
+    hours, minutes = divmod(int(seconds) // 60, 60)
+    return f"{hours}时{minutes}分" if hours else f"{minutes}分"
+
+
+def print_report(table, start=None, end=None, top=10):
+    """打印常用统计：裂隙频率、风暴等级分布、时长、虚空商人商品数和执行官轮换"""
+    window = table.mask(start=start, end=end)
+    fissures = window & table.mask(kind=FISSURE)
+    days, _ = table.daily_counts(window)
+    span = f"{_format_day(days[0])} ~ {_format_day(days[-1])}" if len(days) else "无数据"
+    print(f"📊快照统计: {len(table)} 个实体，{span}")
+    if len(days):
+        # 频率按整个统计范围的天数计算，而不是只按出现过的天数
+        start = days[0] if start is None else start
+        end = days[-1] + DAY if end is None else end
+
+    print("\n🌀虚空裂隙（平均每天出现次数）:")
+    for (tier, mission), count in list(table.count_by_pair('tier', 'mission', fissures).items())[:top]:
+        per_day = table.per_day(fissures & table.mask(tier=tier, mission=mission), start, end)
+        print(f"   • {extract_modifier_name(tier)} {extract_name(mission)}: "
+              f"{per_day:.2f} 次/天（共 {count} 次）")
+    stats = table.duration_stats(fissures)
+    if stats:
+        print(f"   • 持续时间: 平均 {_format_duration(stats['mean'])}，中位数 {_format_duration(stats['p50'])}，"
+              f"P90 {_format_duration(stats['p90'])}")
+
+    storms = window & table.mask(kind=VOID_STORM)
+    if storms.any():
+        print("\n⛈️九重天虚空风暴（按等级）:")
+        for tier, count in table.count_by('tier', storms).items():
+            print(f"   • {extract_modifier_name(tier)}: {count} 次")
+
+    sorties = window & table.mask(kind=SORTIE)
+    if sorties.any():
+        print("\n⚔️突击任务类型:")
+        for mission, count in list(table.count_by('mission', sorties).items())[:top]:
+            print(f"   • {extract_name(mission)}: {count} 次")
+
+    baro = window & table.mask(kind=BARO)
+    if baro.any():
+        print("\n👑虚空商人:")
+        print(f"   • 到访次数: {int(baro.sum())}")
+        print(f"   • 平均携带商品: {table.mean('size', baro):.1f} 件")
+        for node, count in table.count_by('node', baro).items():
+            print(f"   • {extract_node_name(node)}: {count} 次")
+
+    archons = window & table.mask(kind=ARCHON)
+    if archons.any():
+        print("\n👹执行官轮换:")
+        for when, boss in table.history('boss', archons)[-top:]:
+            print(f"   • {_format_day(when)}: {extract_archon_name(boss)}")
+
+
+def _parse_time(parser, option, value):
+    """命令行中的时间参数转换为 epoch 秒，无法解析时报告用法错误"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (ValueError, OverflowError, OSError):
+        parser.error(f"无法解析 {option} 时间 {value!r}，格式例如 \"2026-01-01\"")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="快照归档的列式统计")
+    parser.add_argument('--archive', metavar='DIR', required=True, help="快照归档目录")
+    parser.add_argument('--since', metavar='DATE', help="只统计该时间之后开始的实体，如 2026-01-01")
+    parser.add_argument('--until', metavar='DATE', help="只统计该时间之前开始的实体")
+    parser.add_argument('--top', type=int, default=10, help="每项统计最多显示几行")
+    parser.add_argument('--no-cache', action='store_true', help=f"不读取也不写入 {ANALYTICS_CACHE_FILE}")
+    args = parser.parse_args()
+    if np is None:
+        parser.error("统计功能需要 numpy：pip install numpy")
+    since = _parse_time(parser, '--since', args.since)
+    until = _parse_time(parser, '--until', args.until)
+    archive = SnapshotArchive(args.archive)
+    cache_path = None if args.no_cache else os.path.join(args.archive, ANALYTICS_CACHE_FILE)
+    try:
+        table = build_entity_table(archive, cache_path)
+    finally:
+        archive.close()
+    print_report(table, since, until, args.top)
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+import zlib
+
+SEGMENT_FILE = "snapshots.seg"
+INDEX_FILE = "snapshots.idx"
+
+# 索引记录：抓取时间(epoch 秒) | 段内偏移 | 压缩后长度 | 内容 SHA-1
+INDEX_RECORD = struct.Struct('<qQI20s')
+COMPRESS_LEVEL = 6
+
+
+class SnapshotArchive:
+    """追加写入的 worldState 快照归档
+
+    不同内容的快照以 zlib 压缩后追加到段文件，相同内容只存一份；定长索引记录
+    按时间顺序追加，按时间查找只需在 mmap 的索引上二分查找再读取一次段文件。
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.segment_path = os.path.join(directory, SEGMENT_FILE)
+        self.index_path = os.path.join(directory, INDEX_FILE)
+        self._segment = open(self.segment_path, 'ab+')
+        self._index = open(self.index_path, 'ab+')
+        self._index_map = None
+        self._index_mapped_size = 0
+        self._locations = {}
+        self._last = None
+        self._recover()
+
+    def _recover(self):
+        """丢弃上次异常退出时写了一半的索引记录，并建立 哈希 -> 位置 表"""
+        segment_size = os.path.getsize(self.segment_path)
+        index_size = os.path.getsize(self.index_path)
+        valid = index_size - index_size % INDEX_RECORD.size
+        with open(self.index_path, 'rb') as f:
+            data = f.read(valid)
+        count = 0
+        for fetched_at, offset, length, digest in INDEX_RECORD.iter_unpack(data):
+            if offset + length > segment_size:
+                break
+            self._locations[digest] = (offset, length)
+            self._last = (fetched_at, offset, length, digest)
+            count += 1
+        if count * INDEX_RECORD.size != index_size:
+            self._index.truncate(count * INDEX_RECORD.size)
+
+    def __len__(self):
+        return os.path.getsize(self.index_path) // INDEX_RECORD.size
+
+    def append(self, body, fetched_at=None):
+        """归档一份原始 worldState 响应体，与最新一份内容相同时跳过，返回是否写入"""
+        fetched_at = int(time.time() if fetched_at is None else fetched_at)
+        digest = hashlib.sha1(body).digest()
+        if self._last is not None:
+            if self._last[3] == digest:
+                return False
+            # 索引必须按时间单调递增
+            fetched_at = max(fetched_at, self._last[0])
+
+        location = self._locations.get(digest)
+        if location is None:
+            compressed = zlib.compress(body, COMPRESS_LEVEL)
+            self._segment.seek(0, os.SEEK_END)
+            offset = self._segment.tell()
+            self._segment.write(compressed)
+            self._segment.flush()
+            location = (offset, len(compressed))
+            self._locations[digest] = location
+
+        self._index.write(INDEX_RECORD.pack(fetched_at, location[0], location[1], digest))
+        self._index.flush()
+        self._last = (fetched_at, location[0], location[1], digest)
+        return True
+
+    def _records(self):
+        """返回 mmap 的索引和记录数"""
+        size = os.path.getsize(self.index_path)
+        size -= size % INDEX_RECORD.size
+        if size == 0:
+            return None, 0
+        if self._index_map is None or self._index_mapped_size != size:
+            if self._index_map is not None:
+                self._index_map.close()
+            with open(self.index_path, 'rb') as f:
+                self._index_map = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+            self._index_mapped_size = size
+        return self._index_map, size // INDEX_RECORD.size
+
+    def record(self, position):
+        index_map, _ = self._records()
+        return INDEX_RECORD.unpack_from(index_map, position * INDEX_RECORD.size)
+
+    def bisect(self, when):
+        """返回抓取时间 <= when 的最后一条索引记录的位置，没有时返回 -1"""
+        index_map, count = self._records()
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if INDEX_RECORD.unpack_from(index_map, mid * INDEX_RECORD.size)[0] <= when:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo - 1
+
+    def read_body(self, offset, length):
+        with open(self.segment_path, 'rb') as f:
+            f.seek(offset)
+            return zlib.decompress(f.read(length))
+
+    def lookup(self, when):
+        """返回 when 时刻有效的快照 (抓取时间, 解码后的 worldState)，没有时返回 None"""
+        position = self.bisect(when)
+        if position < 0:
+            return None
+        fetched_at, offset, length, _ = self.record(position)
+        return fetched_at, json.loads(self.read_body(offset, length))
+
+    def iter_records(self, start=None, end=None):
+        """按时间顺序遍历 [start, end) 范围内的索引记录"""
+        index_map, count = self._records()
+        first = 0 if start is None else self.bisect(start - 1) + 1
+        for position in range(max(first, 0), count):
+            record = INDEX_RECORD.unpack_from(index_map, position * INDEX_RECORD.size)
+            if end is not None and record[0] >= end:
+                break
+            yield record
+
+    def iter_snapshots(self, start=None, end=None):
+        """按时间顺序遍历 [start, end) 范围内的快照 (抓取时间, worldState)"""
+        for fetched_at, offset, length, _ in self.iter_records(start, end):
+            yield fetched_at, json.loads(self.read_body(offset, length))
+
+    def close(self):
+        if self._index_map is not None:
+            self._index_map.close()
+            self._index_map = None
+        self._segment.close()
+        self._index.close()
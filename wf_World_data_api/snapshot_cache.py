@@ -0,0 +1,89 @@
+import json
+import os
+import time
+import zlib
+
+from lookups import data_path
+from models import Record
+
+DEFAULT_CACHE_FILE = ".worldstate_cache"  # 默认放在字典目录下
+COMPRESS_LEVEL = 6
+
+
+class CachedSnapshot(Record):
+    """磁盘缓存中的最近一份有效 worldState
+
+    fetched_at 为下载这份内容的时间，verified_at 为最近一次确认上游内容未变
+    （304 或内容哈希相同）的时间，缓存年龄按 verified_at 计算。
+    """
+    __slots__ = ('body', 'fetched_at', 'verified_at', 'etag', 'last_modified', 'content_hash')
+
+    def age(self, now=None):
+        now = time.time() if now is None else now
+        return max(now - self.verified_at, 0)
+
+
+def format_age(seconds):
+    """把缓存年龄格式化为 "3分钟" / "2小时5分钟" / "1天4小时" """
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}秒"
+    minutes = seconds // 60
+    if minutes < 60:
+        return f"{minutes}分钟"
+    hours, minutes = divmod(minutes, 60)
+    if hours < 24:
+        return f"{hours}小时{minutes}分钟" if minutes else f"{hours}小时"
+    days, hours = divmod(hours, 24)
+    return f"{days}天{hours}小时" if hours else f"{days}天"
+
+
+class SnapshotCache:
+    """最近一份有效 worldState 响应体及其校验信息的磁盘缓存
+
+    文件第一行是 JSON 头（抓取时间、ETag、Last-Modified、内容哈希），之后是
+    zlib 压缩的原始响应体；整文件写临时文件后原子替换。上游返回 304 时只更新
+    文件的修改时间，作为最近一次确认内容有效的时间。
+    """
+
+    def __init__(self, path=None):
+        self.path = data_path(DEFAULT_CACHE_FILE) if path is None else path
+
+    def load(self):
+        """读取缓存，不存在或损坏时返回 None"""
+        try:
+            with open(self.path, 'rb') as f:
+                header = json.loads(f.readline())
+                if not isinstance(header, dict) or not isinstance(header.get('fetched_at'), (int, float)):
+                    raise ValueError("缓存头缺少抓取时间")
+                body = zlib.decompress(f.read())
+            verified_at = os.stat(self.path).st_mtime
+        except (OSError, ValueError, zlib.error) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"⚠️ 警告：读取快照缓存 {self.path} 失败: {e}")
+            return None
+        return CachedSnapshot(body, header['fetched_at'], max(verified_at, header['fetched_at']),
+                              header.get('etag'), header.get('last_modified'), header.get('content_hash'))
+
+    def save(self, body, etag=None, last_modified=None, content_hash=None, fetched_at=None):
+        header = {
+            'fetched_at': time.time() if fetched_at is None else fetched_at,
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_hash': content_hash,
+        }
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(json.dumps(header).encode('utf-8') + b'\n')
+                f.write(zlib.compress(body, COMPRESS_LEVEL))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ 警告：写入快照缓存 {self.path} 失败: {e}")
+
+    def touch(self):
+        """上游确认内容未变，刷新缓存的确认时间"""
+        try:
+            os.utime(self.path)
+        except OSError:
+            pass
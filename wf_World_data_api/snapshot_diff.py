@@ -0,0 +1,124 @@
+from models import Record
+
+# 参与比较的板块：板块名（与 sections.SECTIONS 一致）-> (显示名称, 从快照取出实体列表的函数)
+DIFF_SECTIONS = {
+    'alerts': ('警报', lambda s: s.alerts),
+    'invasions': ('入侵', lambda s: s.invasions),
+    'events': ('新闻', lambda s: s.events),
+    'sorties': ('突击', lambda s: s.sorties),
+    'archon': ('执行官', lambda s: [s.archon_hunt] if s.archon_hunt else []),
+    'fissures': ('虚空裂隙', lambda s: s.fissures),
+    'railjack': ('虚空风暴', lambda s: s.void_storms),
+    'baro': ('虚空商人', lambda s: s.void_traders),
+    'syndicates': ('集团任务', lambda s: s.syndicate_boards),
+    'bounties': ('赏金', lambda s: s.bounty_boards),
+    'nightwave': ('午夜电波', lambda s: s.nightwave.challenges if s.nightwave else []),
+}
+
+# 没有 _id 时用于组成实体标识的字段（节点 + 类型）
+_FALLBACK_KEY_FIELDS = (
+    ('node', 'tag', 'challenge'),
+    ('mission_type', 'tier', 'boss', 'location'),
+)
+
+ADDED = 'added'
+REMOVED = 'removed'
+CHANGED = 'changed'
+
+
+class ChangeEvent(Record):
+    # fields: 发生变化的字段 {字段: (旧值, 新值)}，仅 changed 事件有
+    __slots__ = ('section', 'kind', 'key', 'old', 'new', 'fields')
+
+    @property
+    def entity(self):
+        return self.new if self.new is not None else self.old
+
+
+def entity_key(record):
+    """实体标识：优先使用 worldState 的 _id/$oid，否则使用节点 + 类型"""
+    record_id = getattr(record, 'id', None)
+    if record_id:
+        return record_id
+    key = []
+    for candidates in _FALLBACK_KEY_FIELDS:
+        for name in candidates:
+            if name in record.__slots__:
+                key.append(getattr(record, name))
+                break
+    return (type(record).__name__,) + tuple(key)
+
+
+def changed_fields(old, new):
+    """列出两个同类记录之间不同的字段"""
+    return {name: (getattr(old, name), getattr(new, name))
+            for name in old.__slots__ if getattr(old, name) != getattr(new, name)}
+
+
+def diff_section(section, old_records, new_records):
+    """按实体标识比较一个板块，返回 ChangeEvent 列表"""
+    old_by_key = {entity_key(r): r for r in old_records}
+    events = []
+    seen = set()
+    for record in new_records:
+        key = entity_key(record)
+        seen.add(key)
+        previous = old_by_key.get(key)
+        if previous is None:
+            events.append(ChangeEvent(section, ADDED, key, None, record, None))
+        elif previous != record:
+            events.append(ChangeEvent(section, CHANGED, key, previous, record, changed_fields(previous, record)))
+    for key, record in old_by_key.items():
+        if key not in seen:
+            events.append(ChangeEvent(section, REMOVED, key, record, None, None))
+    return events
+
+
+def diff_snapshots(old, new, sections=None):
+    """比较两个连续快照，返回 {板块: [ChangeEvent]}，只包含有变化的板块
+
+    old 为 None 时新快照中的所有实体都视为新增。
+    """
+    result = {}
+    for section in sections or DIFF_SECTIONS:
+        select = DIFF_SECTIONS[section][1]
+        old_records = select(old) if old is not None else []
+        new_records = select(new)
+        if old_records is new_records:
+            # 板块缓存复用了上一轮的解析结果，不可能有变化
+            continue
+        events = diff_section(section, old_records, new_records)
+        if events:
+            result[section] = events
+    return result
+
+
+def describe_entity(record):
+    """生成实体的简短描述"""
+    for name in ('node_name', 'boss_name', 'name', 'location'):
+        if name in record.__slots__:
+            label = getattr(record, name)
+            if name == 'node_name' and 'mission_type_name' in record.__slots__:
+                label = f"{label} - {record.mission_type_name}"
+            elif name == 'node_name' and 'tier_name' in record.__slots__:
+                label = f"{label} - {record.tier_name}"
+            return label
+    messages = getattr(record, 'messages', None)
+    if messages:
+        return messages.get('zh') or next(iter(messages.values()))
+    return str(entity_key(record))
+
+
+def display_changes(changes):
+    """只打印发生变化的实体"""
+    if not changes:
+        print("💤世界状态无变化")
+        return
+    icons = {ADDED: '🆕新增', REMOVED: '❌移除', CHANGED: '🔄变化'}
+    for section, events in changes.items():
+        print(f"\n📌{DIFF_SECTIONS[section][0]}: {len(events)} 项变化")
+        for event in events:
+            line = f"   {icons[event.kind]} {describe_entity(event.entity)}"
+            if event.kind == CHANGED and section == 'invasions' and 'count' in event.fields:
+                line += f" | 进度: {event.old.progress:.1f}% → {event.new.progress:.1f}%"
+            print(line)
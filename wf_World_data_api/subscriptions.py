@@ -0,0 +1,162 @@
+import json
+
+from models import Record
+from node_index import node_index
+from snapshot_diff import entity_key
+
+# 规则可以约束的维度，取值为 worldState 中的键（planet 为 node.json 中的星球名，hard 为钢铁之路）
+RULE_FIELDS = ('mission_type', 'tier', 'faction', 'node', 'planet', 'hard')
+
+
+def _entities(records):
+    return [(entity_key(r), r) for r in records]
+
+
+def _missions(parent):
+    return [((entity_key(parent), i), mission) for i, mission in enumerate(parent.missions)]
+
+
+# 可订阅的板块（与 sections.SECTIONS 一致）-> 从快照取出 [(实体标识, 记录)] 的函数
+SUBSCRIPTION_SECTIONS = {
+    'alerts': lambda s: _entities(s.alerts),
+    'invasions': lambda s: _entities(s.invasions),
+    'fissures': lambda s: _entities(s.fissures),
+    'railjack': lambda s: _entities(s.void_storms),
+    'sorties': lambda s: [((entity_key(sortie), i), variant)
+                          for sortie in s.sorties for i, variant in enumerate(sortie.variants)],
+    'archon': lambda s: _missions(s.archon_hunt) if s.archon_hunt else [],
+}
+
+
+class Rule(Record):
+    """一条订阅规则：section 为 None 表示所有板块，其余条件为 None 表示不限"""
+    __slots__ = ('id', 'subscriber', 'section') + RULE_FIELDS
+
+    @property
+    def shape(self):
+        """规则约束了哪些维度"""
+        return tuple(name for name in RULE_FIELDS if getattr(self, name) is not None)
+
+
+class Notification(Record):
+    __slots__ = ('rule', 'section', 'key', 'entity')
+
+
+def entity_values(record):
+    """实体在各个规则维度上的取值，记录没有的维度为 None"""
+    values = {name: getattr(record, name, None) for name in RULE_FIELDS}
+    values['planet'] = node_index.planet(values['node'])
+    return values
+
+
+def rule_from_dict(entry, default_id=None):
+    unknown = set(entry) - {'id', 'subscriber', 'section'} - set(RULE_FIELDS)
+    if unknown:
+        raise ValueError(f"订阅规则包含未知字段: {', '.join(sorted(unknown))}")
+    section = entry.get('section')
+    if section is not None and section not in SUBSCRIPTION_SECTIONS:
+        raise ValueError(f"不支持订阅的板块: {section}（可选: {', '.join(SUBSCRIPTION_SECTIONS)}）")
+    return Rule(entry.get('id', default_id), entry.get('subscriber'), section,
+                *(entry.get(name) for name in RULE_FIELDS))
+
+
+def load_rules(path):
+    """从 JSON 文件读取订阅规则列表"""
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    return [rule_from_dict(entry, i) for i, entry in enumerate(entries)]
+
+
+class SubscriptionEngine:
+    """按条件组合索引的订阅规则匹配
+
+    规则按 (板块, 约束的维度组合) 分组，组内以约束值元组为键建立字典。匹配一个实体时
+    对每种维度组合只做一次字典查找，耗时取决于规则中出现的维度组合数（最多 2^6 种），
+    与规则总数无关。每个实体只在第一次出现在快照中时通知一次，从快照中消失后忘记；
+    seed() 把启动时已有的实体记为已通知。
+    """
+
+    def __init__(self, rules=()):
+        self._rules = {}
+        # 板块（None 表示所有板块）-> {维度组合: {约束值元组: [规则]}}
+        self._index = {}
+        self._seen = {}  # 板块 -> 已通知过的实体标识
+        for rule in rules:
+            self.add(rule)
+
+    def __len__(self):
+        return len(self._rules)
+
+    def add(self, rule):
+        if rule.id in self._rules:
+            self.remove(rule.id)
+        self._rules[rule.id] = rule
+        shape = rule.shape
+        values = tuple(getattr(rule, name) for name in shape)
+        self._index.setdefault(rule.section, {}).setdefault(shape, {}).setdefault(values, []).append(rule)
+
+    def remove(self, rule_id):
+        rule = self._rules.pop(rule_id, None)
+        if rule is None:
+            return False
+        shape = rule.shape
+        bucket = self._index[rule.section][shape]
+        values = tuple(getattr(rule, name) for name in shape)
+        bucket[values] = [r for r in bucket[values] if r.id != rule_id]
+        if not bucket[values]:
+            del bucket[values]
+        return True
+
+    def match_entity(self, section, record):
+        """返回与一个实体匹配的所有规则"""
+        values = entity_values(record)
+        matched = []
+        for index in (self._index.get(section), self._index.get(None)):
+            if not index:
+                continue
+            for shape, bucket in index.items():
+                rules = bucket.get(tuple(values[name] for name in shape))
+                if rules:
+                    matched.extend(rules)
+        return matched
+
+    def seed(self, snapshot, sections=None):
+        """把快照中已有的实体记为已通知，不匹配也不产生通知"""
+        for section in sections or SUBSCRIPTION_SECTIONS:
+            extract = SUBSCRIPTION_SECTIONS.get(section)
+            if extract is not None:
+                self._seen[section] = {key for key, _ in extract(snapshot)}
+
+    def match(self, snapshot, sections=None):
+        """匹配快照中新出现的实体，返回 Notification 列表"""
+        notifications = []
+        for section in sections or SUBSCRIPTION_SECTIONS:
+            extract = SUBSCRIPTION_SECTIONS.get(section)
+            if extract is None:
+                continue
+            seen = self._seen.get(section, set())
+            current = set()
+            for key, record in extract(snapshot):
+                current.add(key)
+                if key in seen:
+                    continue
+                notifications.extend(Notification(rule, section, key, record)
+                                     for rule in self.match_entity(section, record))
+            # 只保留仍在快照中的实体，内存不会随时间增长
+            self._seen[section] = current
+        return notifications
+
+
+def describe_entity(record):
+    """通知中显示的实体描述"""
+    parts = [getattr(record, name, None) for name in ('node_name', 'mission_type_name', 'tier_name', 'faction_name')]
+    if getattr(record, 'hard', False):
+        parts.append("钢铁之路")
+    return " - ".join(str(part) for part in parts if part)
+
+
+def display_notifications(notifications):
+    """打印订阅通知"""
+    for n in notifications:
+        subscriber = f"[{n.rule.subscriber}] " if n.rule.subscriber is not None else ""
+        print(f"🔔{subscriber}规则 {n.rule.id}: {describe_entity(n.entity)}")
@@ -0,0 +1,39 @@
+import json
+import os
+import sys
+
+import pytest
+
+# 模块按平铺方式互相导入，与 benchmarks/ 相同，把程序目录加入导入路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# dictionaries 夹具写入的最小字典，测试中的翻译结果不随仓库里的完整字典变化
+TEST_DICTIONARIES = {
+    'wfdata.json': {
+        'missions': {'MT_SURVIVAL': '生存', 'MT_DEFENSE': '防御', 'MT_EXTERMINATION': '歼灭'},
+        'factions': {'FC_GRINEER': 'Grineer', 'FC_CORPUS': 'Corpus'},
+        'bosses': {'SORTIE_BOSS_VOR': 'Vor 上尉', 'SORTIE_BOSS_NIRA': '执行官 妮拉'},
+        'syndicates': {'Arbiters': '仲裁者'},
+        'Modifier': {'VoidT1': '古纪 裂隙', 'VoidT2': '前纪 裂隙'},
+    },
+    'node.json': {'SolNode27': '地球-E Prime', 'SolNode30': '火星-Olympus', 'CrewBattleNode519': '土星-Vesper Strait'},
+    'dict_zh.json': {'/Lotus/Language/Jobs/Capture': '捕获', '/Lotus/Types/Challenges/Seasons/Daily/Kill': '击杀敌人'},
+    'ExportBounties.json': {'/Lotus/Types/Jobs/Capture': '/Lotus/Language/Jobs/Capture'},
+}
+
+
+@pytest.fixture
+def dictionaries(tmp_path):
+    """改用只包含 TEST_DICTIONARIES 的字典目录，测试结束后恢复"""
+    import lookups
+    directory = tmp_path / 'dictionaries'
+    directory.mkdir()
+    for filename, data in TEST_DICTIONARIES.items():
+        (directory / filename).write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+    previous = lookups.data_dir, lookups.mapping_index.sources
+    lookups.set_data_dir(str(directory))
+    # 之前的测试可能只选择了部分字典
+    lookups.mapping_index.select(None)
+    yield directory
+    lookups.set_data_dir(previous[0])
+    lookups.mapping_index.select(previous[1])
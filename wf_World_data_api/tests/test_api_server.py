@@ -0,0 +1,117 @@
+import asyncio
+import json
+import time
+
+from api_server import ApiServer, SnapshotStore
+from worldstate_decode import decode_world_state
+
+HOUR_MS = 3600 * 1000
+
+
+def fissure(oid, node, modifier='VoidT1'):
+    now_ms = int(time.time() * 1000)
+    return {'_id': {'$oid': oid}, 'Node': node, 'MissionType': 'MT_SURVIVAL', 'Modifier': modifier,
+            'Activation': {'$date': {'$numberLong': str(now_ms - HOUR_MS)}},
+            'Expiry': {'$date': {'$numberLong': str(now_ms + HOUR_MS)}}}
+
+
+def world_state(*fissures):
+    body = json.dumps({'Time': int(time.time()), 'ActiveMissions': list(fissures)}).encode()
+    return decode_world_state(body)
+
+
+class FakeFetcher:
+    """按顺序返回预设的快照，之后一直返回“未变化”"""
+
+    def __init__(self, *documents):
+        self.documents = list(documents)
+        self.calls = 0
+        self.failures = 0
+
+    def fetch(self):
+        self.calls += 1
+        time.sleep(0.05)  # 让并发请求在刷新完成前到达
+        if self.documents:
+            return True, self.documents.pop(0)
+        return False, None
+
+    def load_cached(self):
+        return None
+
+
+async def request(port, path, method='GET'):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f"{method} {path} HTTP/1.1\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    headers = dict(line.split(': ', 1) for line in lines[1:])
+    return int(lines[0].split()[1]), headers, body
+
+
+def serve(store, scenario):
+    async def main():
+        server = ApiServer(store, port=0)
+        await server.start()
+        try:
+            await scenario(server.port)
+        finally:
+            server.server.close()
+            await server.server.wait_closed()
+    asyncio.run(main())
+
+
+def test_routes():
+    store = SnapshotStore(FakeFetcher(world_state(fissure('1', 'SolNode27'))), sections=['fissures', 'alerts'])
+
+    async def scenario(port):
+        status, _, body = await request(port, '/')
+        assert status == 200 and json.loads(body) == {'sections': ['fissures', 'alerts']}
+
+        status, headers, body = await request(port, '/fissures')
+        assert status == 200 and 'Age' in headers
+        document = json.loads(body)
+        assert document['section'] == 'fissures' and len(document['data']) == 1
+
+        status, headers, body = await request(port, '/fissures?format=markdown')
+        assert status == 200 and headers['Content-Type'].startswith('text/markdown')
+
+        assert (await request(port, '/sorties'))[0] == 404
+        assert (await request(port, '/fissures?format=xml'))[0] == 400
+        assert (await request(port, '/fissures?lang=xx'))[0] == 400
+        assert (await request(port, '/fissures', method='POST'))[0] == 405
+
+        status, headers, body = await request(port, '/metrics')
+        assert status == 200 and b'api_requests_total' in body
+
+    serve(store, scenario)
+
+
+def test_concurrent_requests_share_one_refresh():
+    fetcher = FakeFetcher(world_state(fissure('1', 'SolNode27')))
+    store = SnapshotStore(fetcher, sections=['fissures', 'alerts'])
+
+    async def scenario(port):
+        responses = await asyncio.gather(*(request(port, path) for path in ['/fissures', '/alerts'] * 5))
+        assert all(status == 200 for status, _, _ in responses)
+        assert fetcher.calls == 1
+
+    serve(store, scenario)
+
+
+def test_upstream_failure_without_snapshot_is_reported():
+    class FailingFetcher(FakeFetcher):
+        def fetch(self):
+            self.failures += 1
+            raise OSError("upstream down")
+
+    store = SnapshotStore(FailingFetcher(), sections=['fissures'])
+
+    async def scenario(port):
+        status, _, body = await request(port, '/fissures')
+        assert status == 503 and b'upstream down' in body
+
+    serve(store, scenario)
+
@@ -0,0 +1,69 @@
+import json
+import os
+
+import pytest
+
+from batch_translate import MANIFEST_FILE, batch_translate, find_inputs
+
+
+def write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    return path
+
+
+def world_state(time):
+    return {'Time': time, 'VoidStorms': [], 'ActiveMissions': []}
+
+
+@pytest.fixture
+def saved(tmp_path):
+    root = str(tmp_path / 'saved')
+    write(os.path.join(root, 'a.json'), world_state(1760623200))
+    write(os.path.join(root, '2026-10', 'b.json'), world_state(1760626800))
+    return root
+
+
+def relative(paths, root):
+    return [os.path.relpath(path, root).replace(os.sep, '/') for path in paths]
+
+
+def test_directory_is_searched_recursively(saved):
+    assert relative(find_inputs(saved), saved) == ['2026-10/b.json', 'a.json']
+
+
+def test_glob_pattern(saved):
+    assert relative(find_inputs(os.path.join(saved, '*', '*.json')), saved) == ['2026-10/b.json']
+
+
+def test_own_outputs_are_not_inputs(saved):
+    write(os.path.join(saved, 'a.report.json'), {'report': True})
+    write(os.path.join(saved, MANIFEST_FILE), {'files': {}})
+    out_dir = os.path.join(saved, 'reports')
+    write(os.path.join(out_dir, 'nested', 'c.json'), world_state(1))
+    assert relative(find_inputs(saved, out_dir), saved) == ['2026-10/b.json', 'a.json']
+    # 不指定输出目录时，其中的普通 JSON 文件仍是输入
+    assert 'reports/nested/c.json' in relative(find_inputs(saved), saved)
+
+
+def test_output_directory_given_with_different_spelling(saved):
+    out_dir = os.path.join(saved, 'reports')
+    write(os.path.join(out_dir, 'c.json'), world_state(1))
+    spelled = os.path.join(saved, '2026-10', '..', 'reports') + os.sep
+    assert relative(find_inputs(saved, spelled), saved) == ['2026-10/b.json', 'a.json']
+
+
+def test_rerun_skips_unchanged_files_and_rejects_other_json(saved, tmp_path):
+    write(os.path.join(saved, 'dictionary.json'), {'MT_SURVIVAL': '生存'})
+    out_dir = str(tmp_path / 'reports')
+    paths = find_inputs(saved, out_dir)
+
+    stats = batch_translate(paths, out_dir, ['railjack', 'fissures'], 'markdown', workers=1)
+    assert (stats['rendered'], stats['skipped'], stats['errors']) == (2, 0, 1)
+    assert os.path.exists(os.path.join(out_dir, 'a.md'))
+    assert os.path.exists(os.path.join(out_dir, '2026-10', 'b.md'))
+    assert not os.path.exists(os.path.join(out_dir, 'dictionary.md'))
+
+    stats = batch_translate(paths, out_dir, ['railjack', 'fissures'], 'markdown', workers=1)
+    assert (stats['rendered'], stats['skipped'], stats['errors']) == (0, 2, 1)
@@ -0,0 +1,112 @@
+import io
+import json
+
+import pytest
+
+from dictionary_compiler import EXTRACTORS, JsonStream
+from models import syndicate_key
+
+CHUNK_SIZES = (1, 2, 3, 7, 64, 256 * 1024)
+
+ESCAPED = {
+    'quote "key"': 'value with "quotes"',
+    'back\\slash': 'C:\\Lotus\\',
+    '\u4e2d\u6587': '\u5e73\u539f\n\u7b2c\u4e8c\u884c\t',
+    '/Lotus/Language/Jobs/\u00e9': '\U0001f600 emoji',
+    'plain': 'plain',
+}
+
+
+def stream(text, chunk_size):
+    return JsonStream(io.StringIO(text), chunk_size=chunk_size)
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+@pytest.mark.parametrize('ensure_ascii', (True, False))
+def test_items_unescape_keys_and_values(chunk_size, ensure_ascii):
+    text = json.dumps(ESCAPED, ensure_ascii=ensure_ascii)
+    assert dict(stream(text, chunk_size).items()) == ESCAPED
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_items_mixed_values_and_whitespace(chunk_size):
+    data = {'n': 12345678901234, 'f': -1.5e-3, 't': True, 'z': None, 'o': {'a': [1, {'b': '}]'}]}, 'e': ''}
+    text = json.dumps(data, indent=3)
+    assert dict(stream(text, chunk_size).items()) == data
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_find_skips_nested_members(chunk_size):
+    data = {
+        'skip': {'deep': [[{'ExportRegions': 'decoy'}]], 'text': 'a "}" b'},
+        'ExportRegions': [{'uniqueName': 'SolNode1', 'name': 'x', 'extra': [1, [2, [3]]]},
+                          {'uniqueName': 'SolNode2', 'name': 'y'}],
+        'after': 1,
+    }
+    s = stream(json.dumps(data), chunk_size)
+    assert s.find('ExportRegions')
+    values = []
+    for _ in s.elements():
+        values.append(s.value())
+    assert values == data['ExportRegions']
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_find_nested_path_and_missing_key(chunk_size):
+    text = json.dumps({'a': {'b': {'c': 'found'}}, 'z': 1})
+    s = stream(text, chunk_size)
+    assert s.find('a', 'b', 'c')
+    assert s.value() == 'found'
+    assert not stream(text, chunk_size).find('missing')
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_empty_containers(chunk_size):
+    assert list(stream('{}', chunk_size).items()) == []
+    s = stream(' [ ] ', chunk_size)
+    assert list(s.elements()) == []
+
+
+def _cut_points(text):
+    return sorted(set(range(1, len(text) - 1)))
+
+
+@pytest.mark.parametrize('chunk_size', (1, 5, 256 * 1024))
+def test_truncated_input_raises(chunk_size):
+    text = json.dumps({'k\\"ey': 'va"lue', 'n': 123, 'nested': {'x': [1, 2, {'y': 'z'}]}})
+    for cut in _cut_points(text):
+        with pytest.raises(ValueError):
+            dict(stream(text[:cut], chunk_size).items())
+
+
+def test_truncated_array_element_raises():
+    text = json.dumps({'ExportRegions': [{'uniqueName': 'SolNode1', 'name': 'x'}, {'uniqueName': 'So'}]})
+    for cut in range(len('{"ExportRegions": ['), len(text) - 1):
+        s = stream(text[:cut], 4)
+        with pytest.raises(ValueError):
+            assert s.find('ExportRegions')
+            for _ in s.elements():
+                s.value()
+
+
+@pytest.mark.parametrize('text', ('{"a" "b"}', '{"a": "b" "c": 1}', '{a: 1}', '[1 2]', '{"a": 1,}'))
+def test_malformed_input_raises(text):
+    s = stream(text, 3)
+    with pytest.raises(ValueError):
+        if text.startswith('['):
+            for _ in s.elements():
+                s.value()
+        else:
+            dict(s.items())
+
+
+def test_syndicate_keys_match_monitor_lookup(tmp_path):
+    path = tmp_path / 'syndicatesData.json'
+    path.write_text(json.dumps({
+        'ArbitersSyndicate': {'name': '仲裁者'},
+        'CephalonSudaSyndicate': {'name': '中枢苏达'},
+        'RadioLegionIntermission12Syndicate': {'name': '午夜电波'},
+    }, ensure_ascii=False), encoding='utf-8')
+    names = EXTRACTORS['syndicates'](str(path))['names']['syndicates']
+    assert names[syndicate_key('ArbitersSyndicate')] == '仲裁者'
+    assert names == {'Arbiters': '仲裁者', 'CephalonSuda': '中枢苏达', 'RadioLegionIntermission12': '午夜电波'}
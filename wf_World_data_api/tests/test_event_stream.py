@@ -0,0 +1,158 @@
+import asyncio
+import json
+
+import pytest
+
+from api_server import SnapshotStore
+from event_stream import EventHub, Subscriber, encode_frame
+from test_api_server import FakeFetcher, fissure, request, serve, world_state
+
+
+def payload(frame):
+    fields = dict(line.split(': ', 1) for line in frame.decode().strip().split('\n'))
+    return int(fields['id']), fields['event'], json.loads(fields['data'])
+
+
+def test_encode_frame():
+    assert encode_frame(7, 'change', b'{"a":1}') == b'id: 7\nevent: change\ndata: {"a":1}\n\n'
+
+
+def test_each_event_is_serialized_once_for_all_subscribers():
+    async def scenario():
+        hub = EventHub()
+        first, second = hub.subscribe(['fissures']), hub.subscribe(['fissures', 'alerts'])
+        other = hub.subscribe(['alerts'])
+        event_id = hub.publish('fissures', {'section': 'fissures', 'text': '裂隙'})
+        (id1, frame1), = first.frames
+        (id2, frame2), = second.frames
+        assert id1 == id2 == event_id and frame1 is frame2
+        assert payload(frame1) == (event_id, 'change', {'section': 'fissures', 'text': '裂隙'})
+        assert not other.frames
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_is_dropped():
+    async def scenario():
+        hub = EventHub(client_buffer=2)
+        subscriber = hub.subscribe(['fissures'])
+        dropped = []
+        subscriber.on_drop = lambda: dropped.append(True)
+        for i in range(3):
+            hub.publish('fissures', {'n': i})
+        assert subscriber.dropped and dropped == [True] and not subscriber.frames
+        hub.publish('fissures', {'n': 3})
+        assert not subscriber.frames and dropped == [True]
+        hub.unsubscribe(subscriber)
+        assert not hub.has_subscribers()
+
+    asyncio.run(scenario())
+
+
+def test_wait_returns_pending_frames_or_times_out():
+    async def scenario():
+        subscriber = Subscriber(['fissures'])
+        assert await subscriber.wait(timeout=0.01) == []
+        waiting = asyncio.ensure_future(subscriber.wait(timeout=5))
+        await asyncio.sleep(0)
+        subscriber.offer(1, b'frame')
+        assert await waiting == [(1, b'frame')]
+
+    asyncio.run(scenario())
+
+
+def test_replay_after_last_event_id():
+    hub = EventHub(history=3)
+    start = hub.last_id
+    ids = [hub.publish(section, {}) for section in ('fissures', 'alerts', 'fissures')]
+    assert [event_id for event_id, _ in hub.replay(start, {'fissures'})] == [ids[0], ids[2]]
+    assert [event_id for event_id, _ in hub.replay(ids[0], {'alerts', 'fissures'})] == ids[1:]
+    assert hub.replay(ids[-1], {'fissures'}) == []
+
+    # 历史只保留 3 条，更早断开的客户端需要重新接收快照
+    hub.publish('fissures', {})
+    assert hub.replay(start, {'fissures'}) is None
+    assert hub.replay(None, {'fissures'}) is None
+    assert hub.replay(hub.last_id + 100, {'fissures'}) is None
+
+
+async def read_event(reader):
+    """读取下一条 SSE 事件，跳过 keep-alive 注释帧"""
+    while True:
+        frame = await asyncio.wait_for(reader.readuntil(b'\n\n'), 5)
+        if not frame.startswith(b':'):
+            return payload(frame)
+
+
+async def open_stream(port, path, last_event_id=None):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    extra = f"Last-Event-ID: {last_event_id}\r\n" if last_event_id is not None else ""
+    writer.write(f"GET {path} HTTP/1.1\r\n{extra}\r\n".encode())
+    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), 5)
+    assert head.startswith(b'HTTP/1.1 200') and b'text/event-stream' in head
+    return reader, writer
+
+
+def test_stream_sends_snapshot_then_changes_and_replays_on_reconnect():
+    fetcher = FakeFetcher(world_state(fissure('1', 'SolNode27')),
+                          world_state(fissure('1', 'SolNode27'), fissure('2', 'SolNode30', 'VoidT2')),
+                          world_state(fissure('2', 'SolNode30', 'VoidT2')))
+    store = SnapshotStore(fetcher, sections=['fissures', 'alerts'], hub=EventHub())
+
+    async def scenario(port):
+        assert (await request(port, '/stream?sections=sorties'))[0] == 400
+
+        reader, writer = await open_stream(port, '/stream?sections=fissures')
+        snapshot_id, event, snapshot = await read_event(reader)
+        assert event == 'snapshot' and len(snapshot['data']) == 1
+
+        store.invalidate()
+        await store.refresh()
+        change_id, event, change = await read_event(reader)
+        assert event == 'change' and change_id > snapshot_id and change['section'] == 'fissures'
+        assert [item['kind'] for item in change['changes']] == ['added']
+        writer.close()
+
+        # 断开期间发布的变化在带 Last-Event-ID 重连时补发，不再发送快照
+        store.invalidate()
+        await store.refresh()
+        reader, writer = await open_stream(port, '/stream?sections=fissures', last_event_id=change_id)
+        missed_id, event, missed = await read_event(reader)
+        assert event == 'change' and missed_id > change_id
+        assert [item['kind'] for item in missed['changes']] == ['removed']
+        writer.close()
+
+        # 未知的编号（例如服务重启之前的）重新发送快照
+        reader, writer = await open_stream(port, '/stream?sections=fissures', last_event_id=1)
+        _, event, snapshot = await read_event(reader)
+        assert event == 'snapshot' and [f['id'] for f in snapshot['data']] == ['2']
+        writer.close()
+
+    serve(store, scenario)
+
+
+def test_stream_reports_upstream_failure():
+    class FailingFetcher(FakeFetcher):
+        def fetch(self):
+            self.failures += 1
+            raise OSError("upstream down")
+
+    store = SnapshotStore(FailingFetcher(), sections=['fissures'], hub=EventHub())
+
+    async def scenario(port):
+        reader, writer = await open_stream(port, '/stream?sections=fissures')
+        _, event, body = await read_event(reader)
+        assert event == 'error' and 'upstream down' in body['error']
+        writer.close()
+
+    serve(store, scenario)
+
+
+@pytest.mark.parametrize('path', ['/stream', '/stream?sections=fissures'])
+def test_stream_disabled_without_hub(path):
+    store = SnapshotStore(FakeFetcher(world_state()), sections=['fissures'])
+
+    async def scenario(port):
+        assert (await request(port, path))[0] == 404
+
+    serve(store, scenario)
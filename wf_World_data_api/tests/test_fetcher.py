@@ -0,0 +1,175 @@
+import http.server
+import json
+import threading
+
+import pytest
+
+pytest.importorskip('requests')
+
+import warframe_monitor  # noqa: E402
+from snapshot_archive import SnapshotArchive  # noqa: E402
+from snapshot_cache import SnapshotCache  # noqa: E402
+from warframe_monitor import WorldStateFetcher  # noqa: E402
+
+LAST_MODIFIED = 'Fri, 16 Oct 2026 14:00:00 GMT'
+
+
+def document(time):
+    return json.dumps({'Time': time, 'ActiveMissions': [{'Node': 'SolNode27', 'Modifier': 'VoidT1'}]}).encode()
+
+
+class Upstream:
+    """本地模拟的 worldState 服务：按队列依次返回预设的响应，并记录每个请求的头"""
+
+    def __init__(self):
+        self.responses = []  # (状态码, 响应体, ETag, 声明的 Content-Length 或 None)
+        self.requests = []
+        upstream = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                upstream.requests.append(dict(self.headers))
+                status, body, etag, length = upstream.responses.pop(0)
+                if status == 304 and self.headers.get('If-None-Match') != etag:
+                    status = 200
+                self.send_response(status)
+                if etag:
+                    self.send_header('ETag', etag)
+                    self.send_header('Last-Modified', LAST_MODIFIED)
+                if status == 304:
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_header('Content-Length', str(len(body) if length is None else length))
+                if length is not None:
+                    self.send_header('Connection', 'close')
+                    self.close_connection = True
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/dynamic/worldState.php"
+        threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True).start()
+
+    def respond(self, status=200, body=b'', etag=None, length=None):
+        self.responses.append((status, body, etag, length))
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def upstream():
+    server = Upstream()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def fetcher(upstream):
+    fetcher = WorldStateFetcher(upstream.url, timeout=5)
+    yield fetcher
+    fetcher.close()
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    delays = []
+    monkeypatch.setattr(warframe_monitor.time, 'sleep', delays.append)
+    return delays
+
+
+def test_conditional_get_uses_stored_validators(upstream, fetcher):
+    upstream.respond(body=document(1), etag='"v1"')
+    upstream.respond(304, etag='"v1"')
+
+    changed, data = fetcher.fetch()
+    assert changed and data['Time'] == 1
+    assert (fetcher.etag, fetcher.last_modified) == ('"v1"', LAST_MODIFIED)
+    assert 'If-None-Match' not in upstream.requests[0]
+
+    assert fetcher.fetch() == (False, None)
+    assert upstream.requests[1]['If-None-Match'] == '"v1"'
+    assert upstream.requests[1]['If-Modified-Since'] == LAST_MODIFIED
+
+
+def test_same_content_is_not_decoded_again(upstream, fetcher):
+    upstream.respond(body=document(1), etag='"v1"')
+    upstream.respond(body=document(1), etag='"v2"')
+    assert fetcher.fetch()[0]
+    assert fetcher.fetch() == (False, None)
+    assert fetcher.etag == '"v2"'
+
+
+def test_undecodable_body_clears_validators(upstream, fetcher):
+    upstream.respond(body=document(1), etag='"v1"')
+    upstream.respond(body=b'<html>502</html>', etag='"bad"')
+    upstream.respond(body=document(2), etag='"v2"')
+    fetcher.fetch()
+
+    with pytest.raises(ValueError):
+        fetcher.fetch()
+    assert fetcher.etag is None and fetcher.last_modified is None
+    assert fetcher.failures == 1
+
+    changed, data = fetcher.fetch()
+    assert 'If-None-Match' not in upstream.requests[2]
+    assert changed and data['Time'] == 2 and fetcher.failures == 0
+
+
+def test_truncated_body_is_not_recorded(upstream, fetcher, tmp_path):
+    fetcher.archive = SnapshotArchive(str(tmp_path / 'archive'))
+    fetcher.cache = SnapshotCache(str(tmp_path / 'cache'))
+    body = document(1)
+    upstream.respond(body=body[:len(body) // 2], etag='"v1"', length=len(body))
+    try:
+        with pytest.raises(warframe_monitor.requests.RequestException):
+            fetcher.fetch()
+        assert fetcher.etag is None and fetcher.content_hash is None
+        assert len(fetcher.archive) == 0
+        assert fetcher.cache.load() is None
+    finally:
+        fetcher.archive.close()
+
+
+def test_successful_fetch_is_archived_and_cached(upstream, fetcher, tmp_path):
+    fetcher.archive = SnapshotArchive(str(tmp_path / 'archive'))
+    fetcher.cache = SnapshotCache(str(tmp_path / 'cache'))
+    upstream.respond(body=b'{"Time": ', etag='"bad"')
+    upstream.respond(body=document(1), etag='"v1"')
+    try:
+        with pytest.raises(ValueError):
+            fetcher.fetch()
+        assert len(fetcher.archive) == 0
+        fetcher.fetch()
+        assert len(fetcher.archive) == 1
+        cached = fetcher.cache.load()
+        assert cached.body == document(1) and cached.etag == '"v1"'
+    finally:
+        fetcher.archive.close()
+
+
+def test_retry_recovers_after_server_errors(upstream, fetcher, no_sleep):
+    upstream.respond(503, body=b'busy')
+    upstream.respond(200, body=b'not json')
+    upstream.respond(body=document(3), etag='"v3"')
+    changed, data = fetcher.fetch_with_retry(attempts=3)
+    assert changed and data['Time'] == 3
+    assert len(no_sleep) == 2 and all(delay > 0 for delay in no_sleep)
+    assert fetcher.failures == 0
+
+
+def test_retry_gives_up_after_attempts(upstream, fetcher, no_sleep):
+    for _ in range(3):
+        upstream.respond(500, body=b'error')
+    with pytest.raises(warframe_monitor.requests.HTTPError):
+        fetcher.fetch_with_retry(attempts=3)
+    assert len(upstream.requests) == 3
+    assert len(no_sleep) == 2
+    assert fetcher.failures == 3
@@ -0,0 +1,85 @@
+import io
+import os
+
+import pytest
+
+from render import LiveScreen
+
+
+class Terminal(io.StringIO):
+    def isatty(self):
+        return True
+
+
+@pytest.fixture
+def terminal(monkeypatch):
+    monkeypatch.setattr('shutil.get_terminal_size', lambda: os.terminal_size((80, 6)))
+    return Terminal()
+
+
+def drain(stream):
+    text = stream.getvalue()
+    stream.seek(0)
+    stream.truncate()
+    return text
+
+
+def test_first_frame_clears_screen(terminal):
+    screen = LiveScreen(terminal)
+    assert screen.draw(['a', 'b'], '状态') == 3
+    assert drain(terminal) == "\x1b[2J\x1b[H状态\x1b[K\na\x1b[K\nb\x1b[K\x1b[4;1H"
+
+
+def test_only_changed_lines_are_redrawn(terminal):
+    screen = LiveScreen(terminal)
+    screen.draw(['裂隙 59分钟', '突击'], '状态')
+    drain(terminal)
+    assert screen.draw(['裂隙 58分钟', '突击'], '状态') == 1
+    assert drain(terminal) == "\x1b[2;1H裂隙 58分钟\x1b[K\x1b[4;1H"
+    assert screen.draw(['裂隙 58分钟', '突击'], '状态') == 0
+    assert drain(terminal) == ""
+
+
+def test_shorter_frame_clears_leftover_lines(terminal):
+    screen = LiveScreen(terminal)
+    screen.draw(['a', 'b', 'c'])
+    drain(terminal)
+    assert screen.draw(['a']) == 0
+    assert drain(terminal) == "\x1b[2;1H\x1b[J\x1b[2;1H"
+
+
+def test_frame_is_cut_to_terminal_height(terminal):
+    screen = LiveScreen(terminal)
+    screen.draw([str(i) for i in range(10)], '状态')
+    assert screen.lines == ['状态', '0', '1', '2', '3']
+
+
+def test_reset_redraws_everything(terminal):
+    screen = LiveScreen(terminal)
+    screen.draw(['a'])
+    screen.reset()
+    drain(terminal)
+    screen.draw(['a'])
+    assert drain(terminal).startswith("\x1b[2J\x1b[H")
+
+
+def test_redirected_output_is_written_once_per_snapshot():
+    stream = io.StringIO()
+    screen = LiveScreen(stream)
+    first, second = object(), object()
+    assert screen.draw([], '🔄正在刷新...', None) == 0
+    assert screen.draw(['裂隙 59分钟'], '⏰下次刷新: 60 秒后', first) == 1
+    # 同一份快照每秒的倒计时和状态行都不写出
+    assert screen.draw(['裂隙 58分钟'], '⏰下次刷新: 59 秒后', first) == 0
+    assert screen.draw(['裂隙 57分钟'], '🔄正在刷新...', second) == 1
+    assert stream.getvalue() == "裂隙 59分钟\n裂隙 57分钟\n"
+    assert "\x1b" not in stream.getvalue()
+
+
+def test_redirected_output_without_version_compares_content():
+    stream = io.StringIO()
+    screen = LiveScreen(stream)
+    screen.draw(['a'])
+    screen.draw(['a'])
+    screen.draw(['b'])
+    assert stream.getvalue() == "a\nb\n"
@@ -0,0 +1,144 @@
+import json
+
+import pytest
+
+from api_server import SnapshotStore
+from locales import Localizer, parse_locale_spec
+from models import parse_world_state
+from sections import SECTIONS
+from test_api_server import FakeFetcher, fissure, request, serve, world_state
+
+NOW = 1760623200
+
+# dictionary_compiler.py 输出的英文字典，与 conftest.TEST_DICTIONARIES 的键相同
+EN_DICTIONARIES = {
+    'wfdata.json': {
+        'missions': {'MT_SURVIVAL': 'Survival', 'MT_DEFENSE': 'Defense'},
+        'factions': {'FC_GRINEER': 'Grineer'},
+        'bosses': {'SORTIE_BOSS_VOR': 'Captain Vor'},
+        'syndicates': {'Arbiters': 'Arbiters of Hexis'},
+        'Modifier': {'VoidT1': 'Lith Fissure'},
+    },
+    'node.json': {'SolNode27': 'Earth-E Prime', 'SolNode30': 'Mars-Olympus'},
+    'dict_en.json': {'/Lotus/Language/Jobs/Capture': 'Capture',
+                     '/Lotus/Types/Challenges/Seasons/Daily/Kill': 'Kill Enemies'},
+    'ExportBounties.json': {'/Lotus/Types/Jobs/Capture': '/Lotus/Language/Jobs/Capture'},
+}
+
+
+def write_dictionaries(directory, dictionaries):
+    directory.mkdir(exist_ok=True)
+    for filename, data in dictionaries.items():
+        (directory / filename).write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+    return str(directory)
+
+
+@pytest.fixture
+def localizer(tmp_path, dictionaries):
+    localizer = Localizer()
+    localizer.add_locale('en', write_dictionaries(tmp_path / 'en', EN_DICTIONARIES))
+    return localizer
+
+
+@pytest.fixture
+def snapshot(dictionaries):
+    return parse_world_state({
+        'Time': NOW,
+        'ActiveMissions': [
+            {'_id': {'$oid': 'f1'}, 'Node': 'SolNode27', 'MissionType': 'MT_SURVIVAL', 'Modifier': 'VoidT1'},
+            {'_id': {'$oid': 'f2'}, 'Node': 'SolNode30', 'MissionType': 'MT_EXTERMINATION', 'Modifier': 'VoidT2'},
+        ],
+        'SyndicateMissions': [
+            {'_id': {'$oid': 'sy1'}, 'Tag': 'ArbitersSyndicate', 'Nodes': ['SolNode27', 'SolNode30']},
+            {'_id': {'$oid': 'sy2'}, 'Tag': 'CetusSyndicate', 'Jobs': [{'jobType': '/Lotus/Types/Jobs/Capture'}]},
+        ],
+        'SeasonInfo': {'ActiveChallenges': [{'Challenge': '/Lotus/Types/Challenges/Seasons/Daily/Kill'}]},
+        'Events': [{'Messages': [{'LanguageCode': 'zh', 'Message': '新闻'}, {'LanguageCode': 'en', 'Message': 'News'}]},
+                   {'Messages': [{'LanguageCode': 'en', 'Message': 'English only'}]}],
+    })
+
+
+def test_name_lookup(localizer):
+    assert localizer.locales == ('zh', 'en')
+    assert localizer.name('SolNode27', 'en') == 'Earth-E Prime'
+    assert localizer.name('SolNode999', 'en', 'SolNode999') == 'SolNode999'
+    assert localizer.name('SolNode27', 'ru', '?') == '?'
+
+
+def test_sections_resolve_into_all_locales_in_one_pass(localizer, snapshot):
+    resolved = localizer.resolve(SECTIONS['fissures'].payload(snapshot))
+    zh, en = resolved['zh'], resolved['en']
+    assert [(f['node_name'], f['mission_type_name'], f['tier_name']) for f in zh] == [
+        ('地球-E Prime', '生存', '古纪 裂隙'), ('火星-Olympus', '歼灭', '前纪 裂隙')]
+    # 英文字典缺少的键沿用基础语言的名称，原始键和其他字段不变
+    assert [(f['node_name'], f['mission_type_name'], f['tier_name']) for f in en] == [
+        ('Earth-E Prime', 'Survival', 'Lith Fissure'), ('Mars-Olympus', '歼灭', '前纪 裂隙')]
+    assert [f['node'] for f in en] == ['SolNode27', 'SolNode30']
+    assert resolved['zh'] == SECTIONS['fissures'].payload(snapshot)
+
+
+def test_name_fields_by_record_type(localizer, snapshot):
+    resolved = localizer.resolve_sections(snapshot, ['syndicates', 'bounties', 'nightwave'], ['en'])['en']
+    board, = resolved['syndicates']
+    assert board['name'] == 'Arbiters of Hexis'
+    assert board['node_names'] == ['Earth-E Prime', 'Mars-Olympus']
+    assert resolved['bounties'][0]['jobs'][0]['name'] == 'Capture'
+    assert resolved['nightwave']['challenges'][0]['name'] == 'Kill Enemies'
+
+
+def test_event_messages_by_locale(localizer, snapshot):
+    resolved = localizer.resolve(SECTIONS['events'].payload(snapshot))
+    assert [event['message'] for event in resolved['zh']] == ['新闻', 'English only']
+    assert [event['message'] for event in resolved['en']] == ['News', 'English only']
+
+
+def test_locales_share_one_key_table(localizer, tmp_path):
+    ru = dict(EN_DICTIONARIES, **{'node.json': {'SolNode27': 'Земля-E Prime'}})
+    ru['dict_ru.json'] = ru.pop('dict_en.json')
+    localizer.add_locale('ru', write_dictionaries(tmp_path / 'ru', ru))
+    localizer.refresh()
+    keys = len(localizer.keys)
+    en, ru_table = localizer._tables['en'], localizer._tables['ru']
+    assert keys == len(en.names) >= len(ru_table.names)
+    assert localizer.name('SolNode27', 'ru') == 'Земля-E Prime'
+    assert localizer.name('SolNode30', 'ru') is None
+    # 编号只分配一次，重新加载同样的键不会增加
+    ru_table.load(localizer.keys)
+    assert len(localizer.keys) == keys
+
+
+def test_refresh_reloads_changed_locale(localizer, tmp_path):
+    assert localizer.refresh() == ['en']
+    assert localizer.refresh() == []
+    write_dictionaries(tmp_path / 'en', dict(EN_DICTIONARIES, **{'node.json': {'SolNode27': 'Earth - E Prime (updated)'}}))
+    assert localizer.refresh() == ['en']
+    assert localizer.name('SolNode27', 'en') == 'Earth - E Prime (updated)'
+
+
+def test_locale_errors(localizer):
+    with pytest.raises(ValueError):
+        localizer.resolve([], ['ru'])
+    with pytest.raises(ValueError):
+        localizer.add_locale('zh', '.')
+
+
+def test_parse_locale_spec():
+    assert parse_locale_spec('en = dictionaries/en') == ('en', 'dictionaries/en')
+    for value in ('en', 'en=', '=dictionaries/en'):
+        with pytest.raises(ValueError):
+            parse_locale_spec(value)
+
+
+def test_api_lang_parameter(localizer):
+    store = SnapshotStore(FakeFetcher(world_state(fissure('1', 'SolNode27'))), sections=['fissures'],
+                          localizer=localizer)
+
+    async def scenario(port):
+        status, _, body = await request(port, '/fissures?lang=en')
+        assert status == 200
+        document = json.loads(body)
+        assert document['lang'] == 'en' and document['data'][0]['node_name'] == 'Earth-E Prime'
+        assert json.loads((await request(port, '/fissures'))[2])['data'][0]['node_name'] == '地球-E Prime'
+        assert (await request(port, '/fissures?lang=ru'))[0] == 400
+
+    serve(store, scenario)
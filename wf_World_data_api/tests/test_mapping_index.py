@@ -0,0 +1,79 @@
+import json
+
+from lookups import register_dictionaries
+from mapping_index import MappingIndex, compile_mapping_table
+from mapping_registry import MappingRegistry
+
+
+def make_registry(tmp_path, names=None, nodes=None, dict_zh=None, bounties=None):
+    files = {'wfdata.json': names or {}, 'node.json': nodes or {},
+             'dict_zh.json': dict_zh or {}, 'ExportBounties.json': bounties or {}}
+    for filename, data in files.items():
+        (tmp_path / filename).write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+    registry = MappingRegistry()
+    register_dictionaries(registry, str(tmp_path))
+    return registry
+
+
+def test_compile_merges_all_categories(tmp_path):
+    registry = make_registry(
+        tmp_path,
+        names={'missions': {'MT_SURVIVAL': '生存'}, 'factions': {'FC_GRINEER': 'Grineer'}},
+        nodes={'SolNode27': 'E Prime (地球)'},
+        dict_zh={'/Lotus/Language/Jobs/Capture': '捕获'},
+        bounties={'/Lotus/Types/Jobs/Capture': '/Lotus/Language/Jobs/Capture',
+                  '/Lotus/Types/Jobs/Unknown': '/Lotus/Language/Jobs/Unknown'})
+    assert compile_mapping_table(registry) == {
+        'MT_SURVIVAL': '生存', 'FC_GRINEER': 'Grineer', 'SolNode27': 'E Prime (地球)',
+        '/Lotus/Language/Jobs/Capture': '捕获',
+        '/Lotus/Types/Jobs/Capture': '捕获', '/Lotus/Types/Jobs/Unknown': 'Unknown'}
+
+
+def test_same_name_in_two_categories_is_not_a_conflict(tmp_path):
+    registry = make_registry(tmp_path, names={'missions': {'MT_X': '名称'}, 'bosses': {'MT_X': '名称'}})
+    assert compile_mapping_table(registry) == {'MT_X': '名称'}
+
+
+def test_cross_category_collision_later_category_wins(tmp_path, capsys):
+    registry = make_registry(tmp_path, names={'missions': {'KEY': '任务'}, 'bosses': {'KEY': '首领'}})
+    assert compile_mapping_table(registry) == {'KEY': '首领'}
+    assert 'wfdata.json[missions]' in capsys.readouterr().out
+
+
+def test_collision_between_dictionaries_node_json_wins(tmp_path, capsys):
+    registry = make_registry(tmp_path, names={'missions': {'SolNode27': '任务'}},
+                             nodes={'SolNode27': 'E Prime (地球)'})
+    assert compile_mapping_table(registry) == {'SolNode27': 'E Prime (地球)'}
+    out = capsys.readouterr().out
+    assert 'SolNode27' in out and 'node.json' in out
+
+
+def test_collision_outside_selected_sources_is_ignored(tmp_path):
+    registry = make_registry(tmp_path, names={'missions': {'SolNode27': '任务'}},
+                             nodes={'SolNode27': 'E Prime (地球)'})
+    assert compile_mapping_table(registry, ['nodes']) == {'SolNode27': 'E Prime (地球)'}
+
+
+def test_subset_selection_does_not_overwrite_full_cache(tmp_path):
+    registry = make_registry(tmp_path, names={'missions': {'MT_SURVIVAL': '生存'}},
+                             nodes={'SolNode27': 'E Prime (地球)'})
+    cache_path = str(tmp_path / '.mapping_index.bin')
+
+    subset = MappingIndex(registry, cache_path)
+    subset.select(['nodes'])
+    assert subset.get('SolNode27') == 'E Prime (地球)'
+    assert subset.cache_file == str(tmp_path / '.mapping_index.nodes.bin')
+    assert not (tmp_path / '.mapping_index.bin').exists()
+
+    full = MappingIndex(registry, cache_path)
+    assert full.get('MT_SURVIVAL') == '生存'
+    assert full.cache_file == cache_path
+    full_cache = (tmp_path / '.mapping_index.bin').read_bytes()
+
+    # 完整缓存可用时部分选择直接读取它，之后的部分编译也不会改写它
+    subset = MappingIndex(registry, cache_path)
+    subset.select(['names', 'nodes'])
+    assert subset.get('MT_SURVIVAL') == '生存'
+    subset.rebuild()
+    assert (tmp_path / '.mapping_index.bin').read_bytes() == full_cache
+    assert (tmp_path / '.mapping_index.names+nodes.bin').exists()
@@ -0,0 +1,74 @@
+import json
+
+import mapping_index
+from mapping_index import MappingIndex
+from mapping_registry import MappingRegistry
+
+
+def write(path, data):
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+
+
+def test_each_dictionary_is_parsed_once(tmp_path):
+    write(tmp_path / 'node.json', {'SolNode27': 'E Prime (地球)'})
+    registry = MappingRegistry()
+    registry.register('nodes', str(tmp_path / 'node.json'))
+    nodes = registry.get('nodes')
+    assert nodes == {'SolNode27': 'E Prime (地球)'}
+    assert registry.get('nodes') is nodes
+    assert registry.refresh() == []
+    assert registry.get('nodes') is nodes
+
+
+def test_refresh_reloads_only_changed_files(tmp_path):
+    write(tmp_path / 'node.json', {'SolNode27': 'E Prime (地球)'})
+    write(tmp_path / 'dict_zh.json', {'/Lotus/Language/A': '甲'})
+    registry = MappingRegistry()
+    registry.register('nodes', str(tmp_path / 'node.json'))
+    registry.register('dict_zh', str(tmp_path / 'dict_zh.json'))
+    dict_zh = registry.get('dict_zh')
+    registry.get('nodes')
+
+    write(tmp_path / 'node.json', {'SolNode27': 'E Prime (地球)', 'SolNode30': 'Olympus (火星)'})
+    assert registry.refresh() == ['nodes']
+    assert registry.get('nodes')['SolNode30'] == 'Olympus (火星)'
+    assert registry.get('dict_zh') is dict_zh
+
+
+def test_missing_file_uses_default_and_is_loaded_when_it_appears(tmp_path, capsys):
+    registry = MappingRegistry()
+    registry.register('names', str(tmp_path / 'wfdata.json'), default=dict, missing_message="缺少 wfdata.json")
+    assert registry.get('names') == {}
+    assert "缺少 wfdata.json" in capsys.readouterr().out
+
+    write(tmp_path / 'wfdata.json', {'missions': {'MT_SURVIVAL': '生存'}})
+    assert registry.refresh() == ['names']
+    assert registry.get('names') == {'missions': {'MT_SURVIVAL': '生存'}}
+
+
+def test_corrupt_file_falls_back_to_default(tmp_path, capsys):
+    (tmp_path / 'node.json').write_text('{"SolNode27": ', encoding='utf-8')
+    registry = MappingRegistry()
+    registry.register('nodes', str(tmp_path / 'node.json'))
+    assert registry.get('nodes') == {}
+    assert '警告' in capsys.readouterr().out
+
+
+def test_lookup_table_follows_dictionary_changes(tmp_path, monkeypatch):
+    write(tmp_path / 'node.json', {'SolNode27': 'E Prime (地球)'})
+    registry = MappingRegistry()
+    registry.register('nodes', str(tmp_path / 'node.json'))
+    index = MappingIndex(registry, str(tmp_path / '.mapping_index.bin'))
+    assert index.get('SolNode27') == 'E Prime (地球)'
+    assert not index.refresh()
+
+    write(tmp_path / 'node.json', {'SolNode27': 'E 初始 (地球)'})
+    generation = index.generation
+    assert index.refresh()
+    assert index.get('SolNode27') == 'E 初始 (地球)'
+    assert index.generation > generation
+
+    # 新进程从磁盘缓存载入，不需要重新编译
+    monkeypatch.setattr(mapping_index, 'compile_mapping_table', None)
+    reloaded = MappingIndex(registry, str(tmp_path / '.mapping_index.bin'))
+    assert reloaded.get('SolNode27') == 'E 初始 (地球)'
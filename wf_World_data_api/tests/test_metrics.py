@@ -0,0 +1,97 @@
+import io
+import json
+
+import pytest
+
+from metrics import LATENCY_BUCKETS, Metrics, metrics
+from models import _parse_nightwave
+
+
+def test_counters_and_labels():
+    m = Metrics()
+    m.inc('upstream_requests_total', result='ok')
+    m.inc('upstream_requests_total', result='ok')
+    m.inc('upstream_requests_total', 3, result='not_modified')
+    assert m.value('upstream_requests_total', result='ok') == 2
+    assert m.value('upstream_requests_total', result='not_modified') == 3
+    assert m.value('upstream_requests_total', result='error') == 0
+
+
+def test_render_prometheus_text():
+    m = Metrics()
+    m.inc('api_requests_total', path='/fissures', status=200)
+    m.observe('stage_seconds', 0.003, stage='parse')
+    m.observe('stage_seconds', 20.0, stage='parse')
+    text = m.render()
+    assert '# TYPE warframe_api_requests_total counter' in text
+    assert 'warframe_api_requests_total{path="/fissures",status="200"} 1' in text
+    assert '# TYPE warframe_stage_seconds histogram' in text
+    assert 'warframe_stage_seconds_bucket{stage="parse",le="0.0025"} 0' in text
+    assert 'warframe_stage_seconds_bucket{stage="parse",le="0.005"} 1' in text
+    assert f'warframe_stage_seconds_bucket{{stage="parse",le="{LATENCY_BUCKETS[-1]}"}} 1' in text
+    assert 'warframe_stage_seconds_bucket{stage="parse",le="+Inf"} 2' in text
+    assert 'warframe_stage_seconds_count{stage="parse"} 2' in text
+
+
+def test_label_values_are_escaped():
+    m = Metrics()
+    m.inc('errors_total', stage='fetch', type='a"b\\c\nd')
+    assert 'type="a\\"b\\\\c\\nd"' in m.render()
+
+
+def test_timer_skips_failed_blocks():
+    m = Metrics()
+    with m.stage('render'):
+        pass
+    with pytest.raises(ValueError):
+        with m.stage('render'):
+            raise ValueError
+    assert m.histograms['stage_seconds', (('stage', 'render'),)].count == 1
+
+
+def test_error_counts_by_stage_and_type():
+    m = Metrics()
+    m.error('fetch', TimeoutError())
+    m.error('fetch', TimeoutError())
+    assert m.value('errors_total', stage='fetch', type='TimeoutError') == 2
+
+
+def test_structured_log_skips_high_frequency_counters():
+    m = Metrics()
+    stream = io.StringIO()
+    m.enable_log(stream)
+    m.inc('dictionary_misses_total', log=False)
+    m.inc('upstream_bytes_total', 512)
+    m.observe('stage_seconds', 0.25, stage='fetch')
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [(r['metric'], r['value']) for r in records] == [('upstream_bytes_total', 512), ('stage_seconds', 0.25)]
+    assert records[1]['stage'] == 'fetch'
+
+
+def test_export_and_merge_round_trip():
+    worker, total = Metrics(), Metrics()
+    worker.inc('api_requests_total', path='/', status=200)
+    worker.observe('stage_seconds', 0.01, stage='api')
+    total.inc('api_requests_total', path='/', status=200)
+    total.merge(json.loads(json.dumps(worker.export())))
+    assert total.value('api_requests_total', path='/', status=200) == 2
+    assert total.histograms['stage_seconds', (('stage', 'api'),)].count == 1
+
+
+def test_write_textfile(tmp_path):
+    m = Metrics()
+    m.inc('push_events_total')
+    path = str(tmp_path / 'warframe.prom')
+    m.write_textfile(path)
+    with open(path, encoding='utf-8') as f:
+        assert 'warframe_push_events_total 1' in f.read()
+
+
+def test_unmapped_nightwave_challenge_counts_one_miss(dictionaries):
+    before = metrics.value('dictionary_misses_total')
+    nightwave = _parse_nightwave({'ActiveChallenges': [
+        {'Challenge': '/Lotus/Types/Challenges/Seasons/Daily/Kill'},
+        {'Challenge': '/Lotus/Types/Challenges/Seasons/Weekly/Unknown'},
+    ]})
+    assert [c.mapped for c in nightwave.challenges] == [True, False]
+    assert metrics.value('dictionary_misses_total') - before == 1
@@ -0,0 +1,173 @@
+import json
+
+import pytest
+
+import models
+from models import Fissure, WorldSnapshot, as_snapshot, is_expired, parse_date, parse_world_state
+
+
+def date(seconds):
+    return {'$date': {'$numberLong': str(seconds * 1000)}}
+
+
+WORLD_STATE = {
+    'Time': 1760623200,
+    'Alerts': [{'_id': {'$oid': 'a1'}, 'Activation': date(1760620000), 'Expiry': date(1760630000),
+                'MissionInfo': {'missionType': 'MT_DEFENSE', 'faction': 'FC_CORPUS', 'location': 'SolNode30',
+                                'missionReward': {'credits': 8000}}}],
+    'Invasions': [{'_id': {'$oid': 'i1'}, 'Activation': date(1760600000), 'Node': 'SolNode27',
+                   'Faction': 'FC_GRINEER', 'Count': -4500, 'Goal': 9000, 'Completed': False}],
+    'ActiveMissions': [
+        {'_id': {'$oid': 'f1'}, 'Activation': date(1760620000), 'Expiry': date(1760626800),
+         'Node': 'SolNode27', 'MissionType': 'MT_SURVIVAL', 'Modifier': 'VoidT1', 'Hard': True},
+        {'_id': {'$oid': 'f2'}, 'Activation': date(1760620000), 'Expiry': date(1760626800),
+         'Node': 'SolNode30', 'MissionType': 'MT_DEFENSE', 'Modifier': 'VoidT2'},
+        # 不是裂隙的 ActiveMissions 条目
+        {'_id': {'$oid': 'x1'}, 'Node': 'SolNode30', 'MissionType': 'MT_DEFENSE', 'Modifier': 'Other'},
+    ],
+    'VoidStorms': [{'_id': {'$oid': 's1'}, 'Activation': date(1760620000), 'Expiry': date(1760626800),
+                    'Node': 'CrewBattleNode519', 'ActiveMissionTier': 'VoidT1'}],
+    'Sorties': [{'_id': {'$oid': 'so1'}, 'Activation': date(1760600000), 'Expiry': date(1760686400),
+                 'Boss': 'SORTIE_BOSS_VOR',
+                 'Variants': [{'missionType': 'MT_EXTERMINATION', 'modifierType': 'SORTIE_MODIFIER_LOW_ENERGY',
+                               'node': 'SolNode27'}]}],
+    'LiteSorties': [{'_id': {'$oid': 'ah1'}, 'Activation': date(1760400000), 'Expiry': date(1761004800),
+                     'Boss': 'SORTIE_BOSS_NIRA',
+                     'Missions': [{'missionType': 'MT_SURVIVAL', 'node': 'SolNode30'}]}],
+    'VoidTraders': [{'_id': {'$oid': 'b1'}, 'Activation': date(1760600000), 'Expiry': date(1760800000),
+                     'Character': "Baro'Ki Teel", 'Node': 'PlutoHUB', 'Manifest': [{}, {}, {}]}],
+    'SyndicateMissions': [
+        {'_id': {'$oid': 'sy1'}, 'Tag': 'ArbitersSyndicate', 'Activation': date(1760600000),
+         'Expiry': date(1760686400), 'Nodes': ['SolNode27', 'SolNode30']},
+        {'_id': {'$oid': 'sy2'}, 'Tag': 'CetusSyndicate', 'Activation': date(1760600000),
+         'Expiry': date(1760686400),
+         'Jobs': [{'jobType': '/Lotus/Types/Jobs/Capture', 'masteryReq': 2, 'minEnemyLevel': 5,
+                   'maxEnemyLevel': 15}]},
+    ],
+    'SeasonInfo': {'Season': 14, 'Phase': 0, 'Activation': date(1760000000), 'Expiry': date(1770000000),
+                   'ActiveChallenges': [
+                       {'_id': {'$oid': 'c1'}, 'Daily': True, 'Activation': date(1760600000),
+                        'Expiry': date(1760686400), 'Challenge': '/Lotus/Types/Challenges/Seasons/Daily/Kill'},
+                       {'_id': {'$oid': 'c2'}, 'Challenge': '/Lotus/Types/Challenges/Seasons/Weekly/Unknown'},
+                   ]},
+    'Events': [{'_id': {'$oid': 'e1'}, 'Date': date(1760600000),
+                'Messages': [{'LanguageCode': 'zh', 'Message': '新闻'}, {'LanguageCode': 'zh', 'Message': '重复'},
+                             {'LanguageCode': 'en', 'Message': 'News'}]}],
+}
+
+
+@pytest.fixture
+def snapshot(dictionaries):
+    return parse_world_state(WORLD_STATE)
+
+
+@pytest.mark.parametrize('value, expected', [
+    ({'$date': {'$numberLong': '1760623200123'}}, 1760623200),
+    ({'$date': 1760623200000}, 1760623200),
+    ({'$date': {'$numberLong': 'oops'}}, None),
+    ({}, None),
+    (None, None),
+    ('2026-10-16', None),
+])
+def test_parse_date(value, expected):
+    assert parse_date(value) == expected
+
+
+def test_is_expired():
+    assert not is_expired(None, now=0)
+    assert not is_expired(100, now=99)
+    assert is_expired(100, now=100)
+
+
+def test_records_are_slotted_and_resolved(snapshot):
+    alert, = snapshot.alerts
+    assert not hasattr(alert, '__dict__')
+    assert (alert.id, alert.activation, alert.expiry) == ('a1', 1760620000, 1760630000)
+    assert (alert.mission_type_name, alert.faction_name, alert.node_name) == ('防御', 'Corpus', '火星-Olympus')
+    assert alert.credits == 8000
+
+    invasion, = snapshot.invasions
+    assert (invasion.node_name, invasion.faction_name, invasion.progress) == ('地球-E Prime', 'Grineer', 50)
+
+    assert [f.id for f in snapshot.fissures] == ['f1', 'f2']
+    first = snapshot.fissures[0]
+    assert (first.tier_name, first.mission_type_name, first.hard) == ('古纪 裂隙', '生存', True)
+    assert list(snapshot.fissures_by_tier) == ['VoidT1', 'VoidT2']
+
+    storm, = snapshot.void_storms
+    assert (storm.node_name, storm.tier_name) == ('土星-Vesper Strait', '古纪 裂隙')
+
+
+def test_sortie_archon_and_traders(snapshot):
+    sortie, = snapshot.sorties
+    assert sortie.boss_name == 'Vor 上尉'
+    variant, = sortie.variants
+    assert (variant.mission_type_name, variant.modifier, variant.node_name) == ('歼灭', 'LOW_ENERGY', '地球-E Prime')
+
+    assert snapshot.archon_hunt.id == 'ah1'
+    assert snapshot.archon_hunt.boss_name == '执行官 妮拉'
+    assert snapshot.archon_hunt.missions[0].mission_type == 'MT_SURVIVAL'
+
+    trader, = snapshot.void_traders
+    assert (trader.character, trader.manifest_size) == ("Baro'Ki Teel", 3)
+
+
+def test_syndicates_bounties_nightwave_and_events(snapshot):
+    board, = snapshot.syndicate_boards
+    assert (board.name, board.node_names) == ('仲裁者', ('地球-E Prime', '火星-Olympus'))
+    assert snapshot.syndicate_count == 2
+
+    bounty_board, = snapshot.bounty_boards
+    assert bounty_board.location == '地球希图斯'
+    assert [(job.name, job.mastery_req, job.max_level) for job in bounty_board.jobs] == [('捕获', 2, 15)]
+
+    daily, weekly = snapshot.nightwave.challenges
+    assert (daily.name, daily.daily, daily.mapped) == ('击杀敌人', True, True)
+    assert (weekly.name, weekly.daily, weekly.mapped) == ('Unknown', False, False)
+
+    event, = snapshot.events
+    assert event.listed and event.messages == {'zh': '新闻', 'en': 'News'}
+
+
+def test_syndicate_missions_are_walked_once(dictionaries, monkeypatch):
+    calls = []
+    real = models._parse_syndicates
+
+    def counting(*args):
+        calls.append(args[1:])
+        return real(*args)
+
+    monkeypatch.setattr(models, '_parse_syndicates', counting)
+    snapshot = parse_world_state(WORLD_STATE)
+    assert calls == [(True, True)]
+    assert snapshot.syndicate_boards and snapshot.bounty_boards
+
+
+def test_unselected_sections_are_not_parsed(dictionaries):
+    snapshot = parse_world_state(WORLD_STATE, sections={'fissures'})
+    assert len(snapshot.fissures) == 2
+    assert snapshot.alerts == [] and snapshot.sorties == [] and snapshot.bounty_boards == []
+    assert snapshot.archon_hunt is None and snapshot.nightwave is None
+
+
+def test_missing_sections_give_empty_fields(dictionaries):
+    snapshot = parse_world_state({'Time': 1})
+    assert snapshot.time == 1
+    assert snapshot.fissures == [] and snapshot.fissures_by_tier == {}
+    assert snapshot.archon_hunt is None and snapshot.nightwave is None
+
+
+def test_as_dict_is_json_serializable_and_as_snapshot_passes_through(snapshot):
+    document = json.loads(json.dumps(snapshot.as_dict(), ensure_ascii=False))
+    assert document['fissures'][0]['node_name'] == '地球-E Prime'
+    assert document['archon_hunt']['missions'][0]['node'] == 'SolNode30'
+    assert as_snapshot(snapshot) is snapshot
+    assert isinstance(as_snapshot({'Time': 1}), WorldSnapshot)
+
+
+def test_record_equality():
+    a = Fissure('f1', 1, 2, 'SolNode27', 'MT_SURVIVAL', 'VoidT1', False, 'n', 'm', 't')
+    b = Fissure('f1', 1, 2, 'SolNode27', 'MT_SURVIVAL', 'VoidT1', False, 'n', 'm', 't')
+    assert a == b
+    b.hard = True
+    assert a != b
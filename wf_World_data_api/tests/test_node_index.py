@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from mapping_registry import MappingRegistry
+from models import Fissure, SortieMission, VoidStorm, parse_world_state
+from node_index import NodeIndex, NodeInfo
+
+NOW = 1760623200
+NODES = {'SolNode94': '水星-Apollodorus', 'SolNode27': '地球-E Prime', 'SolNode30': '火星-Olympus',
+         'SolNode36': '火星-Martialis', 'SolNode24': '地球-Oro', 'PlutoHUB': '中继站'}
+
+
+def write_nodes(path, nodes):
+    path.write_text(json.dumps(nodes, ensure_ascii=False), encoding='utf-8')
+
+
+@pytest.fixture
+def registry(tmp_path):
+    write_nodes(tmp_path / 'node.json', NODES)
+    registry = MappingRegistry()
+    registry.register('nodes', str(tmp_path / 'node.json'))
+    return registry
+
+
+def test_nodes_are_split_once_into_planet_and_name(registry):
+    index = NodeIndex(registry)
+    assert index.get('SolNode27') == NodeInfo('SolNode27', '地球', 'E Prime', 1)
+    assert index.get('PlutoHUB') == NodeInfo('PlutoHUB', None, '中继站', None)
+    assert index.get('SolNode999') is None
+    assert index.planet('SolNode30') == '火星'
+
+
+def test_planet_queries(registry):
+    index = NodeIndex(registry)
+    assert index.nodes_on('火星') == {'SolNode30', 'SolNode36'}
+    assert index.nodes_on('冥王星') == frozenset()
+    assert index.planets() == ['水星', '地球', '火星']
+    assert index.region('火星') == 2
+
+
+def test_index_is_rebuilt_after_dictionary_reload(registry, tmp_path):
+    index = NodeIndex(registry)
+    assert index.nodes_on('地球') == {'SolNode27', 'SolNode24'}
+    write_nodes(tmp_path / 'node.json', dict(NODES, SolNode25='地球-Cambria'))
+    registry.refresh()
+    assert index.nodes_on('地球') == {'SolNode27', 'SolNode24', 'SolNode25'}
+
+
+def test_records_on_planet(registry):
+    index = NodeIndex(registry)
+    snapshot = parse_world_state({'Time': NOW}, sections=set())
+    snapshot.fissures = [
+        Fissure('f1', NOW - 60, NOW + 600, 'SolNode27', 'MT_SURVIVAL', 'VoidT1', False, '', '', ''),
+        Fissure('f2', NOW - 600, NOW - 60, 'SolNode24', 'MT_SURVIVAL', 'VoidT1', False, '', '', ''),
+        Fissure('f3', NOW - 60, NOW + 600, 'SolNode30', 'MT_SURVIVAL', 'VoidT1', False, '', '', ''),
+    ]
+    snapshot.void_storms = [VoidStorm('s1', NOW - 60, NOW + 600, 'SolNode24', 'VoidT1', '', '')]
+    sortie = parse_world_state({'Time': NOW, 'Sorties': [{'Variants': [{'node': 'SolNode36'}]}]}, {'sorties'})
+    snapshot.sorties = sortie.sorties
+
+    found = index.records_on(snapshot, '地球', now=NOW)
+    assert {section: [r.id for r in records] for section, records in found.items()} == {
+        'fissures': ['f1'], 'railjack': ['s1']}
+    assert index.records_on(snapshot, '地球', sections=['railjack'], now=NOW).keys() == {'railjack'}
+    mars = index.records_on(snapshot, '火星', now=NOW)
+    assert [r.id for r in mars['fissures']] == ['f3']
+    assert isinstance(mars['sorties'][0], SortieMission) and mars['sorties'][0].node == 'SolNode36'
@@ -0,0 +1,61 @@
+import pytest
+
+from models import Fissure, Nightwave, NightwaveChallenge, parse_world_state
+from refresh_scheduler import RefreshScheduler, backoff_delay, snapshot_boundaries
+
+NOW = 1760623200
+
+
+def snapshot_with(fissures=(), challenges=None):
+    snapshot = parse_world_state({'Time': NOW}, sections=set())
+    snapshot.fissures = [Fissure(str(i), activation, expiry, 'SolNode27', 'MT_SURVIVAL', 'VoidT1', False,
+                                 '', '', '') for i, (activation, expiry) in enumerate(fissures)]
+    if challenges is not None:
+        snapshot.nightwave = Nightwave(14, 0, None, None, tuple(
+            NightwaveChallenge(str(i), None, expiry, '', '', True, True) for i, expiry in enumerate(challenges)))
+    return snapshot
+
+
+def test_boundaries_cover_activation_and_expiry():
+    snapshot = snapshot_with(fissures=[(NOW - 60, NOW + 600)], challenges=[NOW + 3600])
+    assert sorted(snapshot_boundaries(snapshot)) == [
+        (NOW - 60, '虚空裂隙'), (NOW + 600, '虚空裂隙'), (NOW + 3600, '午夜电波')]
+
+
+def test_next_fetch_follows_nearest_boundary():
+    scheduler = RefreshScheduler(grace=5, min_interval=10, fallback_interval=300)
+    scheduler.update(snapshot_with(fissures=[(NOW - 60, NOW + 120), (NOW - 30, NOW + 200)]), now=NOW)
+    assert scheduler.next_boundary(NOW) == (NOW + 120, '虚空裂隙')
+    assert scheduler.next_delay(NOW) == 125
+    assert scheduler.due_at(NOW) == NOW + 125
+
+    # 边界加上 grace 之后出堆，轮到下一个边界
+    assert scheduler.next_boundary(NOW + 125) == (NOW + 200, '虚空裂隙')
+    assert scheduler.next_delay(NOW + 125) == 80
+
+
+def test_delay_is_clamped():
+    scheduler = RefreshScheduler(grace=5, min_interval=10, fallback_interval=300)
+    scheduler.update(snapshot_with(fissures=[(NOW - 60, NOW + 1)]), now=NOW)
+    assert scheduler.next_delay(NOW) == 10
+    scheduler.update(snapshot_with(fissures=[(NOW - 60, NOW + 3600)]), now=NOW)
+    assert scheduler.next_delay(NOW) == 300
+
+
+def test_without_boundaries_uses_fallback_interval():
+    scheduler = RefreshScheduler(fallback_interval=120)
+    assert scheduler.next_boundary(NOW) is None
+    assert scheduler.next_delay(NOW) == 120
+    scheduler.update(snapshot_with(fissures=[(NOW - 600, NOW - 60)]), now=NOW)
+    assert scheduler.next_boundary(NOW) is None
+    assert scheduler.next_delay(NOW) == 120
+
+
+@pytest.mark.parametrize('failures, low, high', [(1, 1, 2), (2, 2, 4), (4, 8, 16), (20, 60, 120)])
+def test_backoff_delay_grows_with_jitter(failures, low, high):
+    delays = [backoff_delay(failures) for _ in range(50)]
+    assert all(low <= delay <= high for delay in delays)
+
+
+def test_no_backoff_without_failures():
+    assert backoff_delay(0) == 0
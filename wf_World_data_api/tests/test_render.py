@@ -0,0 +1,123 @@
+import io
+import json
+
+import pytest
+
+import render
+from render import Blank, Field, Item, Notice, ReportRenderer, SectionView, parse_export, write_output
+
+UPDATED = '2026-10-16 14:00:00'
+
+
+def fissures_view(remaining='59分钟'):
+    return SectionView('fissures', '🌀虚空裂隙', [
+        Field('古纪 裂隙', '', [Field('地球-E Prime', f'生存 | 剩余 {remaining}')]),
+        Blank(),
+        Item(1, '钢铁之路'),
+    ], spaced=False)
+
+
+def alerts_view():
+    return SectionView('alerts', '🚨警报', [Notice('📭当前无活跃警报')])
+
+
+def test_text_format_keeps_console_layout():
+    text = ReportRenderer().report([fissures_view(), alerts_view()], UPDATED)
+    assert text.split('\n') == [
+        '', '=' * 20, '🎮WARFRAME 实时数据监控', '=' * 20, f'📅更新时间: {UPDATED}', '-' * 20,
+        '🌀虚空裂隙:',
+        '   • 古纪 裂隙: ',
+        '      • 地球-E Prime: 生存 | 剩余 59分钟',
+        '',
+        '   1. 钢铁之路',
+        '',
+        '🚨警报:',
+        '📭当前无活跃警报',
+        '=' * 20, '',
+    ]
+
+
+def test_json_format():
+    document = json.loads(ReportRenderer().report([fissures_view(), alerts_view()], UPDATED, 'json'))
+    assert document['updated'] == UPDATED
+    fissures, alerts = document['sections']
+    assert fissures['section'] == 'fissures' and fissures['title'] == '🌀虚空裂隙'
+    assert fissures['lines'] == [
+        {'type': 'field', 'label': '古纪 裂隙', 'value': '',
+         'children': [{'type': 'field', 'label': '地球-E Prime', 'value': '生存 | 剩余 59分钟'}]},
+        {'type': 'item', 'index': 1, 'text': '钢铁之路'},
+    ]
+    assert alerts['lines'] == [{'type': 'notice', 'text': '📭当前无活跃警报'}]
+
+
+def test_markdown_format():
+    markdown = ReportRenderer().report([fissures_view(), alerts_view()], UPDATED, 'markdown')
+    assert markdown.startswith(f'## 🎮WARFRAME 实时数据监控\n\n📅更新时间: {UPDATED}\n\n### 🌀虚空裂隙\n')
+    assert '- **古纪 裂隙**:\n  - **地球-E Prime**: 生存 | 剩余 59分钟\n1. 钢铁之路\n' in markdown
+    assert '### 🚨警报\n\n- 📭当前无活跃警报\n' in markdown
+
+
+def test_sections_are_serialized_once_until_they_change(monkeypatch):
+    calls = []
+    real = render.FORMATS['text']
+
+    def counting(view):
+        calls.append(view.name)
+        return real[0](view)
+
+    monkeypatch.setitem(render.FORMATS, 'text', (counting, real[1]))
+    renderer = ReportRenderer()
+    renderer.report([fissures_view(), alerts_view()], UPDATED)
+    renderer.report([fissures_view(), alerts_view()], UPDATED)
+    assert calls == ['fissures', 'alerts']
+    assert (renderer.hits, renderer.misses) == (2, 2)
+
+    renderer.report([fissures_view('58分钟'), alerts_view()], UPDATED)
+    assert calls == ['fissures', 'alerts', 'fissures']
+
+    # 各格式分别缓存
+    renderer.report([alerts_view()], UPDATED, 'json')
+    assert renderer.misses == 4
+
+
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+def test_each_output_gets_one_write(tmp_path, monkeypatch):
+    stdout = CountingStream()
+    monkeypatch.setattr('sys.stdout', stdout)
+    markdown_path = str(tmp_path / 'report.md')
+    json_path = str(tmp_path / 'report.json')
+    renderer = ReportRenderer('text', [('markdown', markdown_path), ('json', json_path)])
+    renderer.write([fissures_view(), alerts_view()], UPDATED)
+    assert stdout.writes == 1 and '🌀虚空裂隙:' in stdout.getvalue()
+    with open(markdown_path, encoding='utf-8') as f:
+        assert f.read().startswith('## ')
+    with open(json_path, encoding='utf-8') as f:
+        assert len(json.load(f)['sections']) == 2
+
+    renderer.write([alerts_view()], UPDATED, stdout=False)
+    assert stdout.writes == 1
+
+
+def test_write_output_replaces_file_atomically(tmp_path):
+    path = str(tmp_path / 'report.md')
+    write_output('old', path)
+    write_output('new', path)
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == 'new'
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['report.md']
+
+
+def test_parse_export():
+    assert parse_export('markdown=report.md') == ('markdown', 'report.md')
+    for value in ('report.md', 'xml=report.xml', 'json='):
+        with pytest.raises(ValueError):
+            parse_export(value)
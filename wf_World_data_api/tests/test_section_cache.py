@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+import lookups
+import warframe_monitor  # noqa: F401  登记各板块的显示模型
+from metrics import metrics
+from models import parse_world_state
+from section_cache import SectionCache
+from worldstate_decode import decode_world_state
+
+NOW = 1760623200
+SECTIONS = ['sorties', 'fissures']
+
+
+def date(seconds):
+    return {'$date': {'$numberLong': str(seconds * 1000)}}
+
+
+def world_state(tier='VoidT1'):
+    document = {
+        'Time': NOW,
+        'Sorties': [{'_id': {'$oid': 'so1'}, 'Activation': date(NOW - 3600), 'Expiry': date(NOW + 86400),
+                     'Boss': 'SORTIE_BOSS_VOR',
+                     'Variants': [{'missionType': 'MT_SURVIVAL', 'modifierType': 'SORTIE_MODIFIER_LOW_ENERGY',
+                                   'node': 'SolNode27'}]}],
+        'ActiveMissions': [{'_id': {'$oid': 'f1'}, 'Activation': date(NOW - 600), 'Expiry': date(NOW + 3000),
+                            'Node': 'SolNode27', 'MissionType': 'MT_SURVIVAL', 'Modifier': tier}],
+    }
+    return decode_world_state(json.dumps(document).encode())
+
+
+@pytest.fixture
+def cache(dictionaries):
+    return SectionCache()
+
+
+def hits(section):
+    return metrics.value('section_cache_total', section=section, result='hit')
+
+
+def test_unchanged_sections_reuse_translated_records(cache):
+    first = parse_world_state(world_state(), SECTIONS, cache)
+    sortie_hits, fissure_hits = hits('sorties'), hits('fissures')
+    second = parse_world_state(world_state('VoidT2'), SECTIONS, cache)
+    assert second.sorties is first.sorties
+    assert second.fissures is not first.fissures
+    assert second.fissures[0].tier_name == '前纪 裂隙'
+    assert (hits('sorties'), hits('fissures')) == (sortie_hits + 1, fissure_hits)
+
+
+def test_dictionary_reload_invalidates_cached_sections(cache):
+    first = parse_world_state(world_state(), SECTIONS, cache)
+    lookups.mapping_index.generation += 1
+    assert parse_world_state(world_state(), SECTIONS, cache).sorties is not first.sorties
+
+
+def test_input_without_digests_is_not_cached(cache):
+    data = dict(world_state())
+    first = parse_world_state(data, SECTIONS, cache)
+    assert parse_world_state(data, SECTIONS, cache).sorties is not first.sorties
+
+
+def test_untimed_views_are_reused_and_timed_views_recomputed(cache):
+    snapshot = parse_world_state(world_state(), SECTIONS, cache)
+    sorties_view = cache.view('sorties', snapshot, NOW)
+    fissures_view = cache.view('fissures', snapshot, NOW)
+
+    snapshot = parse_world_state(world_state(), SECTIONS, cache)
+    assert cache.view('sorties', snapshot, NOW + 60) is sorties_view
+    later = cache.view('fissures', snapshot, NOW + 60)
+    assert later is not fissures_view and later != fissures_view
+
+
+def test_clear(cache):
+    first = parse_world_state(world_state(), SECTIONS, cache)
+    cache.clear()
+    assert parse_world_state(world_state(), SECTIONS, cache).sorties is not first.sorties
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from api_server import SnapshotStore, shared_entry
+from shared_snapshot import SharedSnapshotReader, SharedSnapshotWriter
+from worldstate_decode import decode_world_state
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path / 'shm')
+
+
+def test_reader_before_first_publish(directory):
+    assert SharedSnapshotReader(directory).current() is None
+    writer = SharedSnapshotWriter(directory)
+    try:
+        assert SharedSnapshotReader(directory).current() is None
+    finally:
+        writer.close()
+
+
+def test_publish_round_trip(directory):
+    writer = SharedSnapshotWriter(directory)
+    reader = SharedSnapshotReader(directory)
+    try:
+        generation = writer.publish({'fissures': b'{"a":1}', 'empty': b'', 'zh': '裂隙'.encode()},
+                                    meta={'time': 1760623200})
+        snapshot = reader.current()
+        assert snapshot.generation == generation == 1
+        assert bytes(snapshot.get('fissures')) == b'{"a":1}'
+        assert bytes(snapshot.get('empty')) == b''
+        assert bytes(snapshot.get('zh')).decode() == '裂隙'
+        assert snapshot.get('missing') is None and 'missing' not in snapshot
+        assert snapshot.meta == {'time': 1760623200}
+        # 代号不变时复用已经映射的一代
+        assert reader.current() is snapshot
+    finally:
+        writer.close()
+
+
+def test_reader_follows_new_generations_and_old_views_stay_valid(directory):
+    writer = SharedSnapshotWriter(directory, keep=1)
+    reader = SharedSnapshotReader(directory)
+    try:
+        writer.publish({'fissures': b'old'})
+        old_view = reader.current().get('fissures')
+        for i in range(5):
+            writer.publish({'fissures': b'new %d' % i})
+        snapshot = reader.current()
+        assert snapshot.generation == 6
+        assert bytes(snapshot.get('fissures')) == b'new 4'
+        assert bytes(old_view) == b'old'
+        data_files = sorted(name for name in os.listdir(directory) if name.startswith('snapshot-'))
+        assert data_files == ['snapshot-6.bin']
+    finally:
+        writer.close()
+
+
+def test_writer_resumes_generation(directory):
+    writer = SharedSnapshotWriter(directory)
+    writer.publish({'a': b'1'})
+    writer.publish({'a': b'2'})
+    writer.close()
+    writer = SharedSnapshotWriter(directory)
+    try:
+        assert writer.publish({'a': b'3'}) == 3
+        assert bytes(SharedSnapshotReader(directory).current().get('a')) == b'3'
+    finally:
+        writer.close()
+
+
+def test_unlink_removes_directory(directory):
+    writer = SharedSnapshotWriter(directory)
+    writer.publish({'a': b'1'})
+    writer.close()
+    writer.unlink()
+    assert not os.path.exists(directory)
+
+
+class BlockingFetcher:
+    """第一次抓取立即返回，之后的抓取一直阻塞到 release 被设置"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.failures = 0
+        self.calls = 0
+
+    def fetch(self):
+        self.calls += 1
+        if self.calls > 1:
+            self.release.wait(5)
+        body = json.dumps({'Time': int(time.time()) + self.calls, 'ActiveMissions': []}).encode()
+        return True, decode_world_state(body)
+
+
+def test_shared_entries_come_from_one_snapshot_without_waiting_for_refresh():
+    fetcher = BlockingFetcher()
+    store = SnapshotStore(fetcher, sections=['fissures', 'alerts'])
+
+    async def scenario():
+        await store.get_snapshot()
+        store.invalidate()
+        refreshing = store.refresh()  # 第二次抓取阻塞，刷新一直进行中
+        await asyncio.sleep(0.05)
+
+        started = time.perf_counter()
+        entries, meta = store.shared_entries()
+        assert time.perf_counter() - started < 1
+        assert meta['version'] == 1
+        for section in store.sections:
+            assert json.loads(entries[shared_entry('section', section)])['version'] == 1
+            assert shared_entry('render', section, 'format=text') in entries
+        assert shared_entry('planets') in entries and shared_entry('metrics') in entries
+
+        fetcher.release.set()
+        await refreshing
+        assert store.shared_entries()[1]['version'] == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,79 @@
+import pytest
+
+pytest.importorskip('numpy')
+
+from snapshot_analytics import ARCHON, BARO, EntityTable  # noqa: E402
+
+DAY_MS = 86400 * 1000
+
+
+def _date(ms):
+    return {'$date': {'$numberLong': str(ms)}}
+
+
+def baro_snapshot(activation_ms, items=30, expiry_ms=None):
+    expiry_ms = activation_ms + 2 * DAY_MS if expiry_ms is None else expiry_ms
+    return {'VoidTraders': [{'_id': {'$oid': '5d1e07a0a38e4a4fdd7cefca'}, 'Character': "Baro'Ki Teel",
+                             'Node': 'PlutoHUB', 'Activation': _date(activation_ms),
+                             'Expiry': _date(expiry_ms),
+                             'Manifest': [{'ItemType': f'/Lotus/StoreItems/Item{i}'} for i in range(items)]}]}
+
+
+def test_baro_visits_with_same_id_are_separate_rows():
+    table = EntityTable()
+    first = 1_700_000_000_000
+    assert table.add_snapshot(baro_snapshot(first)) == 1
+    assert table.add_snapshot(baro_snapshot(first)) == 0
+    assert table.add_snapshot(baro_snapshot(first + 14 * DAY_MS, items=25)) == 1
+    table.freeze()
+    assert table.count_by('kind') == {BARO: 2}
+    assert sorted(table.columns['size'].tolist()) == [25, 30]
+
+
+def test_loaded_table_keeps_deduplicating(tmp_path):
+    path = str(tmp_path / 'analytics.npz')
+    first = 1_700_000_000_000
+    table = EntityTable()
+    table.add_snapshot(baro_snapshot(first))
+    table.save(path)
+
+    loaded = EntityTable.load(path)
+    assert loaded.add_snapshot(baro_snapshot(first)) == 0
+    assert loaded.add_snapshot(baro_snapshot(first + 14 * DAY_MS)) == 1
+    assert len(loaded) == 2
+
+
+def test_baro_announced_before_arrival_keeps_full_manifest():
+    table = EntityTable()
+    arrival = 1_700_000_000_000
+    # 到达前的快照：商品列表为空
+    assert table.add_snapshot(baro_snapshot(arrival, items=0)) == 1
+    assert table.add_snapshot(baro_snapshot(arrival, items=30, expiry_ms=arrival + 3 * DAY_MS)) == 0
+    assert table.add_snapshot(baro_snapshot(arrival, items=0)) == 0
+    table.freeze()
+    assert table.columns['size'].tolist() == [30]
+    assert table.columns['end'].tolist() == [(arrival + 3 * DAY_MS) // 1000]
+
+
+def test_baro_manifest_updates_row_loaded_from_cache(tmp_path):
+    path = str(tmp_path / 'analytics.npz')
+    arrival = 1_700_000_000_000
+    table = EntityTable()
+    table.add_snapshot(baro_snapshot(arrival, items=0))
+    table.save(path)
+
+    loaded = EntityTable.load(path)
+    loaded.add_snapshot(baro_snapshot(arrival, items=25))
+    loaded.freeze()
+    assert loaded.columns['size'].tolist() == [25]
+
+
+def test_boss_column_holds_archon_and_baro_names():
+    table = EntityTable()
+    start = 1_700_000_000_000
+    table.add_snapshot(dict(baro_snapshot(start), LiteSorties=[{
+        '_id': {'$oid': 'a1'}, 'Boss': 'SORTIE_BOSS_BOREAL', 'Activation': _date(start), 'Expiry': _date(start + DAY_MS),
+        'Missions': [{'missionType': 'MT_SURVIVAL', 'node': 'SolNode27'}]}]))
+    archons = table.mask(kind=ARCHON)
+    assert table.history('boss', archons) == [(start // 1000, 'SORTIE_BOSS_BOREAL')]
+    assert table.count_by('boss', table.mask(kind=BARO)) == {"Baro'Ki Teel": 1}
@@ -0,0 +1,105 @@
+import json
+import os
+
+import pytest
+
+from snapshot_archive import INDEX_RECORD, SnapshotArchive
+
+
+def body(time, **extra):
+    return json.dumps(dict(Time=time, **extra)).encode('utf-8')
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = SnapshotArchive(str(tmp_path / 'archive'))
+    yield archive
+    archive.close()
+
+
+def test_round_trip_and_lookup(archive):
+    assert archive.append(body(100), fetched_at=100)
+    assert archive.append(body(200), fetched_at=200)
+    assert archive.append(body(300), fetched_at=300)
+    assert len(archive) == 3
+
+    assert archive.lookup(99) is None
+    assert archive.lookup(100) == (100, {'Time': 100})
+    assert archive.lookup(250) == (200, {'Time': 200})
+    assert archive.lookup(10 ** 10) == (300, {'Time': 300})
+
+
+def test_identical_latest_snapshot_is_skipped(archive):
+    assert archive.append(body(100), fetched_at=100)
+    assert not archive.append(body(100), fetched_at=200)
+    assert len(archive) == 1
+
+
+def test_repeated_content_is_stored_once(archive):
+    archive.append(body(100), fetched_at=100)
+    segment_size = os.path.getsize(archive.segment_path)
+    archive.append(body(200), fetched_at=200)
+    archive.append(body(100), fetched_at=300)
+    assert len(archive) == 3
+    first, third = archive.record(0), archive.record(2)
+    assert first[1:] == third[1:]
+    assert os.path.getsize(archive.segment_path) > segment_size
+    assert archive.lookup(300) == (300, {'Time': 100})
+
+
+def test_fetch_times_stay_monotonic(archive):
+    archive.append(body(100), fetched_at=500)
+    archive.append(body(200), fetched_at=400)
+    assert [record[0] for record in archive.iter_records()] == [500, 500]
+
+
+def test_iter_snapshots_range(archive):
+    for time in (100, 200, 300, 400):
+        archive.append(body(time), fetched_at=time)
+    assert [fetched_at for fetched_at, _ in archive.iter_snapshots(200, 400)] == [200, 300]
+    assert [data['Time'] for _, data in archive.iter_snapshots(start=250)] == [300, 400]
+    assert [data['Time'] for _, data in archive.iter_snapshots(end=100)] == []
+
+
+def test_lookup_sees_records_appended_after_mapping(archive):
+    archive.append(body(100), fetched_at=100)
+    assert archive.lookup(150) == (100, {'Time': 100})
+    archive.append(body(200), fetched_at=200)
+    assert archive.lookup(250) == (200, {'Time': 200})
+
+
+def test_reopen_recovers_partial_index_record(tmp_path):
+    directory = str(tmp_path / 'archive')
+    archive = SnapshotArchive(directory)
+    archive.append(body(100), fetched_at=100)
+    archive.append(body(200), fetched_at=200)
+    archive.close()
+    with open(os.path.join(directory, 'snapshots.idx'), 'ab') as f:
+        f.write(b'\0' * (INDEX_RECORD.size // 2))
+
+    reopened = SnapshotArchive(directory)
+    try:
+        assert len(reopened) == 2
+        assert not reopened.append(body(200), fetched_at=300)
+        assert reopened.append(body(300), fetched_at=300)
+        assert reopened.lookup(300) == (300, {'Time': 300})
+    finally:
+        reopened.close()
+
+
+def test_reopen_drops_records_past_end_of_segment(tmp_path):
+    directory = str(tmp_path / 'archive')
+    archive = SnapshotArchive(directory)
+    archive.append(body(100), fetched_at=100)
+    archive.append(body(200), fetched_at=200)
+    _, offset, _, _ = archive.record(1)
+    archive.close()
+    with open(os.path.join(directory, 'snapshots.seg'), 'r+b') as f:
+        f.truncate(offset)
+
+    reopened = SnapshotArchive(directory)
+    try:
+        assert len(reopened) == 1
+        assert reopened.lookup(200) == (100, {'Time': 100})
+    finally:
+        reopened.close()
@@ -0,0 +1,44 @@
+import zlib
+
+import pytest
+
+import lookups
+from snapshot_cache import DEFAULT_CACHE_FILE, SnapshotCache
+
+
+def test_round_trip(tmp_path):
+    cache = SnapshotCache(str(tmp_path / 'cache'))
+    cache.save(b'{"Time": 1}', etag='"abc"', last_modified='Fri, 16 Oct 2026 14:00:00 GMT',
+               content_hash='ff', fetched_at=1000.0)
+    cached = cache.load()
+    assert cached.body == b'{"Time": 1}'
+    assert cached.fetched_at == 1000.0
+    assert cached.verified_at >= 1000.0
+    assert (cached.etag, cached.last_modified, cached.content_hash) == (
+        '"abc"', 'Fri, 16 Oct 2026 14:00:00 GMT', 'ff')
+
+
+def test_missing_file_is_a_miss(tmp_path):
+    assert SnapshotCache(str(tmp_path / 'missing')).load() is None
+
+
+@pytest.mark.parametrize('header', [
+    b'{}', b'{"etag": "x"}', b'{"fetched_at": null}', b'{"fetched_at": "yesterday"}',
+    b'[1, 2]', b'"text"', b'not json',
+])
+def test_malformed_header_is_a_miss(tmp_path, header):
+    path = tmp_path / 'cache'
+    path.write_bytes(header + b'\n' + zlib.compress(b'{"Time": 1}'))
+    assert SnapshotCache(str(path)).load() is None
+
+
+def test_corrupt_body_is_a_miss(tmp_path):
+    path = tmp_path / 'cache'
+    path.write_bytes(b'{"fetched_at": 1000}\nnot zlib')
+    assert SnapshotCache(str(path)).load() is None
+
+
+def test_default_path_is_under_data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(lookups, 'data_dir', str(tmp_path / 'data'))
+    assert SnapshotCache().path == str(tmp_path / 'data' / DEFAULT_CACHE_FILE)
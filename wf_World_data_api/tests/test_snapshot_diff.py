@@ -0,0 +1,78 @@
+import snapshot_diff
+from models import Fissure, Invasion, NightwaveChallenge, SyndicateBoard, parse_world_state
+from snapshot_diff import ADDED, CHANGED, REMOVED, diff_section, diff_snapshots, display_changes, entity_key
+
+
+def fissure(oid, node='SolNode27', tier='VoidT1', expiry=2000):
+    return Fissure(oid, 1000, expiry, node, 'MT_SURVIVAL', tier, False, node, '生存', tier)
+
+
+def invasion(count):
+    return Invasion('i1', 1000, 'SolNode27', 'FC_GRINEER', count, 9000, False, '地球-E Prime', 'Grineer')
+
+
+def world_state(**sections):
+    return dict({'Time': 1760623200}, **sections)
+
+
+def test_entity_key_prefers_oid_and_falls_back_to_node_and_type():
+    assert entity_key(fissure('f1')) == 'f1'
+    board = SyndicateBoard(None, 'ArbitersSyndicate', '仲裁者', 1, 2, (), ())
+    assert entity_key(board) == ('SyndicateBoard', 'ArbitersSyndicate')
+    challenge = NightwaveChallenge(None, 1, 2, '/Lotus/Types/Challenges/Kill', '击杀', True, True)
+    assert entity_key(challenge) == ('NightwaveChallenge', '/Lotus/Types/Challenges/Kill')
+
+
+def test_added_removed_and_changed():
+    old = [fissure('f1'), fissure('f2'), fissure('f3', expiry=2000)]
+    new = [fissure('f2'), fissure('f3', expiry=2600), fissure('f4', node='SolNode30')]
+    events = {(event.kind, event.key): event for event in diff_section('fissures', old, new)}
+    assert set(events) == {(ADDED, 'f4'), (REMOVED, 'f1'), (CHANGED, 'f3')}
+    assert events[CHANGED, 'f3'].fields == {'expiry': (2000, 2600)}
+    assert events[REMOVED, 'f1'].entity is old[0]
+    assert events[ADDED, 'f4'].entity is new[2]
+
+
+def test_unchanged_sections_are_omitted():
+    old = parse_world_state(world_state(), sections={'fissures', 'invasions'})
+    new = parse_world_state(world_state(), sections={'fissures', 'invasions'})
+    old.fissures, new.fissures = [fissure('f1')], [fissure('f1')]
+    old.invasions, new.invasions = [invasion(-100)], [invasion(-4500)]
+    changes = diff_snapshots(old, new, ['fissures', 'invasions'])
+    assert list(changes) == ['invasions']
+    event, = changes['invasions']
+    assert event.kind == CHANGED and event.fields == {'count': (-100, -4500)}
+
+
+def test_reused_section_is_not_compared(monkeypatch):
+    old = parse_world_state(world_state(), sections={'fissures'})
+    new = parse_world_state(world_state(), sections={'fissures'})
+    new.fissures = old.fissures = [fissure('f1')]
+
+    monkeypatch.setattr(snapshot_diff, 'diff_section', None)
+    assert diff_snapshots(old, new, ['fissures']) == {}
+
+
+def test_first_snapshot_adds_everything(dictionaries):
+    data = world_state(VoidTraders=[{'_id': {'$oid': 'b1'}, 'Character': "Baro'Ki Teel",
+                                     'Node': 'PlutoHUB', 'Manifest': []}])
+    changes = diff_snapshots(None, parse_world_state(data), ['baro', 'alerts'])
+    assert [(event.kind, event.key) for event in changes['baro']] == [(ADDED, 'b1')]
+    assert 'alerts' not in changes
+
+
+def test_baro_arrival_is_a_change(dictionaries):
+    arriving = world_state(VoidTraders=[{'_id': {'$oid': 'b1'}, 'Node': 'PlutoHUB', 'Manifest': []}])
+    arrived = world_state(VoidTraders=[{'_id': {'$oid': 'b1'}, 'Node': 'PlutoHUB', 'Manifest': [{}, {}]}])
+    changes = diff_snapshots(parse_world_state(arriving), parse_world_state(arrived), ['baro'])
+    event, = changes['baro']
+    assert event.kind == CHANGED and event.fields == {'manifest_size': (0, 2)}
+
+
+def test_display_changes(capsys):
+    display_changes({})
+    assert '无变化' in capsys.readouterr().out
+
+    display_changes({'invasions': diff_section('invasions', [invasion(-900)], [invasion(-4500)])})
+    out = capsys.readouterr().out
+    assert '入侵: 1 项变化' in out and '10.0% → 50.0%' in out
@@ -0,0 +1,118 @@
+import json
+import time
+
+import pytest
+
+from models import Fissure, parse_world_state
+from subscriptions import RULE_FIELDS, Rule, SubscriptionEngine, display_notifications, load_rules, rule_from_dict
+
+NOW = 1760623200
+
+
+def rule(rule_id, section=None, subscriber=None, **conditions):
+    return Rule(rule_id, subscriber, section, *(conditions.get(name) for name in RULE_FIELDS))
+
+
+def fissure(oid, node='SolNode27', mission_type='MT_SURVIVAL', tier='VoidT1', hard=False):
+    return Fissure(oid, NOW - 60, NOW + 3600, node, mission_type, tier, hard, node, mission_type, tier)
+
+
+def snapshot(*fissures):
+    result = parse_world_state({'Time': NOW}, sections=set())
+    result.fissures = list(fissures)
+    return result
+
+
+def matched_ids(notifications):
+    return sorted((n.rule.id, n.key) for n in notifications)
+
+
+def test_rules_match_on_every_constrained_field(dictionaries):
+    engine = SubscriptionEngine([
+        rule('survival', 'fissures', mission_type='MT_SURVIVAL'),
+        rule('lith_earth', 'fissures', tier='VoidT1', planet='地球'),
+        rule('mars', 'fissures', planet='火星'),
+        rule('steel', 'fissures', hard=True),
+        rule('any_section_node', node='SolNode27'),
+        rule('alerts_only', 'alerts', node='SolNode27'),
+    ])
+    notifications = engine.match(snapshot(fissure('f1'), fissure('f2', node='SolNode30', hard=True)))
+    assert matched_ids(notifications) == [
+        ('any_section_node', 'f1'), ('lith_earth', 'f1'), ('mars', 'f2'), ('steel', 'f2'),
+        ('survival', 'f1'), ('survival', 'f2')]
+
+
+def test_each_entity_is_notified_once_and_forgotten_when_gone(dictionaries):
+    engine = SubscriptionEngine([rule('survival', mission_type='MT_SURVIVAL')])
+    assert matched_ids(engine.match(snapshot(fissure('f1')))) == [('survival', 'f1')]
+    assert engine.match(snapshot(fissure('f1'), fissure('f2'))) != []
+    assert engine.match(snapshot(fissure('f1'), fissure('f2'))) == []
+    engine.match(snapshot(fissure('f2')))
+    assert matched_ids(engine.match(snapshot(fissure('f1'), fissure('f2')))) == [('survival', 'f1')]
+
+
+def test_seed_marks_existing_entities_without_notifying(dictionaries):
+    engine = SubscriptionEngine([rule('survival', mission_type='MT_SURVIVAL')])
+    assert engine.seed(snapshot(fissure('f1'))) is None
+    assert engine.match(snapshot(fissure('f1'))) == []
+    assert matched_ids(engine.match(snapshot(fissure('f1'), fissure('f2')))) == [('survival', 'f2')]
+
+
+def test_add_replaces_and_remove(dictionaries):
+    engine = SubscriptionEngine([rule('r', mission_type='MT_SURVIVAL')])
+    engine.add(rule('r', mission_type='MT_DEFENSE'))
+    assert len(engine) == 1
+    assert engine.match(snapshot(fissure('f1'))) == []
+    assert engine.remove('r') and not engine.remove('r')
+    assert len(engine) == 0
+    assert engine.match(snapshot(fissure('f2', mission_type='MT_DEFENSE'))) == []
+
+
+def test_sections_limit_matching(dictionaries):
+    engine = SubscriptionEngine([rule('any', node='SolNode27')])
+    assert engine.match(snapshot(fissure('f1')), ['alerts']) == []
+    assert matched_ids(engine.match(snapshot(fissure('f1')), ['fissures'])) == [('any', 'f1')]
+
+
+def test_100k_rules_match_by_lookup(dictionaries):
+    tiers = ['VoidT1', 'VoidT2', 'VoidT3', 'VoidT4']
+    rules = [rule(i, 'fissures', node=f'SolNode{i % 5000}', tier=tiers[i // 5000 % 4], subscriber=f'user{i}')
+             for i in range(100_000)]
+    rules.append(rule('earth', planet='地球'))
+    engine = SubscriptionEngine(rules)
+    assert len(engine) == 100_001
+    # 规则按约束的维度组合分组，查找次数与规则数无关
+    assert len(engine._index['fissures']) == 1
+
+    fissures = [fissure(f'f{i}', node=f'SolNode{i}', tier=tiers[i % 4]) for i in range(50)]
+    started = time.perf_counter()
+    notifications = engine.match(snapshot(*fissures))
+    elapsed = time.perf_counter() - started
+    expected = {(i + j * 5000, f'f{i}') for i in range(50) for j in range(20) if j % 4 == i % 4}
+    assert {(n.rule.id, n.key) for n in notifications if n.rule.id != 'earth'} == expected
+    assert [n.key for n in notifications if n.rule.id == 'earth'] == ['f27']
+    assert elapsed < 0.5
+
+
+def test_rule_files(tmp_path):
+    path = tmp_path / 'rules.json'
+    path.write_text(json.dumps([
+        {'id': 'lith', 'subscriber': 'alice', 'section': 'fissures', 'tier': 'VoidT1'},
+        {'planet': '地球'},
+    ], ensure_ascii=False), encoding='utf-8')
+    lith, earth = load_rules(str(path))
+    assert (lith.id, lith.subscriber, lith.section, lith.shape) == ('lith', 'alice', 'fissures', ('tier',))
+    assert (earth.id, earth.section, earth.shape) == (1, None, ('planet',))
+
+
+@pytest.mark.parametrize('entry', [{'colour': 'red'}, {'section': 'news'}])
+def test_invalid_rules_are_rejected(entry):
+    with pytest.raises(ValueError):
+        rule_from_dict(entry)
+
+
+def test_display_notifications(dictionaries, capsys):
+    engine = SubscriptionEngine([rule('lith', subscriber='alice', tier='VoidT1')])
+    display_notifications(engine.match(snapshot(fissure('f1', hard=True))))
+    out = capsys.readouterr().out
+    assert out.startswith('🔔[alice] 规则 lith: SolNode27') and '钢铁之路' in out
@@ -0,0 +1,103 @@
+import hashlib
+import json
+
+import pytest
+
+import worldstate_decode
+from worldstate_decode import DecodedWorldState, WorldStateDecodeError, decode_world_state
+
+DOCUMENT = {
+    'Time': 1760623200,
+    'ActiveMissions': [{'Node': 'SolNode27', 'Modifier': 'VoidT1', 'Hard': True}],
+    'VoidTraders': [{'Character': "Baro'Ki Teel", 'Node': 'PlutoHUB', 'Manifest': []}],
+    'Events': [{'Messages': [{'LanguageCode': 'zh', 'Message': '新闻 "引号" \\ ☃'}]}],
+    'FlashSales': [{'TypeName': '/Lotus/StoreItems/Sale', 'Discount': 10}] * 3,
+}
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def backend(request, monkeypatch):
+    if request.param == 'orjson':
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(worldstate_decode, 'orjson', None)
+    return request.param
+
+
+def encode(document, **kwargs):
+    return json.dumps(document, **kwargs).encode('utf-8')
+
+
+def test_keeps_only_selected_keys(backend):
+    decoded = decode_world_state(encode(DOCUMENT), ('Time', 'ActiveMissions', 'Alerts'))
+    assert isinstance(decoded, DecodedWorldState)
+    assert decoded == {'Time': DOCUMENT['Time'], 'ActiveMissions': DOCUMENT['ActiveMissions']}
+    assert set(decoded.digests) == {'Time', 'ActiveMissions'}
+
+
+def test_none_keys_returns_whole_document(backend):
+    assert decode_world_state(encode(DOCUMENT), None) == DOCUMENT
+
+
+@pytest.mark.parametrize('body_type', [bytes, bytearray])
+def test_accepts_buffer_types(backend, body_type):
+    decoded = decode_world_state(body_type(encode(DOCUMENT)), ('Events',))
+    assert decoded['Events'] == DOCUMENT['Events']
+
+
+def test_digests_hash_raw_bytes(backend):
+    body = encode(DOCUMENT)
+    decoded = decode_world_state(body)
+    raw = encode(DOCUMENT['ActiveMissions'])
+    assert raw in body
+    assert decoded.digests['ActiveMissions'] == hashlib.blake2b(raw, digest_size=16).digest()
+
+
+def test_deselected_sections_are_not_decoded(backend, monkeypatch):
+    decoded_spans = []
+    real_loads = worldstate_decode.loads
+
+    def recording_loads(data):
+        decoded_spans.append(bytes(data))
+        return real_loads(data)
+
+    monkeypatch.setattr(worldstate_decode, 'loads', recording_loads)
+    decode_world_state(encode(DOCUMENT), ('Time', 'VoidTraders'))
+    assert decoded_spans == [encode(DOCUMENT['Time']), encode(DOCUMENT['VoidTraders'])]
+
+
+def test_digest_changes_only_for_changed_section(backend):
+    before = decode_world_state(encode(DOCUMENT))
+    changed = dict(DOCUMENT, ActiveMissions=[{'Node': 'SolNode27', 'Modifier': 'VoidT2', 'Hard': True}])
+    after = decode_world_state(encode(changed))
+    assert before.digests['ActiveMissions'] != after.digests['ActiveMissions']
+    assert before.digests['VoidTraders'] == after.digests['VoidTraders']
+    assert before.digests['Events'] == after.digests['Events']
+
+
+@pytest.mark.parametrize('body', [b'[]', b'"text"', b'42', b'null'])
+def test_top_level_must_be_object(backend, body):
+    with pytest.raises(WorldStateDecodeError):
+        decode_world_state(body)
+
+
+@pytest.mark.parametrize('body', [
+    b'', b'{', b'{"Time": 1', b'{"Time": 1,}', b'{"Time": }', b'{"Time": 1} trailing',
+    b'\xff\xfe{}', b'<html>502 Bad Gateway</html>', b'{"Time": 1}}',
+    # 未选中的板块只被扫描跳过，同样要求括号配对、字符串闭合和合法的标量
+    b'{"FlashSales": [{"a": 1]}, "Time": 1}',
+    b'{"FlashSales": [[[[1}]]]], "Time": 1}',
+    b'{"FlashSales": [[[["x]]]], "Time": 1}',
+    b'{"FlashSales": tru, "Time": 1}',
+    b'{"FlashSales": 01, "Time": 1}',
+])
+def test_malformed_input_raises_value_error(backend, body):
+    with pytest.raises(ValueError):
+        decode_world_state(body)
+
+
+def test_truncated_document_raises_value_error(backend):
+    body = encode(DOCUMENT)
+    for end in range(1, len(body) - 1, 7):
+        with pytest.raises(ValueError):
+            decode_world_state(body[:end])
@@ -1,511 +1,730 @@
-import requests
-import json
-import os
-from datetime import datetime, timezone
-
-# 名称映射文件路径
-MAPPING_FILE = "wfdata.json"
-NODE_MAPPING_FILE = "node.json"  # 新增节点映射文件路径
-
-def load_name_mappings():
-    """加载名称映射"""
-    if os.path.exists(MAPPING_FILE):
-        with open(MAPPING_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    else:
-        # 如果文件不存在，返回空映射
-        return {
-            "missions": {},
-            "factions": {},
-            "bosses": {},
-            "syndicates": {},
-            "nodes": {}  # 新增节点映射
-        }
-
-def load_node_mappings():
-    """加载节点映射"""
-    if os.path.exists(NODE_MAPPING_FILE):
-        with open(NODE_MAPPING_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    else:
-        print(f"⚠️节点映射文件 {NODE_MAPPING_FILE} 不存在")
-        return {}
+import argparse
+import hashlib
+import importlib.util
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime, timedelta, timezone
 
-def save_name_mappings(mappings):
-    """保存名称映射"""
-    with open(MAPPING_FILE, 'w', encoding='utf-8') as f:
-        json.dump(mappings, f, ensure_ascii=False, indent=2)
+# 查找函数已移到 lookups.py，这里保留导出以兼容旧的调用方式
+from lookups import (  # noqa: F401
+    extract_archon_name,
+    extract_challenge_name,
+    extract_modifier_name,
+    extract_name,
+    extract_node_name,
+    load_challenge_mapping,
+    load_name_mappings,
+    load_node_mappings,
+    map_bounty_name,
+    mapping_index,
+    mappings,
+    save_name_mappings,
+    set_data_dir,
+)
+from metrics import metrics, open_log
+from models import as_snapshot, is_expired, parse_date, parse_world_state  # noqa: F401
+from node_index import node_index
+from render import Blank, Field, Item, LiveScreen, Notice, ReportRenderer, SectionView, parse_export, write_output
+from refresh_scheduler import DEFAULT_FALLBACK_INTERVAL, RefreshScheduler, backoff_delay
+from section_cache import SectionCache
+from snapshot_archive import SnapshotArchive
+from snapshot_cache import DEFAULT_CACHE_FILE, SnapshotCache, format_age
+from sections import SECTIONS, parse_section_names, required_dictionaries, required_keys, section_view
+from snapshot_diff import diff_snapshots, display_changes
+from subscriptions import SubscriptionEngine, describe_entity, display_notifications, load_rules
+from worldstate_decode import WORLDSTATE_KEYS, decode_world_state
 
-# 加载名称映射
-name_mappings = load_name_mappings()
-node_mappings = load_node_mappings()
 
-# 将节点映射合并到主映射中
-if node_mappings:
-    name_mappings['nodes'] = node_mappings
+def _lazy_import(name):
+    """返回首次访问属性时才真正执行的模块，只做解析和渲染的进程不必为网络库付出导入时间"""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
 
-def extract_modifier_name(modifier_key):
-    """从修饰符键中提取可读的裂隙等级名称"""
-    if not modifier_key:
-        return "未知等级"
-    
-    # 从映射文件中查找
-    if modifier_key in name_mappings.get('Modifier', {}):
-        return name_mappings['Modifier'][modifier_key]
-    
-    # 如果映射文件中没有，返回原始键（清理一下显示）
-    clean_key = modifier_key.replace('Void', '').replace('Storm', '风暴')
-    return clean_key
 
-def fetch_warframe_data():
-    """获取Warframe所有实时数据并直接打印"""
+requests = _lazy_import('requests')
+
+# Warframe官方API端点
+WORLDSTATE_URL = "https://content.warframe.com/dynamic/worldState.php"
+REQUEST_TIMEOUT = 10
+DEFAULT_POLL_INTERVAL = 60
+READ_CHUNK_SIZE = 64 * 1024
+FETCH_ATTEMPTS = 3  # 单次刷新最多尝试几次（失败后按退避时间重试）
+SLOW_FETCH_SECONDS = 2  # 有缓存时等待上游超过这个时间就先显示缓存
+WATCH_TICK_SECONDS = 1  # 观看模式用本地时钟刷新倒计时的间隔
+
+# 默认输出：文本格式打印到标准输出，各板块的序列化结果在多轮刷新之间复用
+default_renderer = ReportRenderer()
+# 轮询之间复用未变化板块的翻译结果和显示模型
+section_cache = SectionCache()
+
+class WorldStateFetcher:
+    """复用同一个 keep-alive 会话抓取 worldState，并记录条件请求所需的校验信息"""
+
+    def __init__(self, url=WORLDSTATE_URL, timeout=REQUEST_TIMEOUT, archive=None, keys=WORLDSTATE_KEYS,
+                 cache=None):
+        self.url = url
+        self.timeout = timeout
+        self.archive = archive  # 可选的 SnapshotArchive，内容变化时写入归档
+        self.keys = keys  # 需要解码的顶层键，None 表示完整解码
+        self.cache = cache  # 可选的 SnapshotCache，保存最近一份有效响应
+        self.session = requests.Session()
+        self.etag = None
+        self.last_modified = None
+        self.content_hash = None
+        self.failures = 0  # 连续失败次数，用于计算退避时间
+
+    def load_cached(self):
+        """读取磁盘缓存，并把其中的校验信息用于之后的条件请求
+
+        返回 (CachedSnapshot, 解码后的 worldState)，没有可用缓存时返回 None。
+        """
+        if self.cache is None:
+            return None
+        cached = self.cache.load()
+        if cached is None:
+            return None
+        try:
+            data = decode_world_state(cached.body, self.keys)
+        except ValueError as e:
+            print(f"⚠️ 警告：快照缓存内容无法解码: {e}")
+            return None
+        self.etag = cached.etag
+        self.last_modified = cached.last_modified
+        self.content_hash = cached.content_hash
+        return cached, data
+
+    def fetch_with_retry(self, attempts=FETCH_ATTEMPTS):
+        """带指数退避的 fetch()，全部失败时抛出最后一次的异常"""
+        for attempt in range(attempts):
+            try:
+                return self.fetch()
+            except (requests.RequestException, ValueError):
+                if attempt == attempts - 1:
+                    raise
+                delay = backoff_delay(self.failures)
+                print(f"🔁抓取失败，{delay:.0f} 秒后重试（第 {attempt + 1} 次）")
+                time.sleep(delay)
+
+    def fetch(self):
+        """抓取一次 worldState
+
+        返回 (changed, data)：304 或内容哈希未变时 changed 为 False 且 data 为 None，
+        此时不做 JSON 解码；否则只解码 self.keys 中的顶层板块。
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+
+        try:
+            with metrics.stage('fetch'):
+                downloaded = self._download(headers)
+        except requests.RequestException as e:
+            self.failures += 1
+            metrics.error('fetch', e)
+            raise
+        self.failures = 0
+        if downloaded is None:
+            metrics.inc('upstream_requests_total', result='not_modified')
+            if self.cache is not None:
+                self.cache.touch()
+            return False, None
+
+        body, content_hash, etag, last_modified = downloaded
+        metrics.inc('upstream_bytes_total', len(body))
+        if content_hash == self.content_hash:
+            # 内容与上一份有效数据相同，新的校验信息同样可用
+            self.etag, self.last_modified = etag, last_modified
+            metrics.inc('upstream_requests_total', result='unchanged')
+            if self.cache is not None:
+                self.cache.touch()
+            return False, None
+        metrics.inc('upstream_requests_total', result='changed')
+        try:
+            with metrics.stage('decode'):
+                data = decode_world_state(body, self.keys)
+        except ValueError as e:
+            self.failures += 1
+            metrics.error('decode', e)
+            # 不记录这份损坏响应的校验信息，否则之后的请求会一直得到 304
+            self.etag = self.last_modified = None
+            raise
+        # 解码成功后才记录校验信息和哈希并写入缓存，损坏的响应不会覆盖上一份有效数据
+        self.etag, self.last_modified = etag, last_modified
+        self.content_hash = content_hash
+        # 只归档能够解码的响应，损坏或被截断的响应体不会永久留在归档中
+        if self.archive is not None:
+            try:
+                self.archive.append(body)
+            except OSError as e:
+                # 归档失败不影响本次刷新
+                metrics.error('archive', e)
+                print(f"⚠️写入归档失败: {e}")
+        if self.cache is not None:
+            self.cache.save(bytes(body), self.etag, self.last_modified, content_hash)
+        return True, data
+
+    def _download(self, headers):
+        """发送请求并流式读取响应体，边读边计算内容哈希
+
+        返回 (响应体, 内容哈希, ETag, Last-Modified)，304 时返回 None。校验信息由调用方
+        在响应体解码成功后才记录；响应体读取中断时清除已有的校验信息。
+        """
+        response = self.session.get(self.url, headers=headers, timeout=self.timeout, stream=True)
+        with response:
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+
+            body = bytearray()
+            digest = hashlib.sha1()
+            try:
+                for chunk in response.iter_content(chunk_size=READ_CHUNK_SIZE):
+                    body += chunk
+                    digest.update(chunk)
+            except requests.RequestException:
+                self.etag = self.last_modified = None
+                raise
+            etag = response.headers.get('ETag', self.etag)
+            last_modified = response.headers.get('Last-Modified', self.last_modified)
+        return body, digest.hexdigest(), etag, last_modified
+
+    def close(self):
+        self.session.close()
+
+def select_sections(names=None):
+    """选择要处理的板块：只加载这些板块需要的字典，返回板块名称列表"""
+    names = list(SECTIONS) if names is None else list(names)
+    mapping_index.select(required_dictionaries(names))
+    return names
+
+def build_section_views(snapshot, now=None, sections=None, cache=None):
+    """按板块注册表的顺序为选中的板块构建显示模型，所有输出格式共用这一份
+
+    cache 为 SectionCache 时复用输入未变化板块上一次的显示模型。
+
+    （促销商品、每日特价未注册：display_flash_sales / display_daily_deals）
+    """
+    names = list(SECTIONS) if sections is None else sections
+    views = []
+    for name in names:
+        with metrics.timer('section_render_seconds', section=name):
+            views.append(SECTIONS[name].view(snapshot, now) if cache is None else cache.view(name, snapshot, now))
+    return views
+
+def display_world_state(data, now=None, sections=None, renderer=None, stdout=True):
+    """打印所有数据模块，返回解析后的快照
+
+    now 为渲染时使用的时间（epoch 秒），显示归档快照时传入快照的抓取时间；
+    sections 为要显示的板块名称列表，None 表示全部；renderer 决定输出格式和导出文件，
+    stdout 为 False 时只写导出文件。
+    """
+    names = list(SECTIONS) if sections is None else sections
+    renderer = default_renderer if renderer is None else renderer
+    # 每轮刷新只检查一次字典文件是否有变化，然后单次解析出快照
+    mapping_index.refresh()
+    if isinstance(data, dict):
+        with metrics.stage('parse'):
+            data = parse_world_state(data, names, section_cache)
+    
+    with metrics.stage('render'):
+        views = build_section_views(data, now, names, section_cache)
+        updated = datetime.now() if now is None else datetime.fromtimestamp(now)
+        renderer.write(views, updated.strftime('%Y-%m-%d %H:%M:%S'), stdout)
+    return data
+
+def display_cached_world_state(cached, data, sections=None, renderer=None):
+    """打印磁盘缓存中的快照，并标明缓存的年龄"""
+    fetched = datetime.fromtimestamp(cached.fetched_at).strftime('%Y-%m-%d %H:%M:%S')
+    print(f"🗄️缓存数据: 抓取于 {fetched}，{format_age(cached.age())}前确认有效")
+    return display_world_state(data, sections=sections, renderer=renderer)
+
+def fetch_warframe_data(fetcher=None, archive=None, sections=None, cache=None, renderer=None):
+    """获取Warframe所有实时数据并直接打印
+
+    指定 cache（SnapshotCache）时先读取磁盘缓存：上游 SLOW_FETCH_SECONDS 秒内没有
+    返回或抓取失败时立即显示缓存数据，后台带退避重试的刷新完成后再显示最新数据。
+    """
+    print("🔄正在获取Warframe实时数据...")
+    names = select_sections(sections)
+    if fetcher is None:
+        fetcher = WorldStateFetcher(archive=archive, keys=required_keys(names), cache=cache)
+    cached = fetcher.load_cached()
+    shown = None
+    
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        refresh = pool.submit(fetcher.fetch_with_retry)
+        if cached is not None:
+            try:
+                refresh.result(timeout=SLOW_FETCH_SECONDS)
+            except FutureTimeoutError:
+                print("🐢上游响应较慢，先显示缓存数据")
+                shown = display_cached_world_state(*cached, sections=names, renderer=renderer)
+            except (requests.RequestException, ValueError):
+                pass
+        try:
+            # 网络错误和上游返回的损坏数据；其余异常是程序错误，不在这里吞掉
+            changed, data = refresh.result()
+        except (requests.RequestException, ValueError) as e:
+            print(f"❌发生错误: {e}")
+            if cached is not None and shown is None:
+                display_cached_world_state(*cached, sections=names, renderer=renderer)
+            return None if cached is None else cached[1]
+    
+    if not changed:
+        if cached is None:
+            print("💤数据未变化，跳过刷新")
+            return None
+        # 条件请求命中缓存的校验信息，缓存就是最新数据
+        if shown is None:
+            display_world_state(cached[1], sections=names, renderer=renderer)
+        print("✅缓存数据已是最新")
+        return cached[1]
+    
+    display_world_state(data, sections=names, renderer=renderer)
+    print("✅数据获取完成！")
+    
+    return data
+
+def refresh_world_state(fetcher, previous=None, changes_only=False, sections=None, renderer=None):
+    """轮询一次并返回最新快照
+
+    数据未变化时返回上一个快照；changes_only 为 True 时只打印与上一个快照相比
+    发生变化的实体（第一次仍打印完整数据），导出文件仍写入完整报告。
+    """
+    names = list(SECTIONS) if sections is None else sections
     try:
-        # Warframe官方API端点
-        url = "https://content.warframe.com/dynamic/worldState.php"
-        
-        print("🔄正在获取Warframe实时数据...")
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        # 清屏并显示所有数据
-        print("\n" + "="*20)
-        print("🎮WARFRAME 实时数据监控")
-        print("="*20)
-        print(f"📅更新时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print("-"*20)
-        
-        # 显示所有数据模块
-        display_alerts(data)
-        display_invasions(data)
-        display_events(data)
-        display_sorties(data)
-        display_void_fissures(data)
-        display_void_trader(data)
-        display_syndicate_missions(data)
-        display_open_world_bounties(data)
-        display_nightwave(data)
-        #display_flash_sales(data)
-        #display_daily_deals(data)
-        display_railjack(data)
-        display_archon_hunt(data)
-        
-        print("="*20)
-        print("✅数据获取完成！")
-        
-        return data
+        changed, data = fetcher.fetch()
+        if not changed:
+            if not changes_only:
+                print("💤数据未变化，跳过刷新")
+            return previous
+        
+        mapping_index.refresh()
+        with metrics.stage('parse'):
+            snapshot = parse_world_state(data, names, section_cache)
+        if changes_only and previous is not None:
+            with metrics.stage('diff'):
+                changes = diff_snapshots(previous, snapshot, names)
+            print(f"\n📅{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} 世界状态变化:")
+            with metrics.stage('render'):
+                display_changes(changes)
+            if renderer is not None and renderer.exports:
+                display_world_state(snapshot, sections=names, renderer=renderer, stdout=False)
+        else:
+            display_world_state(snapshot, sections=names, renderer=renderer)
+        return snapshot
         
-    except Exception as e:
+    except (requests.RequestException, ValueError) as e:
         print(f"❌发生错误: {e}")
-        return None
+        return previous
+    except Exception as e:
+        # 解析或显示出错时保留完整堆栈并计数，轮询继续使用上一个快照
+        metrics.error('refresh', e)
+        print(f"❌刷新时出现异常:\n{traceback.format_exc()}")
+        return previous
 
-def extract_node_name(node_key):
-    """从节点映射中提取节点名称"""
-    if node_key in name_mappings.get('nodes', {}):
-        return name_mappings['nodes'][node_key]
-    return node_key
+def poll_warframe_data(interval=DEFAULT_POLL_INTERVAL, changes_only=False, schedule=False, archive=None,
+                       sections=None, metrics_file=None, cache=None, renderer=None, subscriptions=None):
+    """常驻轮询：复用连接并使用条件请求，只有数据变化时才重新解码和打印
 
-def load_challenge_mapping():
-    """加载挑战名称映射"""
+    schedule 为 True 时按快照中最近的 Activation/Expiry 安排下一次抓取，
+    interval 作为没有时间边界时的最长间隔；sections 为要处理的板块名称列表；
+    metrics_file 不为空时每轮刷新后把指标以 Prometheus 文本格式写入该文件；
+    cache 为 SnapshotCache 时启动即显示上次缓存的数据；renderer 决定输出格式和导出文件；
+    subscriptions 为 SubscriptionEngine 时每个新快照中新出现的实体与订阅规则匹配并打印通知，
+    第一份快照（缓存或第一次抓取）中已有的实体只记为已通知。
+    """
+    names = select_sections(sections)
+    fetcher = WorldStateFetcher(archive=archive, keys=required_keys(names), cache=cache)
+    scheduler = RefreshScheduler(fallback_interval=interval) if schedule else None
+    snapshot = None
+    cached = fetcher.load_cached()
+    if cached is not None:
+        # 启动时立即显示缓存，之后的第一次抓取是针对缓存内容的条件请求
+        snapshot = display_cached_world_state(*cached, sections=names, renderer=renderer)
+        if scheduler is not None:
+            scheduler.update(snapshot)
+        if subscriptions is not None:
+            subscriptions.seed(snapshot, names)
     try:
-        with open('dict_zh.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print("⚠️ 警告：dict_zh.json 文件未找到，将使用原始路径显示")
-        return {}
-    except Exception as e:
-        print(f"⚠️ 警告：加载 dict_zh.json 时出错: {e}")
-        return {}
+        while True:
+            latest = refresh_world_state(fetcher, snapshot, changes_only, names, renderer)
+            if subscriptions is not None and latest is not None and latest is not snapshot:
+                if snapshot is None:
+                    subscriptions.seed(latest, names)
+                else:
+                    with metrics.stage('match'):
+                        notifications = subscriptions.match(latest, names)
+                    display_notifications(notifications)
+            if metrics_file:
+                metrics.write_textfile(metrics_file)
+            delay = interval
+            if fetcher.failures:
+                # 上游不可用时继续显示旧数据，并按指数退避提前重试
+                delay = min(backoff_delay(fetcher.failures), interval)
+                print(f"🔁{delay:.0f} 秒后重试（已连续失败 {fetcher.failures} 次）")
+            elif scheduler is not None:
+                if latest is not snapshot:
+                    scheduler.update(latest)
+                delay = scheduler.next_delay()
+                boundary = scheduler.next_boundary()
+                if boundary:
+                    print(f"⏰下次刷新: {delay:.0f} 秒后（{boundary[1]}时间边界）")
+            snapshot = latest
+            time.sleep(delay)
+    except KeyboardInterrupt:
+        print("\n👋已停止轮询")
+    finally:
+        fetcher.close()
 
-def extract_challenge_name(challenge_path, challenge_mapping):
-    """从映射中提取挑战名称"""
-    if challenge_path in challenge_mapping:
-        return challenge_mapping[challenge_path]
-    else:
-        # 如果映射中没有找到，尝试从路径中提取最后一部分作为备用
-        parts = challenge_path.split('/')
-        return parts[-1] if parts else challenge_path
+def watch_frame(snapshot, now, sections, renderer):
+    """观看模式的一帧：按 now 重新计算倒计时的文本报告的各行"""
+    views = build_section_views(snapshot, now, sections, section_cache)
+    report = renderer.report(views, datetime.fromtimestamp(now).strftime('%Y-%m-%d %H:%M:%S'), 'text')
+    return report.strip("\n").split("\n")
 
-def display_nightwave(data):
-    """显示午夜电波信息（使用dict_zh.json映射）"""
-    # 加载挑战名称映射
-    challenge_mapping = load_challenge_mapping()
-    
-    season_info = data.get('SeasonInfo', {})
-    
-    print(f"\n🌙午夜电波:")
-    
-    if season_info:
-        season = season_info.get('Season', 0)
-        phase = season_info.get('Phase', 0)
-        active_challenges = season_info.get('ActiveChallenges', [])
-        
-        daily_challenges = [c for c in active_challenges if c.get('Daily')]
-        weekly_challenges = [c for c in active_challenges if not c.get('Daily')]
-        
-        print(f"   • 赛季: {season}")
-        print(f"   • 阶段: {phase}")
-        print(f"   • 每日挑战: {len(daily_challenges)} 个")
-        
-        if daily_challenges:
-            for i, challenge in enumerate(daily_challenges, 1):
-                challenge_path = challenge.get('Challenge', '')
-                challenge_name = extract_challenge_name(challenge_path, challenge_mapping)
-                print(f"      {i}. {challenge_name}")
-        else:
-            print("📭无每日挑战")
-        
-        print(f"   • 每周挑战: {len(weekly_challenges)} 个")
-        
-        if weekly_challenges:
-            for i, challenge in enumerate(weekly_challenges, 1):
-                challenge_path = challenge.get('Challenge', '')
-                challenge_name = extract_challenge_name(challenge_path, challenge_mapping)
-                print(f"      {i}. {challenge_name}")
-        else:
-            print("📭无每周挑战")
+def watch_warframe_data(interval=DEFAULT_FALLBACK_INTERVAL, archive=None, sections=None, cache=None,
+                        renderer=None, metrics_file=None, tick=WATCH_TICK_SECONDS):
+    """观看模式（大厅展示屏）：每 tick 秒用本地时钟更新倒计时和是否过期，只重绘变化的行
+
+    上游只按快照中最近的 Activation/Expiry 抓取（interval 为没有时间边界时的最长间隔），
+    抓取在后台线程进行，不会卡住倒计时；数据变化时同时写入 renderer 的导出文件。
+    """
+    names = select_sections(sections)
+    renderer = default_renderer if renderer is None else renderer
+    fetcher = WorldStateFetcher(archive=archive, keys=required_keys(names), cache=cache)
+    scheduler = RefreshScheduler(fallback_interval=interval)
+    screen = LiveScreen()
+    snapshot = None
+    verified_at = None
+    next_fetch = 0.0
+    error = None
+    cached = fetcher.load_cached()
+    if cached is not None:
+        # 先显示缓存，第一次抓取是针对缓存内容的条件请求
+        mapping_index.refresh()
+        snapshot = parse_world_state(cached[1], names, section_cache)
+        verified_at = cached[0].verified_at
+        scheduler.update(snapshot)
+    
+    pool = ThreadPoolExecutor(max_workers=1)
+    pending = None
+    try:
+        while True:
+            now = time.time()
+            if pending is None and now >= next_fetch:
+                pending = pool.submit(fetcher.fetch)
+            if pending is not None and pending.done():
+                try:
+                    changed, data = pending.result()
+                except (requests.RequestException, ValueError) as e:
+                    # 上游不可用时继续用本地时钟显示旧数据，并按指数退避重试
+                    next_fetch = now + min(backoff_delay(fetcher.failures), interval)
+                    error = f"❌发生错误: {e}"
+                else:
+                    error = None
+                    verified_at = now
+                    if changed:
+                        mapping_index.refresh()
+                        with metrics.stage('parse'):
+                            snapshot = parse_world_state(data, names, section_cache)
+                        scheduler.update(snapshot, now)
+                        if renderer.exports:
+                            renderer.write(build_section_views(snapshot, now, names, section_cache),
+                                           datetime.fromtimestamp(now).strftime('%Y-%m-%d %H:%M:%S'), stdout=False)
+                    next_fetch = scheduler.due_at(now)
+                pending = None
+                if metrics_file:
+                    metrics.write_textfile(metrics_file)
+            
+            if pending is not None:
+                status = "🔄正在刷新..."
+            elif error is not None:
+                status = f"{error}（{next_fetch - now:.0f} 秒后重试）"
+            else:
+                boundary = scheduler.next_boundary(now)
+                status = f"⏰下次刷新: {max(next_fetch - now, 0):.0f} 秒后"
+                if boundary:
+                    status += f"（{boundary[1]}时间边界）"
+            if verified_at is not None:
+                status = f"🗄️数据 {format_age(now - verified_at)}前确认有效 | {status}"
+            screen.draw(watch_frame(snapshot, now, names, renderer) if snapshot is not None else [], status, snapshot)
+            # 对齐到整秒，倒计时和时钟同步跳动
+            time.sleep(tick - time.time() % tick)
+    except KeyboardInterrupt:
+        print("\n👋已停止观看")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        fetcher.close()
+
+def _numbered(texts):
+    return [Item(i, text) for i, text in enumerate(texts, 1)]
+
+def display_section(name, data, now=None, renderer=None):
+    """以文本格式打印单个板块"""
+    renderer = default_renderer if renderer is None else renderer
+    write_output(renderer.section(SECTIONS[name].view(as_snapshot(data), now)))
+
+@section_view('nightwave')
+def nightwave_view(snapshot, now=None):
+    """午夜电波（使用dict_zh.json映射）"""
+    nightwave = snapshot.nightwave
+    view = SectionView('nightwave', "🌙午夜电波")
+    
+    if nightwave:
+        daily_challenges = [c for c in nightwave.challenges if c.daily]
+        weekly_challenges = [c for c in nightwave.challenges if not c.daily]
+        
+        view.lines.append(Field("赛季", nightwave.season))
+        view.lines.append(Field("阶段", nightwave.phase))
+        view.lines.append(Field("每日挑战", f"{len(daily_challenges)} 个",
+                                _numbered(c.name for c in daily_challenges) or [Notice("📭无每日挑战")]))
+        view.lines.append(Field("每周挑战", f"{len(weekly_challenges)} 个",
+                                _numbered(c.name for c in weekly_challenges) or [Notice("📭无每周挑战")]))
         
         # 显示映射统计信息
-        mapped_count = sum(1 for c in active_challenges if c.get('Challenge', '') in challenge_mapping)
-        total_count = len(active_challenges)
-        print(f"   • 映射状态: {mapped_count}/{total_count} 个挑战已映射")
+        mapped_count = sum(1 for c in nightwave.challenges if c.mapped)
+        total_count = len(nightwave.challenges)
+        view.lines.append(Field("映射状态", f"{mapped_count}/{total_count} 个挑战已映射"))
         
     else:
-        print("📭午夜电波信息不可用")
+        view.lines.append(Notice("📭午夜电波信息不可用"))
+    return view
+
+def display_nightwave(data):
+    """显示午夜电波信息（使用dict_zh.json映射）"""
+    display_section('nightwave', data)
+
+@section_view('syndicates')
+def syndicates_view(snapshot, now=None):
+    """集团任务"""
+    view = SectionView('syndicates', "🏛️ 集团任务")
+    lines = view.lines
+    lines.append(Field("总集团任务", snapshot.syndicate_count))
+    
+    if not snapshot.syndicate_count:
+        lines.append(Notice("📭当前无集团任务"))
+        return view
+    
+    active_syndicates = snapshot.syndicate_boards
+    lines.append(Field("活跃集团", len(active_syndicates)))
+    
+    if not active_syndicates:
+        lines.append(Notice("📭当前无活跃集团任务"))
+        return view
+        
+    # 每个集团的任务列表，节点名称在解析时已经映射
+    for syndicate in active_syndicates:
+        if not syndicate.nodes:
+            lines.append(Field(syndicate.name, "0 个任务"))
+            continue
+        
+        lines.append(Field(syndicate.name, f"{len(syndicate.nodes)} 个任务", _numbered(syndicate.node_names)))
+        lines.append(Blank())  # 空行分隔不同集团
+    return view
 
 def display_syndicate_missions(data):
     """显示集团任务信息"""
-    try:
-        syndicates = data.get('SyndicateMissions', [])
-        
-        print(f"\n🏛️ 集团任务:")
-        print(f"   • 总集团任务: {len(syndicates)}")
-        
-        if not syndicates:
-            print("📭当前无集团任务")
-            return
-        
-        main_syndicates = ['SteelMeridian', 'Arbiters', 'CephalonSuda', 'Perrin', 'RedVeil', 'NewLoka']
-        active_syndicates = []
-        
-        for syndicate in syndicates:
-            if not isinstance(syndicate, dict):
-                continue
-                
-            tag = syndicate.get('Tag', '')
-            if any(main in tag for main in main_syndicates):
-                active_syndicates.append(syndicate)
-        
-        print(f"   • 活跃集团: {len(active_syndicates)}")
-        
-        if not active_syndicates:
-            print("📭当前无活跃集团任务")
-            return
-            
-        # 显示每个集团的任务列表
-        for syndicate in active_syndicates:
-            tag = syndicate.get('Tag', '')
-            syndicate_name = extract_name(tag.replace('Syndicate', '').replace('_', ' ').strip(), 'syndicates')
-            node_ids = syndicate.get('Nodes', [])
-            
-            if not node_ids or not isinstance(node_ids, list):
-                print(f"   • {syndicate_name}: 0 个任务")
-                continue
-                
-            print(f"   • {syndicate_name}: {len(node_ids)} 个任务")
-            
-            # 使用节点映射显示可读的节点名称
-            if node_ids:
-                for i, node_id in enumerate(node_ids, 1):
-                    node_name = extract_node_name(node_id)
-                    print(f"      {i}. {node_name}")
-            else:
-                print("      无可用节点信息")
-            
-            print()  # 空行分隔不同集团
-                
-    except Exception as e:
-        print(f"❌处理集团任务时出错: {e}")
-        import traceback
-        print(f"   详细错误: {traceback.format_exc()}")
+    display_section('syndicates', data)
+
+@section_view('bounties')
+def bounties_view(snapshot, now=None):
+    """开放世界赏金（使用两级映射）"""
+    bounty_boards = snapshot.bounty_boards
+    view = SectionView('bounties', "🌍开放世界赏金")
+    
+    for board in bounty_boards:
+        # 赏金名称在解析时已经通过两级映射得到
+        jobs = (f"等级 {job.min_level}-{job.max_level} | {job.name} | 精通等级: {job.mastery_req}"
+                for job in board.jobs)
+        view.lines.append(Field(board.location, f"{len(board.jobs)} 个赏金", _numbered(jobs)))
+        view.lines.append(Blank())  # 空行分隔不同地点
+    
+    if not bounty_boards:
+        view.lines.append(Notice("📭📭当前无赏金任务"))
+    return view
 
 def display_open_world_bounties(data):
     """显示开放世界赏金任务（使用两级映射）"""
-    print(f"\n🌍开放世界赏金:")
-    
-    # 加载两级映射
-    export_bounties = {}
-    dict_zh = {}
-    
-    try:
-        # 加载第一级映射（ExportBounties.json）
-        with open('ExportBounties.json', 'r', encoding='utf-8') as f:
-            export_bounties = json.load(f)
-        
-        # 加载第二级映射（dict_zh.json）
-        with open('dict_zh.json', 'r', encoding='utf-8') as f:
-            dict_zh = json.load(f)
-    except Exception as e:
-        print(f"⚠️加载映射文件时出错: {e}")
-        # 如果文件加载失败，使用您提供的示例数据
-    
-    locations = [
-        ('CetusSyndicate', '地球希图斯'),
-        ('SolarisSyndicate', '金星福尔图娜'), 
-        ('EntratiSyndicate', '火卫二殁世幽都')
-    ]
-    
-    has_bounties = False
-    
-    for tag, name in locations:
-        bounties = [s for s in data.get('SyndicateMissions', []) if s.get('Tag') == tag]
-        if bounties:
-            jobs = bounties[0].get('Jobs', [])
-            print(f"   • {name}: {len(jobs)} 个赏金")
-            
-            # 显示所有赏金任务，使用两级映射
-            for i, job in enumerate(jobs, 1):
-                job_type = job.get('jobType', '')
-                masteryReq = job.get('masteryReq', 0)
-                min_level = job.get('minEnemyLevel', 0)
-                max_level = job.get('maxEnemyLevel', 0)
-                
-                # 两级映射：jobType -> ExportBounties -> dict_zh
-                bounty_name = map_bounty_name(job_type, export_bounties, dict_zh)
-                
-                print(f"      {i}. 等级 {min_level}-{max_level} | {bounty_name} | 精通等级: {masteryReq}")
-            
-            has_bounties = True
-            print()  # 空行分隔不同地点
-    
-    if not has_bounties:
-        print("📭📭当前无赏金任务")
-
-def map_bounty_name(job_type, export_bounties, dict_zh):
-    """使用两级映射获取赏金任务的中文名称"""
-    if not job_type:
-        return "未知赏金"
-    
-    # 第一级映射：从jobType到语言键
-    language_key = export_bounties.get(job_type, "")
-    if not language_key:
-        # 如果第一级映射失败，尝试直接使用jobType的最后部分
-        parts = job_type.split('/')
-        return parts[-1] if parts else job_type
-    
-    # 第二级映射：从语言键到中文名称
-    chinese_name = dict_zh.get(language_key, "")
-    if chinese_name:
-        return chinese_name
-    
-    # 如果第二级映射失败，返回语言键的最后部分
-    parts = language_key.split('/')
-    return parts[-1] if parts else language_key
-
-def extract_name(key, category):
-    """从映射中提取名称"""
-    if key in name_mappings.get(category, {}):
-        return name_mappings[category][key]
-    return key
-
-def display_alerts(data):
-    """显示警报信息"""
-    alerts = data.get('Alerts', [])
-    active_alerts = [alert for alert in alerts if is_active(alert)]
+    display_section('bounties', data)
+
+@section_view('alerts')
+def alerts_view(snapshot, now=None):
+    """警报"""
+    alerts = snapshot.alerts
+    now = time.time() if now is None else now
+    active_alerts = [alert for alert in alerts if not is_expired(alert.expiry, now)]
     
-    print(f"🚨警报信息:")
-    print(f"   • 总数: {len(alerts)}")
-    print(f"   • 活跃: {len(active_alerts)}")
+    view = SectionView('alerts', "🚨警报信息", spaced=False)
+    view.lines.append(Field("总数", len(alerts)))
+    view.lines.append(Field("活跃", len(active_alerts)))
     
     if active_alerts:
-        for i, alert in enumerate(active_alerts, 1):
-            mission_info = alert.get('MissionInfo', {})
-            mission_type = extract_name(mission_info.get('missionType', '未知'), 'missions')
-            faction = extract_name(mission_info.get('faction', '未知'), 'factions')
-            reward = mission_info.get('missionReward', {}).get('credits', 0)
-            location_key = alert.get('MissionInfo', {}).get('location', '未知地点')
-            location = extract_node_name(location_key)  # 使用节点映射
-            print(f"   {i}. {mission_type} | {faction} | {location} | 奖励: {reward} 现金")
+        view.lines.extend(_numbered(
+            f"{alert.mission_type_name} | {alert.faction_name} | {alert.node_name} | 奖励: {alert.credits} 现金"
+            for alert in active_alerts))
     else:
-        print("📭当前无活跃警报")
+        view.lines.append(Notice("📭当前无活跃警报"))
+    return view
 
-def display_invasions(data):
-    """显示入侵信息"""
-    invasions = data.get('Invasions', [])
-    active_invasions = [inv for inv in invasions if not inv.get('Completed', False)]
-    completed_invasions = [inv for inv in invasions if inv.get('Completed', False)]
+def display_alerts(data, now=None):
+    """显示警报信息"""
+    display_section('alerts', data, now)
+
+@section_view('invasions')
+def invasions_view(snapshot, now=None):
+    """入侵"""
+    invasions = snapshot.invasions
+    active_invasions = [inv for inv in invasions if not inv.completed]
     
-    print(f"\n⚔️入侵信息:")
-    print(f"   • 总数: {len(invasions)}")
-    print(f"   • 进行中: {len(active_invasions)}")
-    print(f"   • 已完成: {len(completed_invasions)}")
+    view = SectionView('invasions', "⚔️入侵信息")
+    view.lines.append(Field("总数", len(invasions)))
+    view.lines.append(Field("进行中", len(active_invasions)))
+    view.lines.append(Field("已完成", len(invasions) - len(active_invasions)))
     
     if active_invasions:
-        for i, invasion in enumerate(active_invasions, 1):
-            node_key = invasion.get('Node', '未知节点')
-            node = extract_node_name(node_key)  # 使用节点映射
-            faction = extract_name(invasion.get('Faction', '未知'), 'factions')
-            count = invasion.get('Count', 0)
-            goal = invasion.get('Goal', 0)
-            progress = (abs(count) / goal * 100) if goal > 0 else 0
-            print(f"   {i}. {node} | {faction} | 进度: {progress:.1f}%")
+        view.lines.extend(_numbered(
+            f"{invasion.node_name} | {invasion.faction_name} | 进度: {invasion.progress:.1f}%"
+            for invasion in active_invasions))
     else:
-        print("📭当前无进行中入侵")
+        view.lines.append(Notice("📭当前无进行中入侵"))
+    return view
 
-def display_events(data):
-    """显示新闻信息"""
-    events = data.get('Events', [])
+def display_invasions(data):
+    """显示入侵信息"""
+    display_section('invasions', data)
+
+@section_view('events')
+def events_view(snapshot, now=None):
+    """新闻"""
+    events = snapshot.events
     
     # 只筛选有中文描述且活跃的新闻
-    chinese_active_events = []
-    for event in events:
-        if is_active_event(event):
-            messages = event.get('Messages', [])
-            # 检查是否有中文描述
-            for msg in messages:
-                if msg.get('LanguageCode') == 'zh':
-                    chinese_active_events.append(event)
-                    break
-    
-    print(f"\n🎪新闻信息:")
-    print(f"   • 总数: {len(events)}")
-    print(f"   • 有中文描述的新闻: {len(chinese_active_events)}")
+    chinese_active_events = [event for event in events if event.listed and 'zh' in event.messages]
+    
+    view = SectionView('events', "🎪新闻信息")
+    view.lines.append(Field("总数", len(events)))
+    view.lines.append(Field("有中文描述的新闻", len(chinese_active_events)))
     
     if chinese_active_events:
-        for i, event in enumerate(chinese_active_events, 1):
-            messages = event.get('Messages', [])
-            event_name = "无描述"
-            
-            # 提取中文描述
-            for msg in messages:
-                if msg.get('LanguageCode') == 'zh':
-                    event_name = msg.get('Message', '无描述')[:40]
-                    break
-            
-            print(f"   {i}. {event_name}...")
+        view.lines.extend(_numbered(f"{event.messages['zh'][:40]}..." for event in chinese_active_events))
     else:
-        print("📭当前无中文新闻")
+        view.lines.append(Notice("📭当前无中文新闻"))
+    return view
 
-def display_sorties(data):
-    """显示突击任务信息"""
-    sorties = data.get('Sorties', [])
+def display_events(data):
+    """显示新闻信息"""
+    display_section('events', data)
+
+@section_view('sorties')
+def sorties_view(snapshot, now=None):
+    """突击任务"""
+    sorties = snapshot.sorties
+    view = SectionView('sorties', "🎯突击任务")
     
-    print(f"\n🎯突击任务:")
     if sorties:
         sortie = sorties[0]
-        boss = extract_name(sortie.get('Boss', '未知'), 'bosses')
-        variants = sortie.get('Variants', [])
-        
-        print(f"   • BOSS: {boss}")
-        print(f"   • 阶段数: {len(variants)}")
         
-        for i, variant in enumerate(variants, 1):
-            mission_type = extract_name(variant.get('missionType', '未知'), 'missions')
-            modifier = variant.get('modifierType', '无').replace('SORTIE_MODIFIER_', '')
-            node_key = variant.get('node', '未知地点')
-            node = extract_node_name(node_key)  # 使用节点映射
-            print(f"   {i}. {mission_type} - {modifier} | {node}")
+        view.lines.append(Field("BOSS", sortie.boss_name))
+        view.lines.append(Field("阶段数", len(sortie.variants)))
+        view.lines.extend(_numbered(
+            f"{variant.mission_type_name} - {variant.modifier} | {variant.node_name}"
+            for variant in sortie.variants))
     else:
-        print("📭今日无突击任务")
+        view.lines.append(Notice("📭今日无突击任务"))
+    return view
 
-def display_void_fissures(data):
-    """显示裂隙信息"""
-    active_missions = data.get('ActiveMissions', [])
-    void_fissures = [m for m in active_missions if m.get('Modifier', '').startswith('Void')]
-    
-    print(f"\n🌀虚空裂隙:")
-    print(f"   • 活跃裂隙: {len(void_fissures)}")
-    
-    if void_fissures:
-        # 按裂隙等级分组显示
-        fissures_by_tier = {}
-        for fissure in void_fissures:
-            tier = fissure.get('Modifier', 'VoidT?')
-            if tier not in fissures_by_tier:
-                fissures_by_tier[tier] = []
-            fissures_by_tier[tier].append(fissure)
-        
-        # 按等级排序显示
-        sorted_tiers = sorted(fissures_by_tier.keys())
-        
-        for tier in sorted_tiers:
-            fissures = fissures_by_tier[tier]
-            tier_name = extract_modifier_name(tier)  # 使用裂隙等级映射
-            mission_type = extract_name(fissures[0].get('MissionType', '未知'), 'missions') if fissures else '未知'
-            
-            print(f"   • {tier_name} : {len(fissures)} 个")
-            
-            # 显示该等级下的所有裂隙
-            for i, fissure in enumerate(fissures, 1):
-                node_key = fissure.get('Node', '未知节点')
-                node = extract_node_name(node_key)  # 使用节点映射
-                mission_type = extract_name(fissure.get('MissionType', '未知'), 'missions')
-                
-                # 获取剩余时间
-                expiry = fissure.get('Expiry', {})
-                time_remaining = "未知"
-                if isinstance(expiry, dict) and '$date' in expiry:
-                    expiry_ms = expiry['$date'].get('$numberLong', 0)
-                    if expiry_ms:
-                        expiry_time = datetime.fromtimestamp(int(expiry_ms) / 1000, tz=timezone.utc)
-                        current_time = datetime.now(timezone.utc)
-                        time_remaining = expiry_time - current_time
-                        if time_remaining.days > 0:
-                            time_str = f"{time_remaining.days}天{time_remaining.seconds//3600}时"
-                        else:
-                            hours = time_remaining.seconds // 3600
-                            minutes = (time_remaining.seconds % 3600) // 60
-                            time_str = f"{hours}时{minutes}分"
-                
-                print(f"      {i}. {node} - {mission_type} - 剩余: {time_str}")
-            
-            print()  # 空行分隔不同等级
+def display_sorties(data):
+    """显示突击任务信息"""
+    display_section('sorties', data)
+
+def _fissure_remaining(fissure, now):
+    """裂隙剩余时间，例如 "1时25分" """
+    if not fissure.expiry:
+        return "未知"
+    if fissure.expiry <= now:
+        return "已结束"
+    time_remaining = timedelta(seconds=fissure.expiry - now)
+    if time_remaining.days > 0:
+        return f"{time_remaining.days}天{time_remaining.seconds//3600}时"
+    hours = time_remaining.seconds // 3600
+    minutes = (time_remaining.seconds % 3600) // 60
+    return f"{hours}时{minutes}分"
+
+@section_view('fissures')
+def fissures_view(snapshot, now=None):
+    """虚空裂隙"""
+    view = SectionView('fissures', "🌀虚空裂隙")
+    view.lines.append(Field("活跃裂隙", len(snapshot.fissures)))
+    
+    if snapshot.fissures:
+        now = time.time() if now is None else now
+        # 解析时已按裂隙等级分组并排序
+        for fissures in snapshot.fissures_by_tier.values():
+            items = _numbered(
+                f"{fissure.node_name} - {fissure.mission_type_name} - 剩余: {_fissure_remaining(fissure, now)}"
+                for fissure in fissures)
+            view.lines.append(Field(fissures[0].tier_name, f"{len(fissures)} 个", items, sep=' : '))
+            view.lines.append(Blank())  # 空行分隔不同等级
     else:
-        print("📭当前无活跃裂隙")
+        view.lines.append(Notice("📭当前无活跃裂隙"))
+    return view
 
-def display_void_trader(data):
-    """显示虚空商人信息"""
-    traders = data.get('VoidTraders', [])
-    
-    print(f"\n👑虚空商人 Baro Ki'Teer:")
+def display_void_fissures(data, now=None):
+    """显示裂隙信息"""
+    display_section('fissures', data, now)
+
+@section_view('baro')
+def void_trader_view(snapshot, now=None):
+    """虚空商人"""
+    traders = snapshot.void_traders
+    view = SectionView('baro', "👑虚空商人 Baro Ki'Teer")
+    lines = view.lines
     
     if traders:
         trader = traders[0]
-        activation = trader.get('Activation', {})
-        expiry = trader.get('Expiry', {})
         
-        activation_ms = activation.get('$date', {}).get('$numberLong', 0) if isinstance(activation, dict) else 0
-        expiry_ms = expiry.get('$date', {}).get('$numberLong', 0) if isinstance(expiry, dict) else 0
-        
-        if activation_ms and expiry_ms:
-            activation_time = datetime.fromtimestamp(int(activation_ms) / 1000, tz=timezone.utc)
-            expiry_time = datetime.fromtimestamp(int(expiry_ms) / 1000, tz=timezone.utc)
-            current_time = datetime.now(timezone.utc)
+        if trader.activation and trader.expiry:
+            activation_time = datetime.fromtimestamp(trader.activation, tz=timezone.utc)
+            expiry_time = datetime.fromtimestamp(trader.expiry, tz=timezone.utc)
+            current_time = datetime.fromtimestamp(time.time() if now is None else now, tz=timezone.utc)
             
             if current_time < activation_time:
                 time_until = activation_time - current_time
-                print(f"   • 状态:🕐即将到来")
-                print(f"   • 到达时间: {activation_time.strftime('%Y-%m-%d %H:%M UTC')}")
-                print(f"   • 距离到达: {time_until.days}天 {time_until.seconds//3600}小时")
+                lines.append(Field("状态", "🕐即将到来", sep=':'))
+                lines.append(Field("到达时间", activation_time.strftime('%Y-%m-%d %H:%M UTC')))
+                lines.append(Field("距离到达", f"{time_until.days}天 {time_until.seconds//3600}小时"))
                 
             elif activation_time <= current_time < expiry_time:
                 time_remaining = expiry_time - current_time
-                location_key = trader.get('Node', '未知地点').replace('HUB', '中继站')
-                location = extract_node_name(location_key)  # 使用节点映射
-                manifest = trader.get('Manifest', [])
                 
-                print(f"   • 状态: ✅ 正在访问")
-                print(f"   • 位置: {location}")
-                print(f"   • 剩余时间: {time_remaining.days}天 {time_remaining.seconds//3600}小时")
-                print(f"   • 携带商品: {len(manifest)} 件")
+                lines.append(Field("状态", "✅ 正在访问"))
+                lines.append(Field("位置", trader.node_name))
+                lines.append(Field("剩余时间", f"{time_remaining.days}天 {time_remaining.seconds//3600}小时"))
+                lines.append(Field("携带商品", f"{trader.manifest_size} 件"))
             else:
                 time_since = current_time - expiry_time
-                print(f"   • 状态:❌ 已离开")
-                print(f"   • 离开时间: {expiry_time.strftime('%Y-%m-%d %H:%M UTC')}")
-                print(f"   • 已离开: {time_since.days} 天")
+                lines.append(Field("状态", "❌ 已离开", sep=':'))
+                lines.append(Field("离开时间", expiry_time.strftime('%Y-%m-%d %H:%M UTC')))
+                lines.append(Field("已离开", f"{time_since.days} 天"))
     else:
-        print("📭暂无虚空商人信息")
+        lines.append(Notice("📭暂无虚空商人信息"))
+    return view
+
+def display_void_trader(data, now=None):
+    """显示虚空商人信息"""
+    display_section('baro', data, now)
 
 '''
 def display_flash_sales(data):
@@ -542,131 +761,117 @@ def display_daily_deals(data):
         print("📭当前无每日特价")
 '''
 
+@section_view('railjack')
+def railjack_view(snapshot, now=None):
+    """九重天"""
+    view = SectionView('railjack', "🚀九重天")
+    view.lines.append(Field("虚空风暴", f"{len(snapshot.void_storms)} 个"))
+    
+    # 解析时已按风暴等级分组并排序
+    for storms in snapshot.storms_by_tier.values():
+        view.lines.append(Field(storms[0].tier_name, f"{len(storms)} 个",
+                                _numbered(storm.node_name for storm in storms)))
+        view.lines.append(Blank())  # 空行分隔不同等级
+    return view
+
 def display_railjack(data):
     """显示九重天信息"""
-    void_storms = data.get('VoidStorms', [])
-    
-    print(f"\n🚀九重天:")
-    print(f"   • 虚空风暴: {len(void_storms)} 个")
-    
-    if void_storms:
-        # 按风暴等级分组显示
-        storms_by_tier = {}
-        for storm in void_storms:
-            tier = storm.get('ActiveMissionTier', '未知等级')
-            if tier not in storms_by_tier:
-                storms_by_tier[tier] = []
-            storms_by_tier[tier].append(storm)
-        
-        # 按等级排序显示
-        sorted_tiers = sorted(storms_by_tier.keys())
-        
-        for tier in sorted_tiers:
-            storms = storms_by_tier[tier]
-            tier_name = extract_modifier_name(tier)  # 使用裂隙等级映射
-            
-            print(f"   • {tier_name}: {len(storms)} 个")
-            
-            for i, storm in enumerate(storms, 1):
-                node_key = storm.get('Node', '未知节点')
-                node = extract_node_name(node_key)  # 使用节点映射
-                print(f"      {i}. {node}")
-            
-            print()  # 空行分隔不同等级
+    display_section('railjack', data)
 
-def display_archon_hunt(data):
-    """显示刺杀执行官信息"""
-    try:
-        # 从 LiteSorties 中获取执行官数据
-        lite_sorties = data.get('LiteSorties', [])
-        
-        print(f"\n👹刺杀执行官:")
-        
-        # 查找执行官任务（通过 Boss 字段包含 ARCHON 或特定执行官名称）
-        archon_hunt = None
-        for sortie in lite_sorties:
-            boss = sortie.get('Boss', '')
-            # 检查是否是执行官任务
-            if any(archon_keyword in boss for archon_keyword in ['ARCHON', 'NIRA', 'AMAR', 'BOREAL']):
-                archon_hunt = sortie
-                break
-        
-        if archon_hunt:
-            # 提取执行官信息
-            boss = archon_hunt.get('Boss', '未知执行官')
-            boss_name = extract_archon_name(boss)
-            
-            # 提取任务信息（从 Missions 字段）
-            missions = archon_hunt.get('Missions', [])
-            
-            # 获取激活和过期时间
-            activation = archon_hunt.get('Activation', {})
-            expiry = archon_hunt.get('Expiry', {})
-            
-            activation_ms = activation.get('$date', {}).get('$numberLong', 0) if isinstance(activation, dict) else 0
-            expiry_ms = expiry.get('$date', {}).get('$numberLong', 0) if isinstance(expiry, dict) else 0
-            
-            print(f"   • 执行官: {boss_name}")
-            print(f"   • 阶段数: {len(missions)}")
+@section_view('archon')
+def archon_hunt_view(snapshot, now=None):
+    """刺杀执行官"""
+    archon_hunt = snapshot.archon_hunt
+    view = SectionView('archon', "👹刺杀执行官")
+    lines = view.lines
+    
+    if archon_hunt:
+        lines.append(Field("执行官", archon_hunt.boss_name))
+        lines.append(Field("阶段数", len(archon_hunt.missions)))
+        
+        if archon_hunt.activation and archon_hunt.expiry:
+            activation_time = datetime.fromtimestamp(archon_hunt.activation, tz=timezone.utc)
+            expiry_time = datetime.fromtimestamp(archon_hunt.expiry, tz=timezone.utc)
+            current_time = datetime.fromtimestamp(time.time() if now is None else now, tz=timezone.utc)
             
-            if activation_ms and expiry_ms:
-                activation_time = datetime.fromtimestamp(int(activation_ms) / 1000, tz=timezone.utc)
-                expiry_time = datetime.fromtimestamp(int(expiry_ms) / 1000, tz=timezone.utc)
-                current_time = datetime.now(timezone.utc)
-                
-                if current_time < activation_time:
-                    time_until = activation_time - current_time
-                    print(f"   • 状态: 🕐 即将开始")
-                    print(f"   • 开始时间: {activation_time.strftime('%Y-%m-%d %H:%M UTC')}")
-                    print(f"   • 距离开始: {time_until.days}天 {time_until.seconds//3600}小时")
-                elif activation_time <= current_time < expiry_time:
-                    time_remaining = expiry_time - current_time
-                    print(f"   • 状态: ✅ 进行中")
-                    print(f"   • 剩余时间: {time_remaining.days}天 {time_remaining.seconds//3600}小时")
-                else:
-                    print(f"   • 状态: ❌ 已结束")
-            
-            if missions:
-                for i, mission in enumerate(missions, 1):
-                    mission_type = extract_name(mission.get('missionType', '未知'), 'missions')
-                    node_key = mission.get('node', '未知地点')
-                    node_name = extract_node_name(node_key)
-                    
-                    print(f"   {i}. {node_name} - {mission_type}")
+            if current_time < activation_time:
+                time_until = activation_time - current_time
+                lines.append(Field("状态", "🕐 即将开始"))
+                lines.append(Field("开始时间", activation_time.strftime('%Y-%m-%d %H:%M UTC')))
+                lines.append(Field("距离开始", f"{time_until.days}天 {time_until.seconds//3600}小时"))
+            elif activation_time <= current_time < expiry_time:
+                time_remaining = expiry_time - current_time
+                lines.append(Field("状态", "✅ 进行中"))
+                lines.append(Field("剩余时间", f"{time_remaining.days}天 {time_remaining.seconds//3600}小时"))
             else:
-                print("📭无任务信息")
+                lines.append(Field("状态", "❌ 已结束"))
         
+        if archon_hunt.missions:
+            lines.extend(_numbered(f"{mission.node_name} - {mission.mission_type_name}"
+                                   for mission in archon_hunt.missions))
         else:
-            print("📭当前无执行官任务")
-                
-    except Exception as e:
-        print(f"❌处理执行官信息时出错: {e}")
-        import traceback
-        print(f"   详细错误: {traceback.format_exc()}")
-
-def extract_archon_name(archon_key):
-    """从执行官键中提取可读的执行官名称"""
-    if not archon_key:
-        return "未知执行官"
-    
-    # 从映射中查找（使用name_mappings中的bosses映射）
-    if archon_key in name_mappings.get('bosses', {}):
-        return name_mappings['bosses'][archon_key]
+            lines.append(Notice("📭无任务信息"))
     
-    # 如果映射中没有，返回清理后的名称
-    clean_name = archon_key.replace('SORTIE_BOSS_', '').replace('ARCHON_', '')
-    return clean_name
+    else:
+        lines.append(Notice("📭当前无执行官任务"))
+    return view
+
+def display_archon_hunt(data, now=None):
+    """显示刺杀执行官信息"""
+    display_section('archon', data, now)
 
+def planet_view(snapshot, planet, now=None, sections=None):
+    """某个星球上所有尚未过期的警报、入侵、突击、裂隙、九重天等任务"""
+    found = node_index.records_on(snapshot, planet, sections, now)
+    view = SectionView('planet', f"🪐{planet}", spaced=False)
+    for section, records in found.items():
+        view.lines.append(Field(SECTIONS[section].title, f"{len(records)} 个",
+                                _numbered(describe_entity(record) for record in records)))
+    if not found:
+        view.lines.append(Notice(f"📭{planet}上当前没有活跃的任务"))
+    return view
+
+def fetch_planet_data(planet, archive=None, sections=None, cache=None, renderer=None):
+    """获取最新数据并打印某个星球上的任务，上游不可用时使用缓存"""
+    if node_index.region(planet) is None:
+        raise ValueError(f"未知星球: {planet}（可选: {', '.join(node_index.planets())}）")
+    names = select_sections(sections)
+    renderer = default_renderer if renderer is None else renderer
+    fetcher = WorldStateFetcher(archive=archive, keys=required_keys(names), cache=cache)
+    cached = fetcher.load_cached()
+    try:
+        changed, data = fetcher.fetch_with_retry()
+    except (requests.RequestException, ValueError) as e:
+        print(f"❌发生错误: {e}")
+        if cached is None:
+            return None
+        changed = False
+    finally:
+        fetcher.close()
+    if not changed:
+        data = cached[1]
+    
+    mapping_index.refresh()
+    snapshot = parse_world_state(data, names, section_cache)
+    write_output(renderer.section(planet_view(snapshot, planet, sections=names), renderer.fmt))
+    return snapshot
 
 def is_active(item):
-    """检查项目是否活跃"""
-    expiry = item.get('Expiry', {})
-    if isinstance(expiry, dict) and '$date' in expiry:
-        expiry_ms = expiry['$date'].get('$numberLong', 0)
-        if expiry_ms:
-            expiry_time = datetime.fromtimestamp(int(expiry_ms) / 1000, tz=timezone.utc)
-            return datetime.now(timezone.utc) < expiry_time
-    return True
+    """检查项目是否活跃（接受原始条目或已解析的记录）"""
+    if isinstance(item, dict):
+        return not is_expired(parse_date(item.get('Expiry')))
+    return not is_expired(getattr(item, 'expiry', None))
+
+def display_archived_world_state(archive, when, sections=None, renderer=None):
+    """按时间从归档中取出当时有效的快照并打印"""
+    names = select_sections(sections)
+    found = archive.lookup(when)
+    if found is None:
+        print(f"📭归档中没有 {datetime.fromtimestamp(when).strftime('%Y-%m-%d %H:%M:%S')} 之前的快照")
+        return None
+    fetched_at, data = found
+    print(f"🗄️归档快照: {datetime.fromtimestamp(fetched_at).strftime('%Y-%m-%d %H:%M:%S')}")
+    return display_world_state(data, now=when, sections=names, renderer=renderer)
 
 def is_active_event(event):
     """检查活动是否活跃"""
@@ -674,4 +879,82 @@ def is_active_event(event):
 
 # 直接运行时就打印所有数据
 if __name__ == "__main__":
-    fetch_warframe_data()
+    parser = argparse.ArgumentParser(description="Warframe 实时数据监控")
+    parser.add_argument('--poll', type=float, metavar='SECONDS',
+                        help="常驻轮询模式，指定轮询间隔（秒）")
+    parser.add_argument('--watch', action='store_true',
+                        help="观看模式：每秒在原地更新倒计时，只按时间边界抓取（--poll 作为最长间隔）")
+    parser.add_argument('--changes-only', action='store_true',
+                        help="轮询模式下只打印发生变化的实体")
+    parser.add_argument('--schedule', action='store_true',
+                        help="轮询模式下按实体到期时间安排抓取，--poll 作为最长间隔")
+    parser.add_argument('--subscriptions', metavar='FILE',
+                        help="轮询模式下按 JSON 订阅规则文件匹配新出现的裂隙/警报/入侵等并打印通知（启动时已有的不通知）")
+    parser.add_argument('--planet', metavar='NAME',
+                        help="只打印指定星球（如 地球）上的警报、入侵、突击、裂隙、九重天等任务")
+    parser.add_argument('--archive', metavar='DIR',
+                        help="把每个不同的快照写入归档目录")
+    parser.add_argument('--at', metavar='TIME',
+                        help="从 --archive 归档中显示指定时间的快照，例如 \"2026-10-16 14:00\"")
+    parser.add_argument('--sections', metavar='NAMES',
+                        help=f"只处理指定板块，逗号分隔（可选: {','.join(SECTIONS)}）")
+    parser.add_argument('--rebuild-index', action='store_true',
+                        help="重新编译字典查找表缓存")
+    parser.add_argument('--data-dir', metavar='DIR',
+                        help="字典文件所在目录（默认为程序所在目录，也可用环境变量 WF_DATA_DIR 指定）")
+    parser.add_argument('--cache', metavar='FILE',
+                        help=f"最近一份有效数据的缓存文件（默认为字典目录下的 {DEFAULT_CACHE_FILE}）")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="不读取也不写入快照缓存")
+    parser.add_argument('--format', choices=['text', 'json', 'markdown'], default='text',
+                        help="标准输出使用的格式（默认 text）")
+    parser.add_argument('--export', metavar='FORMAT=FILE', action='append', default=[],
+                        help="每轮刷新同时把完整报告写入文件，例如 markdown=report.md，可重复指定")
+    parser.add_argument('--metrics-log', metavar='FILE',
+                        help="把各阶段耗时和计数以 JSON 行写入文件，\"-\" 表示标准错误")
+    parser.add_argument('--metrics-file', metavar='FILE',
+                        help="每轮刷新后把指标以 Prometheus 文本格式写入文件")
+    args = parser.parse_args()
+    if args.data_dir:
+        set_data_dir(args.data_dir)
+    
+    if args.subscriptions and (not args.poll or args.watch or args.planet or args.at or args.rebuild_index):
+        parser.error("--subscriptions 只能用于轮询模式（--poll，不能与 --watch/--planet/--at/--rebuild-index 同时使用）")
+    try:
+        sections = parse_section_names(args.sections)
+        renderer = ReportRenderer(args.format, [parse_export(value) for value in args.export])
+        subscriptions = SubscriptionEngine(load_rules(args.subscriptions)) if args.subscriptions else None
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    archive = SnapshotArchive(args.archive) if args.archive else None
+    cache = None if args.no_cache else SnapshotCache(args.cache)
+    if args.metrics_log:
+        metrics.enable_log(open_log(args.metrics_log))
+    
+    if args.rebuild_index:
+        table = mapping_index.rebuild()
+        print(f"✅已编译 {len(table)} 条映射到 {mapping_index.cache_file}")
+    elif args.at:
+        if archive is None:
+            parser.error("--at 需要同时指定 --archive")
+        try:
+            at = datetime.fromisoformat(args.at).timestamp()
+        except (ValueError, OverflowError, OSError):
+            parser.error(f"无法解析时间 {args.at!r}，格式例如 \"2026-10-16 14:00\"")
+        display_archived_world_state(archive, at, sections, renderer)
+    elif args.planet:
+        try:
+            fetch_planet_data(args.planet, archive=archive, sections=sections, cache=cache, renderer=renderer)
+        except ValueError as e:
+            parser.error(str(e))
+    elif args.watch:
+        watch_warframe_data(args.poll or DEFAULT_FALLBACK_INTERVAL, archive=archive, sections=sections, cache=cache,
+                            renderer=renderer, metrics_file=args.metrics_file)
+    elif args.poll:
+        poll_warframe_data(args.poll, changes_only=args.changes_only, schedule=args.schedule,
+                           archive=archive, sections=sections, metrics_file=args.metrics_file, cache=cache,
+                           renderer=renderer, subscriptions=subscriptions)
+    else:
+        fetch_warframe_data(archive=archive, sections=sections, cache=cache, renderer=renderer)
+        if args.metrics_file:
+            metrics.write_textfile(args.metrics_file)
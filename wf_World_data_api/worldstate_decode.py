@@ -0,0 +1,176 @@
+import hashlib
+import json
+import re
+
+try:
+    import orjson
+except ImportError:  # 可选依赖，安装后自动使用更快的解码器
+    orjson = None
+
+# 监控程序会读取的 worldState 顶层键
+WORLDSTATE_KEYS = (
+    'Time', 'Alerts', 'Invasions', 'Events', 'Sorties', 'ActiveMissions', 'VoidTraders',
+    'SyndicateMissions', 'SeasonInfo', 'VoidStorms', 'LiteSorties',
+)
+
+JSON_BACKEND = 'orjson' if orjson is not None else 'json'
+
+_WHITESPACE = re.compile(rb'[ \t\n\r]*')
+_STRING_TAIL = re.compile(rb'[^"\\]*+(?:\\.[^"\\]*+)*+"', re.S)
+_SCALAR = re.compile(rb'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?|true|false|null')
+_CLOSERS = {0x5b: 0x5d, 0x7b: 0x7d}  # [ -> ]，{ -> }
+
+
+def _filler_pattern():
+    # 括号之间的普通字符和完整字符串，并直接吞掉嵌套不超过两层的数组/对象；
+    # 全部使用占有量词，扫描时不会回溯
+    string = rb'"[^"\\]*+(?:\\.[^"\\]*+)*+"'
+    pattern = rb'(?:[^"\[\]{}]++|' + string + rb')*+'
+    for _ in range(2):
+        pattern = (rb'(?:[^"\[\]{}]++|' + string + rb'|\{' + pattern + rb'\}|\[' + pattern + rb'\])*+')
+    return re.compile(pattern, re.S)
+
+
+_FILLER = _filler_pattern()
+
+
+class WorldStateDecodeError(ValueError):
+    pass
+
+
+class DecodedWorldState(dict):
+    """按键解码得到的 worldState，digests 为每个顶层键原始字节的内容哈希"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.digests = {}
+
+
+def loads(data):
+    """用可用的最快后端解码 JSON"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _skip_whitespace(buf, pos):
+    return _WHITESPACE.match(buf, pos).end()
+
+
+def _skip_string(buf, pos):
+    """pos 指向开头的引号，返回字符串结束后的位置"""
+    match = _STRING_TAIL.match(buf, pos + 1)
+    if match is None:
+        raise WorldStateDecodeError(f"未结束的字符串，位置 {pos}")
+    return match.end()
+
+
+def skip_value(buf, pos):
+    """跳过 pos 处的一个 JSON 值而不构建任何对象，返回值结束后的位置
+
+    只检查字符串和括号配对，不检查跳过部分内部的逗号和冒号。
+    """
+    head = buf[pos:pos + 1]
+    if head == b'"':
+        return _skip_string(buf, pos)
+    if head in (b'[', b'{'):
+        # 每次匹配吞掉括号之间的字符串、普通字符和浅层嵌套，循环次数只与深层括号数量有关；
+        # 浅层嵌套的配对由 _FILLER 保证，深层括号在这里用栈核对
+        expected = [_CLOSERS[buf[pos]]]
+        pos += 1
+        size = len(buf)
+        while True:
+            pos = _FILLER.match(buf, pos).end()
+            if pos >= size:
+                raise WorldStateDecodeError("未闭合的数组或对象")
+            char = buf[pos]
+            if char == 0x22:  # 匹配停在引号上说明字符串没有结束
+                raise WorldStateDecodeError(f"未结束的字符串，位置 {pos}")
+            if char in _CLOSERS:
+                expected.append(_CLOSERS[char])
+            elif char != expected.pop():
+                raise WorldStateDecodeError(f"括号不匹配，位置 {pos}")
+            pos += 1
+            if not expected:
+                return pos
+    match = _SCALAR.match(buf, pos)
+    if match is None:
+        raise WorldStateDecodeError(f"无法识别的值，位置 {pos}")
+    return match.end()
+
+
+def iter_members(buf, pos=0):
+    """遍历 pos 处 JSON 对象的成员，产出 (键, 值开始位置, 值结束位置)
+
+    对象结束后只允许有空白，否则抛出 WorldStateDecodeError。
+    """
+    pos = _skip_whitespace(buf, pos)
+    if buf[pos:pos + 1] != b'{':
+        raise WorldStateDecodeError("顶层不是 JSON 对象")
+    pos = _skip_whitespace(buf, pos + 1)
+    if buf[pos:pos + 1] != b'}':
+        while True:
+            if buf[pos:pos + 1] != b'"':
+                raise WorldStateDecodeError(f"缺少对象键，位置 {pos}")
+            key_end = _skip_string(buf, pos)
+            key = json.loads(buf[pos:key_end])
+            pos = _skip_whitespace(buf, key_end)
+            if buf[pos:pos + 1] != b':':
+                raise WorldStateDecodeError(f"缺少冒号，位置 {pos}")
+            start = _skip_whitespace(buf, pos + 1)
+            end = skip_value(buf, start)
+            yield key, start, end
+            pos = _skip_whitespace(buf, end)
+            separator = buf[pos:pos + 1]
+            if separator == b'}':
+                break
+            if separator != b',':
+                raise WorldStateDecodeError(f"缺少逗号，位置 {pos}")
+            pos = _skip_whitespace(buf, pos + 1)
+    if _skip_whitespace(buf, pos + 1) != len(buf):
+        raise WorldStateDecodeError(f"对象结束后还有多余内容，位置 {pos + 1}")
+
+
+def iter_array(buf, pos=0):
+    """遍历 pos 处 JSON 数组的元素，产出 (元素开始位置, 元素结束位置)"""
+    pos = _skip_whitespace(buf, pos)
+    if buf[pos:pos + 1] != b'[':
+        raise WorldStateDecodeError("不是 JSON 数组")
+    pos = _skip_whitespace(buf, pos + 1)
+    if buf[pos:pos + 1] == b']':
+        return
+    while True:
+        end = skip_value(buf, pos)
+        yield pos, end
+        pos = _skip_whitespace(buf, end)
+        separator = buf[pos:pos + 1]
+        if separator == b']':
+            return
+        if separator != b',':
+            raise WorldStateDecodeError(f"缺少逗号，位置 {pos}")
+        pos = _skip_whitespace(buf, pos + 1)
+
+
+def decode_world_state(body, keys=WORLDSTATE_KEYS):
+    """解码 worldState 响应体，只为 keys 中的顶层键构建 Python 对象
+
+    其余板块（FlashSales、DailyDeals、PrimeVaultTraders 等）只被扫描跳过，不会
+    生成任何对象。返回的 DecodedWorldState 同时记录每个已解码键的原始字节哈希，
+    板块缓存据此判断内容是否变化。keys 为 None 时完整解码，返回普通字典。
+    响应体不是合法的 JSON 对象时抛出 WorldStateDecodeError（ValueError 的子类）。
+    """
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    if keys is None:
+        data = loads(body)
+        if not isinstance(data, dict):
+            raise WorldStateDecodeError("顶层不是 JSON 对象")
+        return data
+    wanted = set(keys)
+    result = DecodedWorldState()
+    with memoryview(body) as view:
+        for key, start, end in iter_members(body):
+            if key in wanted:
+                result[key] = loads(body[start:end])
+                result.digests[key] = hashlib.blake2b(view[start:end], digest_size=16).digest()
+    return result